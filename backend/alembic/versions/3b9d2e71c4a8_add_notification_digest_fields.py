@@ -0,0 +1,28 @@
+"""add_notification_digest_fields
+
+Revision ID: 3b9d2e71c4a8
+Revises: fcc88d5c7c37
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d2e71c4a8'
+down_revision: Union[str, None] = 'fcc88d5c7c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notifications', sa.Column('event_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('notifications', sa.Column('first_sent_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('notifications', 'first_sent_at')
+    op.drop_column('notifications', 'event_count')
@@ -0,0 +1,28 @@
+"""add_two_factor_attempts
+
+Revision ID: 5c8f0a3d9e17
+Revises: 7e4a1c9f2b56
+Create Date: 2026-10-18 16:41:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8f0a3d9e17'
+down_revision: Union[str, None] = '7e4a1c9f2b56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('two_factor_attempts', sa.Integer(), server_default='0', nullable=False))
+    # Pending codes were bcrypt hashes, which the keyed-hash scheme cannot verify
+    op.execute("UPDATE users SET two_factor_code = NULL, two_factor_expires = NULL")
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'two_factor_attempts')
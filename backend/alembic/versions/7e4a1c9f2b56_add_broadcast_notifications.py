@@ -0,0 +1,48 @@
+"""add_broadcast_notifications
+
+Revision ID: 7e4a1c9f2b56
+Revises: 3b9d2e71c4a8
+Create Date: 2026-10-18 14:03:17.582214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4a1c9f2b56'
+down_revision: Union[str, None] = '3b9d2e71c4a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('broadcast_notifications',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('target_role', postgresql.ENUM('ADMIN', 'ASSISTANT', 'FINANCE', 'DRIVER', name='user_role', create_type=False), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('body', sa.Text(), nullable=True),
+    sa.Column('ride_id', sa.Uuid(), nullable=True),
+    sa.Column('sent_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('event_count', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('first_sent_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['ride_id'], ['rides.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_broadcast_notifications_role_sent_at', 'broadcast_notifications', ['target_role', 'sent_at'], unique=False)
+    op.create_table('notification_read_cursors',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('broadcast_read_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('notification_read_cursors')
+    op.drop_index('ix_broadcast_notifications_role_sent_at', table_name='broadcast_notifications')
+    op.drop_table('broadcast_notifications')
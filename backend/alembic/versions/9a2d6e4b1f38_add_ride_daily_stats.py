@@ -0,0 +1,64 @@
+"""add_ride_daily_stats
+
+Revision ID: 9a2d6e4b1f38
+Revises: 5c8f0a3d9e17
+Create Date: 2026-10-18 18:22:09.417350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a2d6e4b1f38'
+down_revision: Union[str, None] = '5c8f0a3d9e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ride_daily_stats',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('source_platform', sa.String(length=100), nullable=False),
+    sa.Column('driver_id', sa.Uuid(), nullable=True),
+    sa.Column('company_id', sa.Uuid(), nullable=True),
+    sa.Column('completed_rides', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cancelled_rides', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('revenue', sa.DECIMAL(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('driver_share', sa.DECIMAL(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('distance_km', sa.DECIMAL(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_ride_daily_stats_key', 'ride_daily_stats', ['day', 'source_platform', 'driver_id', 'company_id'], unique=True, postgresql_nulls_not_distinct=True)
+
+    # Backfill from existing rides (same aggregation as rollup_service)
+    op.execute("""
+        INSERT INTO ride_daily_stats (
+            day, source_platform, driver_id, company_id,
+            completed_rides, cancelled_rides, revenue, driver_share, distance_km
+        )
+        SELECT
+            (r.completed_at AT TIME ZONE 'UTC')::date, r.source_platform, r.driver_id, d.ncc_company_id,
+            count(*), 0, coalesce(sum(r.price), 0), coalesce(sum(r.driver_share), 0), coalesce(sum(r.distance_km), 0)
+        FROM rides r LEFT JOIN drivers d ON d.user_id = r.driver_id
+        WHERE r.status = 'COMPLETED' AND r.completed_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+    op.execute("""
+        INSERT INTO ride_daily_stats (day, source_platform, driver_id, company_id, cancelled_rides)
+        SELECT (r.updated_at AT TIME ZONE 'UTC')::date, r.source_platform, r.driver_id, d.ncc_company_id, count(*)
+        FROM rides r LEFT JOIN drivers d ON d.user_id = r.driver_id
+        WHERE r.status = 'CANCELLED'
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (day, source_platform, driver_id, company_id)
+        DO UPDATE SET cancelled_rides = EXCLUDED.cancelled_rides
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_ride_daily_stats_key', table_name='ride_daily_stats')
+    op.drop_table('ride_daily_stats')
@@ -0,0 +1,53 @@
+"""add_ride_cancelled_at
+
+Revision ID: a7c3e5f92d14
+Revises: f19a6d3c8b27
+Create Date: 2026-10-18 23:48:05.214397
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5f92d14'
+down_revision: Union[str, None] = 'f19a6d3c8b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('rides', sa.Column('cancelled_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+    # Backfill from the history of the cancellation (last update if missing)
+    op.execute("""
+        UPDATE rides r SET cancelled_at = coalesce(
+            (SELECT max(h.changed_at) FROM ride_history h
+             WHERE h.ride_id = r.id AND h.new_status = 'cancelled'),
+            r.updated_at
+        )
+        WHERE r.status = 'CANCELLED'
+    """)
+
+    # Re-bucket the rollup's cancellations by the cancellation day
+    op.execute("UPDATE ride_daily_stats SET cancelled_rides = 0 WHERE cancelled_rides <> 0")
+    op.execute("""
+        INSERT INTO ride_daily_stats (day, source_platform, driver_id, company_id, cancelled_rides)
+        SELECT (r.cancelled_at AT TIME ZONE 'UTC')::date, r.source_platform, r.driver_id, d.ncc_company_id, count(*)
+        FROM rides r LEFT JOIN drivers d ON d.user_id = r.driver_id
+        WHERE r.status = 'CANCELLED' AND r.cancelled_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (day, source_platform, driver_id, company_id)
+        DO UPDATE SET cancelled_rides = EXCLUDED.cancelled_rides
+    """)
+    op.execute("""
+        DELETE FROM ride_daily_stats
+        WHERE completed_rides = 0 AND cancelled_rides = 0
+          AND revenue = 0 AND driver_share = 0 AND distance_km = 0
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('rides', 'cancelled_at')
@@ -0,0 +1,36 @@
+"""add_broadcast_reads
+
+Revision ID: b52e8d0a4c79
+Revises: a7c3e5f92d14
+Create Date: 2026-10-19 10:12:44.903518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e8d0a4c79'
+down_revision: Union[str, None] = 'a7c3e5f92d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('broadcast_reads',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('broadcast_id', sa.Uuid(), nullable=False),
+    sa.Column('sent_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('read_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['broadcast_id'], ['broadcast_notifications.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'broadcast_id')
+    )
+    op.create_index(op.f('ix_broadcast_reads_broadcast_id'), 'broadcast_reads', ['broadcast_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_broadcast_reads_broadcast_id'), table_name='broadcast_reads')
+    op.drop_table('broadcast_reads')
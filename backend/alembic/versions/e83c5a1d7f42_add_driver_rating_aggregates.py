@@ -0,0 +1,48 @@
+"""add_driver_rating_aggregates
+
+Revision ID: e83c5a1d7f42
+Revises: d41b7e9c2a05
+Create Date: 2026-10-18 22:11:52.604913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83c5a1d7f42'
+down_revision: Union[str, None] = 'd41b7e9c2a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ['rating_sum', 'rating_count'] + [f'rating_{stars}_count' for stars in range(1, 6)]
+
+
+def upgrade() -> None:
+    for name in COUNTERS:
+        op.add_column('drivers', sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from existing reviews (same aggregation as review_service)
+    op.execute("""
+        UPDATE drivers d SET
+            rating_sum = r.rating_sum,
+            rating_count = r.rating_count,
+            rating_1_count = r.c1, rating_2_count = r.c2, rating_3_count = r.c3,
+            rating_4_count = r.c4, rating_5_count = r.c5,
+            rating_avg = round(r.rating_sum::numeric / r.rating_count, 2)
+        FROM (
+            SELECT driver_id, sum(rating) AS rating_sum, count(*) AS rating_count,
+                count(*) FILTER (WHERE rating = 1) AS c1, count(*) FILTER (WHERE rating = 2) AS c2,
+                count(*) FILTER (WHERE rating = 3) AS c3, count(*) FILTER (WHERE rating = 4) AS c4,
+                count(*) FILTER (WHERE rating = 5) AS c5
+            FROM reviews GROUP BY driver_id
+        ) r
+        WHERE d.id = r.driver_id
+    """)
+
+
+def downgrade() -> None:
+    for name in reversed(COUNTERS):
+        op.drop_column('drivers', name)
@@ -0,0 +1,46 @@
+"""add_driver_monthly_stats
+
+Revision ID: f19a6d3c8b27
+Revises: e83c5a1d7f42
+Create Date: 2026-10-18 23:02:18.350761
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19a6d3c8b27'
+down_revision: Union[str, None] = 'e83c5a1d7f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('driver_monthly_stats',
+    sa.Column('driver_id', sa.Uuid(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('completed_rides', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('earnings', sa.DECIMAL(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('distance_km', sa.DECIMAL(precision=12, scale=2), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['driver_id'], ['drivers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('driver_id', 'month')
+    )
+
+    # Backfill from existing rides (same aggregation as driver_stats_service)
+    op.execute("""
+        INSERT INTO driver_monthly_stats (driver_id, month, completed_rides, earnings, distance_km)
+        SELECT
+            d.id, date_trunc('month', r.completed_at AT TIME ZONE 'UTC')::date,
+            count(*), coalesce(sum(r.driver_share), 0), coalesce(sum(r.distance_km), 0)
+        FROM rides r JOIN drivers d ON d.user_id = r.driver_id
+        WHERE r.status = 'COMPLETED' AND r.completed_at IS NOT NULL
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('driver_monthly_stats')
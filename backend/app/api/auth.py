@@ -16,24 +16,55 @@ from app.services.auth_service import (
     authenticate_user,
     initiate_2fa,
     verify_2fa_code,
-    generate_2fa_code,
 )
+from app.services.otp_service import OTP_RESET, issue_code, verify_code
 from app.utils.security import (
     create_access_token,
     create_refresh_token,
     create_temp_token,
     decode_access_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
 )
 from app.utils.email import send_reset_password_email
-from app.models.user import User
+from app.utils.rate_limit import RateLimit
+from app.models.user import User, UserStatus
 from app.config import settings
 
 router = APIRouter()
 
 
-@router.post("/login", response_model=TempTokenResponse)
+def _temp_token_user(body: dict) -> str | None:
+    payload = decode_access_token(body.get("temp_token") or "")
+    return payload.get("sub") if payload else None
+
+
+login_rate_limit = RateLimit(
+    "login",
+    per_ip=settings.RATE_LIMIT_LOGIN_PER_IP,
+    per_account=settings.RATE_LIMIT_LOGIN_PER_ACCOUNT,
+    account=lambda body: body.get("email"),
+)
+verify_2fa_rate_limit = RateLimit(
+    "verify-2fa",
+    per_ip=settings.RATE_LIMIT_2FA_PER_IP,
+    per_account=settings.RATE_LIMIT_2FA_PER_ACCOUNT,
+    account=_temp_token_user,
+)
+forgot_password_rate_limit = RateLimit(
+    "forgot-password",
+    per_ip=settings.RATE_LIMIT_RESET_PER_IP,
+    per_account=settings.RATE_LIMIT_RESET_PER_ACCOUNT,
+    account=lambda body: body.get("email"),
+)
+reset_password_rate_limit = RateLimit(
+    "reset-password",
+    per_ip=settings.RATE_LIMIT_RESET_PER_IP,
+    per_account=settings.RATE_LIMIT_RESET_PER_ACCOUNT,
+    account=lambda body: str(body.get("token") or "").partition(":")[0],
+)
+
+
+@router.post("/login", response_model=TempTokenResponse, dependencies=[Depends(login_rate_limit)])
 async def login(
     credentials: LoginRequest,
     db: AsyncSession = Depends(get_db)
@@ -50,6 +81,12 @@ async def login(
             detail="Incorrect email or password"
         )
 
+    if user.status == UserStatus.SUSPENDED:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account suspended",
+        )
+
     # Generate and send 2FA code (DEV_MODE handled inside email module)
     sent = await initiate_2fa(db, user)
 
@@ -68,7 +105,7 @@ async def login(
     )
 
 
-@router.post("/verify-2fa", response_model=TokenResponse)
+@router.post("/verify-2fa", response_model=TokenResponse, dependencies=[Depends(verify_2fa_rate_limit)])
 async def verify_2fa(
     request: TwoFactorRequest,
     db: AsyncSession = Depends(get_db)
@@ -146,6 +183,12 @@ async def refresh_access_token(
             detail="User not found"
         )
 
+    if user.status == UserStatus.SUSPENDED:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account suspended",
+        )
+
     # Create new access token with user claims
     user_claims = {
         "email": user.email,
@@ -161,7 +204,7 @@ async def refresh_access_token(
     )
 
 
-@router.post("/forgot-password")
+@router.post("/forgot-password", dependencies=[Depends(forgot_password_rate_limit)])
 async def forgot_password(
     request: ForgotPasswordRequest,
     db: AsyncSession = Depends(get_db),
@@ -174,10 +217,7 @@ async def forgot_password(
     user = result.scalar_one_or_none()
 
     if user:
-        code = generate_2fa_code()
-        user.two_factor_code = hash_password(code)
-        user.two_factor_expires = datetime.now(timezone.utc) + timedelta(minutes=30)
-        await db.flush()
+        code = await issue_code(db, user, OTP_RESET, timedelta(minutes=30))
 
         # DEV_MODE check is handled inside send_reset_password_email
         await send_reset_password_email(user.email, code)
@@ -185,7 +225,7 @@ async def forgot_password(
     return {"message": "If the email exists, a reset code has been sent"}
 
 
-@router.post("/reset-password")
+@router.post("/reset-password", dependencies=[Depends(reset_password_rate_limit)])
 async def reset_password(
     request: ResetPasswordRequest,
     db: AsyncSession = Depends(get_db),
@@ -206,33 +246,19 @@ async def reset_password(
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
 
-    if not user or not user.two_factor_code or not user.two_factor_expires:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid or expired reset code",
-        )
-
-    if datetime.now(timezone.utc) > user.two_factor_expires:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Reset code has expired",
-        )
-
-    if not verify_password(code, user.two_factor_code):
+    if len(request.new_password) < 6:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid reset code",
+            detail="Password must be at least 6 characters",
         )
 
-    if len(request.new_password) < 6:
+    if not user or not await verify_code(db, user, OTP_RESET, code):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Password must be at least 6 characters",
+            detail="Invalid or expired reset code",
         )
 
-    user.password_hash = hash_password(request.new_password)
-    user.two_factor_code = None
-    user.two_factor_expires = None
+    user.password_hash = await hash_password_async(request.new_password)
     user.updated_at = datetime.now(timezone.utc)
     await db.flush()
 
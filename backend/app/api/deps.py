@@ -5,7 +5,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
 from app.utils.security import decode_access_token
-from app.models.user import User, UserRole
+from app.models.user import User, UserRole, UserStatus
+from app.services.auth_state import get_cached_user, get_user_state
 from app.config import settings
 
 security = HTTPBearer(auto_error=False)
@@ -16,7 +17,12 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> User:
-    """Dependency to get the current authenticated user from JWT token."""
+    """Dependency to get the current authenticated user from JWT token.
+
+    In stateless mode (``AUTH_STATELESS``, opt-in) most requests are served
+    from a cached user row without touching the database, see
+    :mod:`app.services.auth_state`.
+    """
     if credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,8 +45,19 @@ async def get_current_user(
             detail="Invalid token payload"
         )
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    if settings.AUTH_STATELESS:
+        # The user row comes from the per-process cache, validated against
+        # the shared suspension set and user version on every request
+        state = await get_user_state(user_id)
+        if state is not None and state[0]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Account suspended",
+            )
+        user = await get_cached_user(db, user_id, state[1] if state is not None else None)
+    else:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
 
     if not user:
         raise HTTPException(
@@ -48,6 +65,12 @@ async def get_current_user(
             detail="User not found"
         )
 
+    if user.status == UserStatus.SUSPENDED:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account suspended",
+        )
+
     return user
 
 
@@ -6,18 +6,21 @@ from app.database import get_db
 from app.api.deps import get_current_user, require_role
 from app.models.user import User, UserRole, UserStatus
 from app.models.driver import Driver
-from app.models.ride import Ride, RideStatus
 from app.models.review import Review
 from app.models.ncc_company import NCCCompany
-from app.utils.security import hash_password
+from app.utils.security import hash_password_async
+from app.services.auth_state import publish_suspension
+from app.services.driver_stats_service import get_month_stats
+from app.services.review_service import rating_distribution
 from app.schemas.driver import (
     DriverCreate,
     DriverUpdate,
+    DriverStatusUpdate,
     DriverResponse,
     DriverStats,
     DriverWithUserResponse,
 )
-from app.schemas.review import ReviewResponse
+from app.schemas.review import ReviewResponse, ReviewSummary
 from datetime import datetime, date, timezone
 from typing import Optional
 from pydantic import BaseModel, EmailStr
@@ -225,7 +228,7 @@ async def create_driver(
     new_user = User(
         id=uuid.uuid4(),
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password_async(data.password),
         role=UserRole.DRIVER,
         first_name=data.first_name,
         last_name=data.last_name,
@@ -325,6 +328,44 @@ async def update_driver(
     return _build_driver_with_user(driver)
 
 
+# ---------------------------------------------------------------------------
+# PUT /{driver_id}/status — Activate / suspend a driver account
+# ---------------------------------------------------------------------------
+
+@router.put("/{driver_id}/status", response_model=DriverWithUserResponse)
+async def update_driver_status(
+    driver_id: uuid.UUID,
+    data: DriverStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(UserRole.ADMIN)),
+):
+    """Change a driver's account status. Admin only.
+
+    Suspending takes effect on the driver's next request: the suspension is
+    published to the shared revocation set used by the auth dependency.
+    """
+    result = await db.execute(
+        select(Driver)
+        .options(selectinload(Driver.user), selectinload(Driver.ncc_company))
+        .where(Driver.id == driver_id)
+    )
+    driver = result.scalar_one_or_none()
+
+    if not driver:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Driver not found",
+        )
+
+    driver.user.status = data.status
+    # Publish only once the new status is durable: a failed commit must not
+    # leave the driver locked out (or a reactivation visible) in Redis
+    await db.commit()
+    await publish_suspension(driver.user_id, data.status == UserStatus.SUSPENDED)
+
+    return _build_driver_with_user(driver)
+
+
 # ---------------------------------------------------------------------------
 # GET /{driver_id}/stats — Driver statistics
 # ---------------------------------------------------------------------------
@@ -338,12 +379,10 @@ async def get_driver_stats(
     """
     Get driver statistics: all-time totals and current-month figures.
     Admin roles can see any driver. Drivers can only see their own stats.
+    Current-month figures come from the driver's monthly counters (UTC
+    months), not from the rides table.
     """
-    # Fetch driver
-    result = await db.execute(
-        select(Driver).options(selectinload(Driver.user)).where(Driver.id == driver_id)
-    )
-    driver = result.scalar_one_or_none()
+    driver = await db.get(Driver, driver_id)
 
     if not driver:
         raise HTTPException(
@@ -358,33 +397,17 @@ async def get_driver_stats(
             detail="You can only view your own statistics",
         )
 
-    # Current month boundaries
-    now = datetime.now(timezone.utc)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-    # Query completed rides this month for this driver
-    # Rides are linked via driver_id -> users.id, so match on driver.user_id
-    month_query = (
-        select(
-            func.count(Ride.id).label("count"),
-            func.coalesce(func.sum(Ride.driver_share), 0).label("earnings"),
-        )
-        .where(
-            Ride.driver_id == driver.user_id,
-            Ride.status == RideStatus.COMPLETED,
-            Ride.completed_at >= month_start,
-        )
-    )
-    month_result = await db.execute(month_query)
-    month_row = month_result.one()
+    month = await get_month_stats(db, driver.id, datetime.now(timezone.utc).date())
 
     return DriverStats(
         total_rides=driver.total_rides,
         total_earnings=float(driver.total_earnings),
         total_km=float(driver.total_km),
         rating_avg=float(driver.rating_avg),
-        completed_this_month=month_row.count,
-        earnings_this_month=float(month_row.earnings),
+        rating_count=driver.rating_count,
+        completed_this_month=month.completed_rides if month else 0,
+        earnings_this_month=float(month.earnings) if month else 0.0,
+        km_this_month=float(month.distance_km) if month else 0.0,
     )
 
 
@@ -434,3 +457,41 @@ async def get_driver_reviews(
     reviews = result.scalars().all()
 
     return [ReviewResponse.model_validate(r) for r in reviews]
+
+
+# ---------------------------------------------------------------------------
+# GET /{driver_id}/reviews/summary — Rating average and star distribution
+# ---------------------------------------------------------------------------
+
+@router.get("/{driver_id}/reviews/summary", response_model=ReviewSummary)
+async def get_driver_review_summary(
+    driver_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get a driver's rating average, review count and number of reviews per
+    star, read from the aggregates kept on the driver row.
+    Admin roles can see any driver. Drivers can only see their own.
+    """
+    driver = await db.get(Driver, driver_id)
+
+    if not driver:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Driver not found",
+        )
+
+    # Access control
+    if current_user.role == UserRole.DRIVER and driver.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view your own reviews",
+        )
+
+    return ReviewSummary(
+        driver_id=driver.id,
+        rating_avg=float(driver.rating_avg),
+        rating_count=driver.rating_count,
+        distribution=rating_distribution(driver),
+    )
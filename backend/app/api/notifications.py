@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, update
+from sqlalchemy import select
 from app.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.notification import Notification
 from app.schemas.notification import NotificationResponse
-from datetime import datetime, timezone
+from app.services.notification_service import (
+    count_unread,
+    get_broadcast,
+    list_notifications as list_user_notifications,
+    mark_all_read,
+    mark_broadcast_read,
+    mark_read,
+)
+from datetime import datetime
 import uuid
 
 
@@ -24,27 +32,15 @@ async def list_notifications(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """List notifications for the current user, newest first."""
-    stmt = (
-        select(Notification)
-        .where(Notification.user_id == current_user.id)
-    )
-
-    if unread_only:
-        stmt = stmt.where(Notification.read_at.is_(None))
+    """List notifications for the current user, newest first.
 
-    stmt = (
-        stmt
-        .order_by(Notification.sent_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
+    Personal notifications and the broadcasts addressed to the user's role
+    are merged into one stream.
+    """
+    return await list_user_notifications(
+        db, current_user, unread_only=unread_only, page=page, page_size=page_size
     )
 
-    result = await db.execute(stmt)
-    notifications = result.scalars().all()
-
-    return notifications
-
 
 # ---------------------------------------------------------------------------
 # GET /unread-count  -  Count of unread notifications
@@ -55,18 +51,27 @@ async def get_unread_count(
     current_user: User = Depends(get_current_user),
 ):
     """Get the count of unread notifications for the current user."""
-    result = await db.execute(
-        select(func.count(Notification.id))
-        .where(
-            Notification.user_id == current_user.id,
-            Notification.read_at.is_(None),
-        )
-    )
-    count = result.scalar() or 0
+    count = await count_unread(db, current_user)
 
     return {"unread_count": count}
 
 
+# ---------------------------------------------------------------------------
+# PUT /read-all  -  Mark all notifications as read
+# ---------------------------------------------------------------------------
+@router.put("/read-all")
+async def mark_all_notifications_read(
+    before: datetime | None = Query(None, description="Only mark notifications sent up to this time"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Mark all of the current user's notifications as read, or only those
+    sent up to ``before`` (e.g. the ``sent_at`` of the newest one shown)."""
+    marked = await mark_all_read(db, current_user, before=before)
+
+    return {"marked_read": marked}
+
+
 # ---------------------------------------------------------------------------
 # PUT /{notification_id}/read  -  Mark a notification as read
 # ---------------------------------------------------------------------------
@@ -76,13 +81,36 @@ async def mark_notification_read(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Mark a single notification as read."""
+    """Mark a single notification as read.
+
+    Broadcasts are read through the user's cursor, or individually when
+    newer than it.
+    """
+    notification = await mark_read(db, current_user, notification_id)
+    if notification is not None:
+        return notification
+
     result = await db.execute(
         select(Notification).where(Notification.id == notification_id)
     )
     notification = result.scalar_one_or_none()
 
     if notification is None:
+        broadcast = await get_broadcast(db, current_user, notification_id)
+        if broadcast is not None:
+            read_at = await mark_broadcast_read(db, current_user, broadcast)
+            return NotificationResponse(
+                id=broadcast.id,
+                user_id=current_user.id,
+                type=broadcast.type,
+                title=broadcast.title,
+                body=broadcast.body,
+                ride_id=broadcast.ride_id,
+                read_at=read_at,
+                sent_at=broadcast.sent_at,
+                event_count=broadcast.event_count,
+            )
+
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found",
@@ -94,8 +122,5 @@ async def mark_notification_read(
             detail="You do not have access to this notification",
         )
 
-    if notification.read_at is None:
-        notification.read_at = datetime.now(timezone.utc)
-        await db.flush()
-
+    # Already read
     return notification
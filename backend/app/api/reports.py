@@ -1,18 +1,37 @@
-import csv
-import io
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, extract, and_, case
-from app.database import get_db
+from sqlalchemy import select, func, extract, and_, or_, case
+from app.database import AsyncSessionLocal, get_db
 from app.api.deps import get_current_user, require_role
 from app.models.user import User, UserRole
 from app.models.ride import Ride, RideStatus
 from app.models.driver import Driver
-from app.models.review import Review
-from app.schemas.report import DashboardKPIs, EarningsReport, EarningsDataPoint
+from app.models.ride_daily_stat import RideDailyStat
+from app.models.report_job import ReportJob, ReportJobStatus
+from app.schemas.report import DashboardKPIs, EarningsReport, ReportJobCreate, ReportJobResponse
+from app.services.export_service import (
+    COLUMNAR_AVAILABLE,
+    EXPORT_FORMATS,
+    iter_export,
+    ride_export_query,
+)
+from app.services.report_service import (
+    REPORT_KIND_EARNINGS,
+    ReportJobError,
+    create_report_job,
+    fail_report_job,
+    get_earnings_report,
+    report_file_path,
+    report_media_type,
+)
+from app.services.review_service import global_rating_avg
+from app.services.rollup_service import REPORTS_CACHE
+from app.tasks.reports import enqueue_report_job
+from app.utils.response_cache import cached_json
 from datetime import datetime, date, timedelta, timezone
 from typing import Optional
+from uuid import UUID
 
 
 router = APIRouter()
@@ -38,75 +57,28 @@ async def get_dashboard_kpis(
 
     The current period covers the last `period_days` days. The previous period
     covers the `period_days` before that, and is used to calculate the change
-    percentages for rides and revenue.
-    """
-    now = datetime.now(timezone.utc)
-    current_start = now - timedelta(days=period_days)
-    previous_start = current_start - timedelta(days=period_days)
+    percentages for rides and revenue. Revenue is read from the daily rollup,
+    so its periods are whole UTC days ending today.
 
-    # -- Total rides (current period) -----------------------------------------
-    current_rides_result = await db.execute(
-        select(func.count(Ride.id)).where(
-            Ride.created_at >= current_start,
-            Ride.created_at < now,
-        )
+    Responses are cached for ``REPORT_CACHE_TTL_SECONDS`` (``X-Cache`` header).
+    """
+    return await cached_json(
+        REPORTS_CACHE, "dashboard", {"period_days": period_days},
+        lambda: _dashboard_kpis(db, period_days),
     )
-    total_rides = current_rides_result.scalar() or 0
 
-    # -- Total rides (previous period) ----------------------------------------
-    previous_rides_result = await db.execute(
-        select(func.count(Ride.id)).where(
-            Ride.created_at >= previous_start,
-            Ride.created_at < current_start,
-        )
-    )
-    previous_rides = previous_rides_result.scalar() or 0
-
-    # -- Revenue (current period) — sum of price for completed rides ----------
-    current_revenue_result = await db.execute(
-        select(func.coalesce(func.sum(Ride.price), 0)).where(
-            Ride.status == RideStatus.COMPLETED,
-            Ride.completed_at >= current_start,
-            Ride.completed_at < now,
-        )
-    )
-    total_revenue = float(current_revenue_result.scalar() or 0)
-
-    # -- Revenue (previous period) --------------------------------------------
-    previous_revenue_result = await db.execute(
-        select(func.coalesce(func.sum(Ride.price), 0)).where(
-            Ride.status == RideStatus.COMPLETED,
-            Ride.completed_at >= previous_start,
-            Ride.completed_at < current_start,
-        )
-    )
-    previous_revenue = float(previous_revenue_result.scalar() or 0)
-
-    # -- Active drivers (drivers with at least one ride in the current period)
-    active_drivers_result = await db.execute(
-        select(func.count(func.distinct(Ride.driver_id))).where(
-            Ride.driver_id.is_not(None),
-            Ride.created_at >= current_start,
-            Ride.created_at < now,
-        )
-    )
-    active_drivers = active_drivers_result.scalar() or 0
 
-    # -- Average rating (all-time) --------------------------------------------
-    avg_rating_result = await db.execute(
-        select(func.coalesce(func.avg(Review.rating), 0))
-    )
-    avg_rating = round(float(avg_rating_result.scalar() or 0), 2)
+async def _dashboard_kpis(db: AsyncSession, period_days: int) -> DashboardKPIs:
+    now = datetime.now(timezone.utc)
+    totals = (await db.execute(_kpi_statement(now, period_days))).one()
 
-    # -- Rides today -----------------------------------------------------------
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    rides_today_result = await db.execute(
-        select(func.count(Ride.id)).where(
-            Ride.scheduled_at >= today_start,
-            Ride.scheduled_at < now,
-        )
-    )
-    rides_today = rides_today_result.scalar() or 0
+    total_rides = totals.total_rides
+    previous_rides = totals.previous_rides
+    total_revenue = float(totals.total_revenue)
+    previous_revenue = float(totals.previous_revenue)
+    active_drivers = totals.active_drivers
+    avg_rating = round(float(totals.avg_rating), 2)
+    rides_today = totals.rides_today
 
     # -- Change percentages ---------------------------------------------------
     rides_change_pct = _calc_change_pct(total_rides, previous_rides)
@@ -135,13 +107,18 @@ async def get_earnings(
     granularity: str = Query("daily", regex="^(daily|weekly|monthly)$"),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
+    split_by: Optional[str] = Query(None, regex="^source_platform$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Return earnings data points aggregated by the requested granularity.
 
-    Only completed rides are included. Defaults to the last 30 days when no
-    date range is provided.
+    Only completed rides are included, read from the ``ride_daily_stats``
+    rollup (UTC days). Every period of the range is returned (zeros when
+    nothing was completed) with revenue (``amount``), driver share, margin,
+    rides and km; ``split_by=source_platform`` adds the same series per
+    platform. Defaults to the last 30 days when no date range is provided.
+    Responses are cached like the dashboard.
     """
     today = date.today()
 
@@ -150,125 +127,220 @@ async def get_earnings(
     if date_to is None:
         date_to = today
 
-    # Convert date bounds to datetimes for comparison with TIMESTAMP columns
-    dt_from = datetime(date_from.year, date_from.month, date_from.day, tzinfo=timezone.utc)
-    dt_to = datetime(date_to.year, date_to.month, date_to.day, 23, 59, 59, tzinfo=timezone.utc)
-
-    # Build the date-truncation expression based on granularity
-    if granularity == "daily":
-        date_trunc = func.date_trunc("day", Ride.completed_at)
-        date_fmt = "%Y-%m-%d"
-    elif granularity == "weekly":
-        date_trunc = func.date_trunc("week", Ride.completed_at)
-        date_fmt = "%Y-%m-%d"  # start-of-week date
-    else:  # monthly
-        date_trunc = func.date_trunc("month", Ride.completed_at)
-        date_fmt = "%Y-%m"
-
-    stmt = (
-        select(
-            date_trunc.label("period"),
-            func.coalesce(func.sum(Ride.price), 0).label("amount"),
-        )
-        .where(
-            Ride.status == RideStatus.COMPLETED,
-            Ride.completed_at >= dt_from,
-            Ride.completed_at <= dt_to,
-        )
-        .group_by("period")
-        .order_by("period")
+    return await cached_json(
+        REPORTS_CACHE, "earnings",
+        {"granularity": granularity, "date_from": date_from, "date_to": date_to, "split_by": split_by},
+        lambda: get_earnings_report(db, granularity, date_from, date_to, split_by),
     )
 
-    result = await db.execute(stmt)
-    rows = result.all()
-
-    data = []
-    for period, amount in rows:
-        # period comes back as a datetime from date_trunc
-        if isinstance(period, datetime):
-            label = period.strftime(date_fmt)
-        else:
-            label = str(period)
-        data.append(EarningsDataPoint(date=label, amount=float(amount)))
-
-    return EarningsReport(granularity=granularity, data=data)
-
 
 # ---------------------------------------------------------------------------
-# GET /rides/export  -  CSV export of rides
+# GET /rides/export  -  Ride export (CSV, Parquet, Arrow)
 # ---------------------------------------------------------------------------
 @router.get(
     "/rides/export",
     dependencies=[Depends(require_role(*REPORT_ROLES))],
 )
-async def export_rides_csv(
+async def export_rides(
     status_filter: Optional[str] = Query(None, alias="status"),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    export_format: str = Query("csv", alias="format", regex="^(csv|parquet|arrow)$"),
     current_user: User = Depends(get_current_user),
 ):
-    """Export rides as CSV file with optional filters."""
-    query = select(Ride).order_by(Ride.scheduled_at.desc())
-
-    if status_filter:
-        query = query.where(Ride.status == status_filter)
-    if date_from:
-        dt_from = datetime(date_from.year, date_from.month, date_from.day, tzinfo=timezone.utc)
-        query = query.where(Ride.scheduled_at >= dt_from)
-    if date_to:
-        dt_to = datetime(date_to.year, date_to.month, date_to.day, 23, 59, 59, tzinfo=timezone.utc)
-        query = query.where(Ride.scheduled_at <= dt_to)
-
-    result = await db.execute(query)
-    rides = result.scalars().all()
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        "ID", "ID Esterno", "Piattaforma", "Stato",
-        "Partenza", "Arrivo", "Data Prevista",
-        "Passeggero", "Telefono", "N. Passeggeri",
-        "Distanza (km)", "Durata (min)", "Prezzo", "Quota Driver",
-        "Volo", "Rif. Prenotazione", "Note",
-        "Creata il", "Aggiornata il",
-    ])
-
-    for ride in rides:
-        writer.writerow([
-            str(ride.id),
-            ride.external_id or "",
-            ride.source_platform,
-            ride.status.value if ride.status else "",
-            ride.pickup_address,
-            ride.dropoff_address,
-            ride.scheduled_at.strftime("%Y-%m-%d %H:%M") if ride.scheduled_at else "",
-            ride.passenger_name or "",
-            ride.passenger_phone or "",
-            ride.passenger_count,
-            ride.distance_km or "",
-            ride.duration_min or "",
-            float(ride.price) if ride.price else "",
-            float(ride.driver_share) if ride.driver_share else "",
-            ride.flight_number or "",
-            ride.booking_reference or "",
-            ride.notes or "",
-            ride.created_at.strftime("%Y-%m-%d %H:%M") if ride.created_at else "",
-            ride.updated_at.strftime("%Y-%m-%d %H:%M") if ride.updated_at else "",
-        ])
-
-    output.seek(0)
+    """Export rides as a CSV, Parquet or Arrow IPC stream file with optional
+    filters.
+
+    Streamed from a server-side cursor in batches (see
+    :mod:`app.services.export_service`): memory stays flat and the first
+    bytes go out immediately, whatever the number of rides.
+    """
+    if export_format != "csv" and not COLUMNAR_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet/Arrow export is not available on this server (pyarrow not installed)",
+        )
+
+    query = ride_export_query(status_filter, date_from, date_to)
+
+    async def body():
+        async with AsyncSessionLocal() as session:
+            async for chunk in iter_export(session, query, export_format):
+                yield chunk
+
+    media_type, extension = EXPORT_FORMATS[export_format]
     today_str = date.today().strftime("%Y%m%d")
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=aureavia-corse-{today_str}.csv"},
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=aureavia-corse-{today_str}.{extension}"},
+    )
+
+
+# ---------------------------------------------------------------------------
+# POST /jobs  -  Queue a background report job
+# ---------------------------------------------------------------------------
+@router.post(
+    "/jobs",
+    response_model=ReportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_role(*REPORT_ROLES))],
+)
+async def submit_report_job(
+    data: ReportJobCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Queue a heavy report (ride export or long-range earnings) to run in a
+    background worker. Poll ``GET /jobs/{id}`` until it is ``completed``,
+    then download the file from ``GET /jobs/{id}/download``.
+
+    At most ``REPORT_JOBS_MAX_ACTIVE_PER_USER`` jobs per user may be queued
+    or running at once (429 beyond that).
+    """
+    if data.kind == REPORT_KIND_EARNINGS:
+        date_to = data.date_to or date.today()
+        params = {
+            "granularity": data.granularity,
+            "date_from": (data.date_from or date_to - timedelta(days=30)).isoformat(),
+            "date_to": date_to.isoformat(),
+            "split_by": data.split_by,
+        }
+    else:
+        params = {
+            "status": data.status,
+            "date_from": data.date_from.isoformat() if data.date_from else None,
+            "date_to": data.date_to.isoformat() if data.date_to else None,
+        }
+
+    try:
+        job = await create_report_job(db, current_user.id, data.kind, params, data.format)
+    except ReportJobError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message)
+    # The worker must see the job: commit before publishing the task
+    await db.commit()
+
+    if not enqueue_report_job(job.id):
+        await fail_report_job(db, job.id, "Could not be queued")
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Report queue unavailable, retry later",
+        )
+    return job
+
+
+# ---------------------------------------------------------------------------
+# GET /jobs/{job_id}  -  Report job status
+# ---------------------------------------------------------------------------
+@router.get(
+    "/jobs/{job_id}",
+    response_model=ReportJobResponse,
+    dependencies=[Depends(require_role(*REPORT_ROLES))],
+)
+async def get_report_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return a report job of the current user (admins: any job)."""
+    return await _get_own_job(db, job_id, current_user)
+
+
+# ---------------------------------------------------------------------------
+# GET /jobs/{job_id}/download  -  Report job result file
+# ---------------------------------------------------------------------------
+@router.get(
+    "/jobs/{job_id}/download",
+    dependencies=[Depends(require_role(*REPORT_ROLES))],
+)
+async def download_report_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Download the result file of a completed report job."""
+    job = await _get_own_job(db, job_id, current_user)
+
+    if job.status == ReportJobStatus.EXPIRED:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Report has expired")
+    if job.status != ReportJobStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report is not ready (status: {job.status.value})",
+        )
+
+    path = report_file_path(job.file_name)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Report has expired")
+
+    created = job.created_at.strftime("%Y%m%d")
+    return FileResponse(
+        path,
+        media_type=report_media_type(job),
+        filename=f"aureavia-{job.kind.replace('_', '-')}-{created}{path.suffix}",
     )
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
+async def _get_own_job(db: AsyncSession, job_id: UUID, current_user: User) -> ReportJob:
+    """Load a report job visible to *current_user* (404 otherwise)."""
+    job = await db.get(ReportJob, job_id)
+    if job is None or (job.requested_by != current_user.id and current_user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found")
+    return job
+
+
+def _kpi_statement(now: datetime, period_days: int):
+    """Build the single statement computing every dashboard KPI.
+
+    Ride counts come from one pass over the rides of the combined window
+    (previous + current period, plus today's scheduled rides), each KPI a
+    conditional aggregate (``FILTER``) over the same rows. Revenue is summed
+    from the ``ride_daily_stats`` rollup by UTC calendar day (the current
+    period is the last `period_days` days including today), and the
+    all-time average rating comes from the per-driver rating aggregates.
+    """
+    current_start = now - timedelta(days=period_days)
+    previous_start = current_start - timedelta(days=period_days)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    today = now.date()
+
+    created_current = and_(Ride.created_at >= current_start, Ride.created_at < now)
+    created_previous = and_(Ride.created_at >= previous_start, Ride.created_at < current_start)
+    scheduled_today = and_(Ride.scheduled_at >= today_start, Ride.scheduled_at < now)
+
+    def revenue(first_day: date, last_day: date):
+        return (
+            select(func.coalesce(func.sum(RideDailyStat.revenue), 0))
+            .where(RideDailyStat.day >= first_day, RideDailyStat.day <= last_day)
+            .scalar_subquery()
+        )
+
+    return (
+        select(
+            func.count().filter(created_current).label("total_rides"),
+            func.count().filter(created_previous).label("previous_rides"),
+            # count(DISTINCT ...) ignores rides without a driver
+            func.count(func.distinct(Ride.driver_id)).filter(created_current).label("active_drivers"),
+            func.count().filter(scheduled_today).label("rides_today"),
+            revenue(today - timedelta(days=period_days - 1), today).label("total_revenue"),
+            revenue(
+                today - timedelta(days=2 * period_days - 1), today - timedelta(days=period_days)
+            ).label("previous_revenue"),
+            global_rating_avg().label("avg_rating"),
+        )
+        .where(
+            or_(
+                and_(Ride.created_at >= previous_start, Ride.created_at < now),
+                scheduled_today,
+            )
+        )
+    )
+
+
 def _calc_change_pct(current: float, previous: float) -> float:
     """Calculate percentage change between two values.
 
@@ -11,6 +11,10 @@ from app.schemas.ride import (
     RideResponse,
     RideListResponse,
     AssignRideRequest,
+    BulkAssignRequest,
+    BulkCancelRequest,
+    BulkRideOutcome,
+    BulkTransitionResponse,
 )
 from app.services.ride_service import (
     get_rides,
@@ -22,8 +26,12 @@ from app.services.ride_service import (
     start_ride,
     complete_ride,
     cancel_ride,
+    bulk_assign_rides,
+    bulk_cancel_rides,
+    BulkRideResult,
     RideServiceError,
 )
+from dataclasses import asdict
 from datetime import date
 from typing import Optional
 import uuid
@@ -36,6 +44,15 @@ class CancelRequest(BaseModel):
     notes: str | None = None
 
 
+def _bulk_response(results: list[BulkRideResult]) -> BulkTransitionResponse:
+    succeeded = sum(1 for r in results if r.success)
+    return BulkTransitionResponse(
+        results=[BulkRideOutcome(**asdict(r)) for r in results],
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
+
 def _handle_service_error(exc: RideServiceError):
     """Convert RideServiceError to HTTPException."""
     raise HTTPException(
@@ -285,3 +302,56 @@ async def cancel_ride_endpoint(
         _handle_service_error(exc)
 
     return updated
+
+
+# ---------------------------------------------------------------------------
+# POST /bulk/assign  -  Assign a batch of rides to one driver (admin / assistant only)
+# ---------------------------------------------------------------------------
+@router.post(
+    "/bulk/assign",
+    response_model=BulkTransitionResponse,
+    dependencies=[Depends(require_role(UserRole.ADMIN, UserRole.ASSISTANT))],
+)
+async def bulk_assign_rides_endpoint(
+    body: BulkAssignRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Assign several rides to the same driver. Returns a per-ride outcome;
+    rides that cannot be assigned are reported without failing the batch."""
+    try:
+        results = await bulk_assign_rides(
+            db=db,
+            ride_ids=body.ride_ids,
+            driver_id=body.driver_id,
+            assigned_by_id=current_user.id,
+        )
+    except RideServiceError as exc:
+        _handle_service_error(exc)
+
+    return _bulk_response(results)
+
+
+# ---------------------------------------------------------------------------
+# POST /bulk/cancel  -  Cancel a batch of rides (admin / assistant only)
+# ---------------------------------------------------------------------------
+@router.post(
+    "/bulk/cancel",
+    response_model=BulkTransitionResponse,
+    dependencies=[Depends(require_role(UserRole.ADMIN, UserRole.ASSISTANT))],
+)
+async def bulk_cancel_rides_endpoint(
+    body: BulkCancelRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Cancel several rides at once (e.g. a cancelled flight). Returns a
+    per-ride outcome; rides that cannot be cancelled are reported without
+    failing the batch."""
+    results = await bulk_cancel_rides(
+        db=db,
+        ride_ids=body.ride_ids,
+        cancelled_by_id=current_user.id,
+        notes=body.notes,
+    )
+    return _bulk_response(results)
@@ -28,6 +28,8 @@ from app.services.booking_service import (
     calculate_search_price,
     get_booking_config,
 )
+from app.services.ride_service import schedule_critical_check
+from app.services.rollup_service import record_cancelled_rides
 
 logger = logging.getLogger(__name__)
 
@@ -121,6 +123,7 @@ async def receive_booking(
     )
     db.add(ride)
     await db.flush()
+    schedule_critical_check(db, ride.id, ride.scheduled_at)
     return ride
 
 
@@ -267,6 +270,7 @@ async def booking_update(
     if payload.action == "CANCELLATION":
         old_status = ride.status
         ride.status = RideStatus.CANCELLED
+        ride.cancelled_at = now
         ride.updated_at = now
 
         history = RideHistory(
@@ -278,6 +282,8 @@ async def booking_update(
             notes=f"Cancelled by Booking.com: {payload.cancellationReason or 'No reason'}",
         )
         db.add(history)
+        await db.flush()
+        await record_cancelled_rides(db, [ride.id])
         logger.info("Booking %s cancelled by Booking.com", booking_reference)
 
     elif payload.action == "AMENDMENT":
@@ -300,6 +306,9 @@ async def booking_update(
                 )
             except ValueError:
                 pass
+            else:
+                if ride.status == RideStatus.TO_ASSIGN:
+                    schedule_critical_check(db, ride.id, ride.scheduled_at)
         if payload.services:
             ride.booking_services = [
                 {"name": s.name, "value": s.value} for s in payload.services
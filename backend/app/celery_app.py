@@ -1,17 +1,30 @@
 """Celery application configuration.
 
 Uses Redis as broker and result backend.
-Celery beat schedules periodic tasks (critical rides check every 5 min).
+Workers also deliver queued outbound emails (app.tasks.email_delivery).
+Celery beat schedules periodic tasks (critical rides reconciliation scan,
+unread-notification counter reconciliation, nightly notification purge,
+suspended-user sync for the stateless auth path, nightly rebuild of the
+daily ride rollup, hourly purge of expired report files).
+Background report jobs go to the "reports" queue, consumed by a dedicated
+worker (``celery worker -Q reports``) so they never delay the other tasks.
 """
 
 from celery import Celery
+from celery.schedules import crontab
 from app.config import settings
 
 celery_app = Celery(
     "aureavia",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=["app.tasks.critical_rides"],
+    include=[
+        "app.tasks.critical_rides",
+        "app.tasks.email_delivery",
+        "app.tasks.notifications",
+        "app.tasks.auth",
+        "app.tasks.reports",
+    ],
 )
 
 celery_app.conf.update(
@@ -21,10 +34,33 @@ celery_app.conf.update(
     accept_content=["json"],
     result_serializer="json",
     task_track_started=True,
+    task_routes={
+        "app.tasks.reports.run_report_job_task": {"queue": "reports"},
+    },
     beat_schedule={
         "check-critical-rides": {
             "task": "app.tasks.critical_rides.check_critical_rides_task",
-            "schedule": 300.0,  # Every 5 minutes
+            "schedule": float(settings.CRITICAL_RIDES_SCAN_INTERVAL_SECONDS),
+        },
+        "reconcile-unread-counters": {
+            "task": "app.tasks.notifications.reconcile_unread_counters_task",
+            "schedule": float(settings.NOTIFICATION_COUNTER_RECONCILE_SECONDS),
+        },
+        "sync-suspended-users": {
+            "task": "app.tasks.auth.sync_suspended_users_task",
+            "schedule": float(settings.AUTH_SUSPENSION_SYNC_SECONDS),
+        },
+        "purge-old-notifications": {
+            "task": "app.tasks.notifications.purge_old_notifications_task",
+            "schedule": crontab(hour=3, minute=30),
+        },
+        "reconcile-daily-stats": {
+            "task": "app.tasks.reports.reconcile_daily_stats_task",
+            "schedule": crontab(hour=2, minute=30),
+        },
+        "purge-report-jobs": {
+            "task": "app.tasks.reports.purge_report_jobs_task",
+            "schedule": crontab(minute=15),
         },
     },
 )
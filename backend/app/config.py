@@ -10,6 +10,41 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Password hashing: bcrypt work factor (existing hashes keep their own
+    # and still verify) and max concurrent hashes per API process
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_CONCURRENCY: int = 2
+    # One-time codes (2FA / password reset): HMAC key (defaults to a key
+    # derived from SECRET_KEY), wrong guesses allowed per code and how long
+    # recording a guess may wait on the user row lock before the check fails
+    OTP_SECRET: str = ""
+    OTP_MAX_ATTEMPTS: int = 5
+    OTP_LOCK_TIMEOUT_MS: int = 2000
+    # Stateless auth (opt-in): resolve the token's user from a per-process
+    # row cache (TTL / max entries) instead of a SELECT per request, checked
+    # against the Redis suspension set (rebuilt from the database every
+    # AUTH_SUSPENSION_SYNC_SECONDS) and per-user versions
+    AUTH_STATELESS: bool = False
+    AUTH_USER_CACHE_TTL_SECONDS: int = 30
+    AUTH_USER_CACHE_SIZE: int = 2048
+    AUTH_SUSPENSION_SYNC_SECONDS: int = 60
+    # Auth rate limiting: sliding window per client IP and per account on
+    # login / 2FA / password reset. RATE_LIMIT_TRUST_PROXY takes the client
+    # IP from X-Real-IP, only on requests whose peer address is in
+    # RATE_LIMIT_TRUSTED_PROXIES (IPs or CIDRs of the proxies that set it,
+    # e.g. nginx). LOCAL_MAX_KEYS bounds the in-process fallback used while
+    # Redis is unreachable
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_PROXY: bool = False
+    RATE_LIMIT_TRUSTED_PROXIES: list[str] = ["127.0.0.1", "::1"]
+    RATE_LIMIT_WINDOW_SECONDS: int = 300
+    RATE_LIMIT_LOGIN_PER_IP: int = 30
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: int = 10
+    RATE_LIMIT_2FA_PER_IP: int = 30
+    RATE_LIMIT_2FA_PER_ACCOUNT: int = 10
+    RATE_LIMIT_RESET_PER_IP: int = 10
+    RATE_LIMIT_RESET_PER_ACCOUNT: int = 5
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10000
 
     # Email (2FA)
     SMTP_HOST: str = "smtp.gmail.com"
@@ -17,9 +52,59 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     EMAIL_FROM: str = "noreply@aureavia.com"
+    SMTP_POOL_SIZE: int = 2
+    SMTP_IDLE_TIMEOUT_SECONDS: int = 60
+
+    # Outbound email queue (Celery)
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_MAX_RETRIES: int = 5
+    EMAIL_RETRY_BACKOFF_SECONDS: int = 30
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    # Socket timeout for cache lookups; on timeout callers fall back to the DB
+    REDIS_CACHE_TIMEOUT_SECONDS: float = 0.5
+
+    # Critical rides: interval of the reconciliation scan (delayed per-ride
+    # tasks flag rides on time; the scan only catches what they missed)
+    CRITICAL_RIDES_SCAN_INTERVAL_SECONDS: int = 900
+
+    # Notification digests: per-type window (seconds) during which events for
+    # the same recipient are folded into one unread digest row; 0 disables
+    NOTIFICATION_DIGEST_WINDOWS: dict[str, int] = {
+        "ride_accepted": 600,
+        "ride_critical": 600,
+    }
+    # Unread-notification counters in Redis: idle expiry and how often the
+    # warm ones are rewritten from the database
+    NOTIFICATION_COUNTER_TTL_SECONDS: int = 86400
+    NOTIFICATION_COUNTER_RECONCILE_SECONDS: int = 600
+    # Retention: read notifications (and broadcasts) older than this are
+    # deleted nightly, in batches of NOTIFICATION_PURGE_BATCH_SIZE rows
+    NOTIFICATION_RETENTION_DAYS: int = 90
+    NOTIFICATION_PURGE_BATCH_SIZE: int = 5000
+
+    # Reports: days of the ride_daily_stats rollup rebuilt from rides by the
+    # nightly reconcile (incremental updates keep it current in between)
+    REPORT_ROLLUP_RECONCILE_DAYS: int = 7
+    # Report response cache: TTL of cached dashboard / earnings responses
+    # (dropped on ride completion or cancellation) and size of the
+    # in-process fallback used while Redis is unreachable
+    REPORT_CACHE_TTL_SECONDS: int = 30
+    REPORT_CACHE_LOCAL_MAX_ENTRIES: int = 256
+    # Ride exports: rows fetched per server-side cursor batch, and rows per
+    # Parquet row group (Parquet/Arrow exports need the pyarrow package)
+    REPORT_EXPORT_BATCH_SIZE: int = 2000
+    REPORT_EXPORT_PARQUET_ROW_GROUP_SIZE: int = 100000
+    # Background report jobs (run on the "reports" Celery queue): directory
+    # of the result files (shared by the API and the reports worker) and how
+    # long they are kept, run time limit, and how many jobs may be queued or
+    # running per user and overall
+    REPORT_JOBS_DIR: str = "var/reports"
+    REPORT_JOBS_RETENTION_HOURS: int = 24
+    REPORT_JOBS_TIME_LIMIT_SECONDS: int = 1800
+    REPORT_JOBS_MAX_ACTIVE_PER_USER: int = 2
+    REPORT_JOBS_MAX_ACTIVE: int = 20
 
     # ETG Transfers API (we are the supplier)
     ETG_API_KEY: str = "etg-test-key-change-in-production"
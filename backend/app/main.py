@@ -3,6 +3,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import engine
+from app.utils.cache import close_redis
 
 
 @asynccontextmanager
@@ -10,6 +11,7 @@ async def lifespan(app: FastAPI):
     # Startup
     yield
     # Shutdown
+    await close_redis()
     await engine.dispose()
 
 
@@ -4,7 +4,10 @@ from app.models.driver import Driver
 from app.models.ride import Ride, RideStatus, RouteType
 from app.models.ride_history import RideHistory
 from app.models.review import Review
-from app.models.notification import Notification
+from app.models.ride_daily_stat import RideDailyStat
+from app.models.driver_monthly_stat import DriverMonthlyStat
+from app.models.report_job import ReportJob, ReportJobStatus
+from app.models.notification import Notification, BroadcastNotification, BroadcastRead, NotificationReadCursor
 
 __all__ = [
     "User",
@@ -18,5 +21,12 @@ __all__ = [
     "RouteType",
     "RideHistory",
     "Review",
+    "RideDailyStat",
+    "DriverMonthlyStat",
+    "ReportJob",
+    "ReportJobStatus",
     "Notification",
+    "BroadcastNotification",
+    "BroadcastRead",
+    "NotificationReadCursor",
 ]
@@ -39,6 +39,16 @@ class Driver(Base):
     total_rides: Mapped[int] = mapped_column(Integer, default=0)
     total_earnings: Mapped[float] = mapped_column(DECIMAL(12, 2), default=0.00)
 
+    # Ratings (updated on each review, see review_service): running sum and
+    # count behind rating_avg, and the number of reviews per star
+    rating_sum: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_1_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_2_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_3_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_4_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_5_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
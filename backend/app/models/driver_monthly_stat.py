@@ -0,0 +1,33 @@
+from sqlalchemy import Integer, Date, TIMESTAMP, DECIMAL, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime, date
+import uuid
+from app.database import Base
+
+
+class DriverMonthlyStat(Base):
+    """Completed rides, earnings (driver share) and km of a driver per UTC
+    calendar month of ``completed_at``.
+
+    Maintained on ride completion by :mod:`app.services.driver_stats_service`
+    so driver stats don't aggregate ``rides``; ``month`` is the first day of
+    the month.
+    """
+
+    __tablename__ = "driver_monthly_stats"
+
+    driver_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("drivers.id", ondelete="CASCADE"), primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    completed_rides: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    earnings: Mapped[float] = mapped_column(DECIMAL(12, 2), default=0, server_default="0", nullable=False)
+    distance_km: Mapped[float] = mapped_column(DECIMAL(12, 2), default=0, server_default="0", nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<DriverMonthlyStat {self.driver_id} {self.month:%Y-%m}>"
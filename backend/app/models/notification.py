@@ -1,8 +1,9 @@
-from sqlalchemy import String, TIMESTAMP, ForeignKey, Text
+from sqlalchemy import String, Integer, TIMESTAMP, ForeignKey, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 import uuid
 from app.database import Base
+from app.models.user import UserRole
 
 
 class Notification(Base):
@@ -17,9 +18,67 @@ class Notification(Base):
     read_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
     sent_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=datetime.utcnow, nullable=False)
 
+    # Digest coalescing: number of events folded into this row and the time
+    # the digest window opened (NULL for types that are never coalesced)
+    event_count: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+    first_sent_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="notifications")
     ride: Mapped["Ride"] = relationship("Ride", back_populates="notifications")
 
     def __repr__(self):
         return f"<Notification {self.id} - {self.type} for user {self.user_id}>"
+
+
+class BroadcastNotification(Base):
+    """A notification addressed to every user holding ``target_role``.
+
+    Stored once per event (fan-out on read): each user's read state is a
+    single :class:`NotificationReadCursor` timestamp rather than a row per
+    recipient, plus a :class:`BroadcastRead` row for each broadcast read
+    individually ahead of the cursor.
+    """
+
+    __tablename__ = "broadcast_notifications"
+    __table_args__ = (
+        Index("ix_broadcast_notifications_role_sent_at", "target_role", "sent_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    target_role: Mapped[UserRole] = mapped_column(SQLEnum(UserRole, name="user_role"), nullable=False)
+    type: Mapped[str] = mapped_column(String(50), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    body: Mapped[str | None] = mapped_column(Text)
+    ride_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("rides.id", ondelete="SET NULL"))
+    sent_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=datetime.utcnow, nullable=False)
+    event_count: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+    first_sent_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+
+    def __repr__(self):
+        return f"<BroadcastNotification {self.id} - {self.type} for role {self.target_role}>"
+
+
+class NotificationReadCursor(Base):
+    """Per-user read position in the broadcast stream: broadcasts sent at or
+    before ``broadcast_read_at`` count as read."""
+
+    __tablename__ = "notification_read_cursors"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    broadcast_read_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+
+
+class BroadcastRead(Base):
+    """A broadcast the user marked read individually while it was still
+    past their cursor. Rows are dropped once the cursor moves past
+    ``sent_at`` (a copy of the broadcast's)."""
+
+    __tablename__ = "broadcast_reads"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    broadcast_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("broadcast_notifications.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    sent_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    read_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
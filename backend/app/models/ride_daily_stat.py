@@ -0,0 +1,47 @@
+from sqlalchemy import String, Integer, BigInteger, Date, TIMESTAMP, DECIMAL, Index, Uuid, func
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime, date
+import uuid
+from app.database import Base
+
+
+class RideDailyStat(Base):
+    """Daily ride/revenue rollup per (day, source_platform, driver, company).
+
+    Completed rides count on the UTC day of ``completed_at``, cancelled rides
+    on the day they were cancelled. Rows are maintained incrementally by
+    :mod:`app.services.rollup_service` and rebuilt nightly from ``rides``,
+    so the table is derived data: driver and company ids are plain columns
+    (no foreign keys) and NULL means "no driver" / "no company".
+    """
+
+    __tablename__ = "ride_daily_stats"
+    __table_args__ = (
+        Index(
+            "uq_ride_daily_stats_key",
+            "day", "source_platform", "driver_id", "company_id",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    source_platform: Mapped[str] = mapped_column(String(100), nullable=False)
+    driver_id: Mapped[uuid.UUID | None] = mapped_column(Uuid)
+    company_id: Mapped[uuid.UUID | None] = mapped_column(Uuid)
+
+    completed_rides: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    cancelled_rides: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    revenue: Mapped[float] = mapped_column(DECIMAL(12, 2), default=0, server_default="0", nullable=False)
+    driver_share: Mapped[float] = mapped_column(DECIMAL(12, 2), default=0, server_default="0", nullable=False)
+    distance_km: Mapped[float] = mapped_column(DECIMAL(12, 2), default=0, server_default="0", nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<RideDailyStat {self.day} {self.source_platform} driver={self.driver_id}>"
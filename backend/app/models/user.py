@@ -1,4 +1,4 @@
-from sqlalchemy import String, TIMESTAMP, Enum as SQLEnum
+from sqlalchemy import String, Integer, TIMESTAMP, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 import uuid
@@ -36,6 +36,7 @@ class User(Base):
     )
     two_factor_code: Mapped[str | None] = mapped_column(String(255))
     two_factor_expires: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    two_factor_attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     fcm_token: Mapped[str | None] = mapped_column(String(255))
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
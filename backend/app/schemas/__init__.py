@@ -23,6 +23,7 @@ from app.schemas.company import (
 from app.schemas.driver import (
     DriverCreate,
     DriverUpdate,
+    DriverStatusUpdate,
     DriverResponse,
     DriverStats,
     DriverWithUserResponse,
@@ -35,11 +36,16 @@ from app.schemas.ride import (
     RideWithDriverResponse,
     RideListResponse,
     AssignRideRequest,
+    BulkAssignRequest,
+    BulkCancelRequest,
+    BulkRideOutcome,
+    BulkTransitionResponse,
 )
 from app.schemas.review import (
     ReviewCreate,
     ReviewResponse,
     ReviewWithRideResponse,
+    ReviewSummary,
 )
 from app.schemas.notification import (
     NotificationResponse,
@@ -49,6 +55,8 @@ from app.schemas.report import (
     EarningsDataPoint,
     EarningsReport,
     RideExportRow,
+    ReportJobCreate,
+    ReportJobResponse,
 )
 
 __all__ = [
@@ -73,6 +81,7 @@ __all__ = [
     # Driver
     "DriverCreate",
     "DriverUpdate",
+    "DriverStatusUpdate",
     "DriverResponse",
     "DriverStats",
     "DriverWithUserResponse",
@@ -84,10 +93,15 @@ __all__ = [
     "RideWithDriverResponse",
     "RideListResponse",
     "AssignRideRequest",
+    "BulkAssignRequest",
+    "BulkCancelRequest",
+    "BulkRideOutcome",
+    "BulkTransitionResponse",
     # Review
     "ReviewCreate",
     "ReviewResponse",
     "ReviewWithRideResponse",
+    "ReviewSummary",
     # Notification
     "NotificationResponse",
     # Report
@@ -95,4 +109,6 @@ __all__ = [
     "EarningsDataPoint",
     "EarningsReport",
     "RideExportRow",
+    "ReportJobCreate",
+    "ReportJobResponse",
 ]
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime, date
 from uuid import UUID
+from app.models.user import UserStatus
 
 
 class DriverBase(BaseModel):
@@ -41,6 +42,10 @@ class DriverUpdate(BaseModel):
     special_permits: list | dict | None = None
 
 
+class DriverStatusUpdate(BaseModel):
+    status: UserStatus
+
+
 class DriverResponse(DriverBase):
     id: UUID
     user_id: UUID
@@ -60,8 +65,10 @@ class DriverStats(BaseModel):
     total_earnings: float
     total_km: float
     rating_avg: float
+    rating_count: int = 0
     completed_this_month: int
     earnings_this_month: float
+    km_this_month: float = 0.0
 
 
 class DriverWithUserResponse(DriverResponse):
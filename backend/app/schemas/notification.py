@@ -12,5 +12,6 @@ class NotificationResponse(BaseModel):
     ride_id: UUID | None
     read_at: datetime | None
     sent_at: datetime
+    event_count: int = 1
 
     model_config = ConfigDict(from_attributes=True)
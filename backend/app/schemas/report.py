@@ -1,5 +1,9 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+from datetime import date, datetime
+from typing import Literal
+from uuid import UUID
+
+from app.models.report_job import ReportJobStatus
 
 
 class DashboardKPIs(BaseModel):
@@ -14,12 +18,18 @@ class DashboardKPIs(BaseModel):
 
 class EarningsDataPoint(BaseModel):
     date: str
-    amount: float
+    amount: float  # revenue
+    driver_share: float = 0.0
+    margin: float = 0.0  # revenue - driver_share
+    rides: int = 0
+    distance_km: float = 0.0
 
 
 class EarningsReport(BaseModel):
     granularity: str  # daily, weekly, monthly
     data: list[EarningsDataPoint]
+    # split_by=source_platform: the same series per platform (data = totals)
+    by_platform: dict[str, list[EarningsDataPoint]] | None = None
 
 
 class RideExportRow(BaseModel):
@@ -37,3 +47,29 @@ class RideExportRow(BaseModel):
     driver_share: float | None
     status: str
     source_platform: str
+
+
+class ReportJobCreate(BaseModel):
+    kind: Literal["rides_export", "earnings"]
+    format: Literal["csv", "parquet", "arrow", "json"] | None = None  # default: csv / json
+    status: str | None = None  # rides_export only
+    granularity: Literal["daily", "weekly", "monthly"] = "daily"  # earnings only
+    split_by: Literal["source_platform"] | None = None  # earnings only
+    date_from: date | None = None
+    date_to: date | None = None
+
+
+class ReportJobResponse(BaseModel):
+    id: UUID
+    kind: str
+    format: str
+    params: dict
+    status: ReportJobStatus
+    size_bytes: int | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+    expires_at: datetime | None
+
+    model_config = ConfigDict(from_attributes=True)
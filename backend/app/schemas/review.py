@@ -27,3 +27,10 @@ class ReviewResponse(ReviewBase):
 
 class ReviewWithRideResponse(ReviewResponse):
     ride_route: str | None = None
+
+
+class ReviewSummary(BaseModel):
+    driver_id: UUID
+    rating_avg: float
+    rating_count: int
+    distribution: dict[int, int]  # stars (1-5) -> number of reviews
@@ -88,3 +88,26 @@ class RideListResponse(BaseModel):
 
 class AssignRideRequest(BaseModel):
     driver_id: UUID
+
+
+class BulkAssignRequest(BaseModel):
+    ride_ids: list[UUID] = Field(min_length=1, max_length=500)
+    driver_id: UUID
+
+
+class BulkCancelRequest(BaseModel):
+    ride_ids: list[UUID] = Field(min_length=1, max_length=500)
+    notes: str | None = None
+
+
+class BulkRideOutcome(BaseModel):
+    ride_id: UUID
+    success: bool
+    status: RideStatus | None = None
+    error: str | None = None
+
+
+class BulkTransitionResponse(BaseModel):
+    results: list[BulkRideOutcome]
+    succeeded: int
+    failed: int
@@ -1,33 +1,26 @@
 import logging
-import random
-import string
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.user import User
 from app.utils.security import (
-    verify_password,
-    hash_password,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     create_temp_token,
 )
+from app.services.otp_service import OTP_LOGIN, issue_code, verify_code
 from app.utils.email import send_2fa_email
 
 logger = logging.getLogger(__name__)
 
 
-def generate_2fa_code() -> str:
-    """Generate a 6-digit 2FA code."""
-    return ''.join(random.choices(string.digits, k=6))
-
-
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
     """Authenticate a user by email and password."""
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not await verify_password_async(password, user.password_hash):
         return None
 
     return user
@@ -42,10 +35,7 @@ async def initiate_2fa(db: AsyncSession, user: User) -> bool:
 
     Returns True if the code was delivered successfully.
     """
-    code = generate_2fa_code()
-    user.two_factor_code = hash_password(code)  # Store hashed
-    user.two_factor_expires = datetime.now(timezone.utc) + timedelta(minutes=10)
-    await db.flush()
+    code = await issue_code(db, user, OTP_LOGIN, timedelta(minutes=10))
 
     sent = await send_2fa_email(user.email, code)
     if not sent:
@@ -54,19 +44,10 @@ async def initiate_2fa(db: AsyncSession, user: User) -> bool:
 
 
 async def verify_2fa_code(db: AsyncSession, user: User, code: str) -> bool:
-    """Verify the 2FA code provided by the user."""
-    if not user.two_factor_code or not user.two_factor_expires:
-        return False
-
-    if datetime.now(timezone.utc) > user.two_factor_expires:
-        return False
-
-    is_valid = verify_password(code, user.two_factor_code)
+    """Verify the 2FA code provided by the user (consumed on success)."""
+    is_valid = await verify_code(db, user, OTP_LOGIN, code)
 
     if is_valid:
-        # Clear the 2FA code after successful verification
-        user.two_factor_code = None
-        user.two_factor_expires = None
         user.last_login = datetime.now(timezone.utc)
         await db.flush()
 
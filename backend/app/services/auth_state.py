@@ -0,0 +1,124 @@
+"""User state for the stateless authentication path.
+
+With ``settings.AUTH_STATELESS`` enabled (off by default),
+:func:`app.api.deps.get_current_user` verifies the signed access token and
+resolves its user from a per-process row cache instead of querying the
+database on every request. This is a cache of ``User`` rows, not a
+principal built from the token's claims: endpoints read columns the token
+does not carry (names, ``created_at``, ...).
+
+- the cache holds detached snapshots of ``User`` rows for at most
+  ``AUTH_USER_CACHE_TTL_SECONDS``, so an active client costs at most one
+  ``SELECT`` per TTL per worker;
+- one Redis round trip per request checks the suspension set
+  ``auth:suspended`` and reads the user's version from ``auth:versions``.
+  :func:`publish_user_change` bumps the version after a change commits, so
+  every worker drops its snapshot on the next request instead of serving
+  a stale role or status until the TTL.
+
+The suspension set is rebuilt from the database by a periodic Celery task,
+which also picks up status changes made outside the API. If Redis is
+unreachable the snapshot's own ``status`` is the fallback check.
+"""
+
+import logging
+import time
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.user import User, UserStatus
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+_SUSPENDED_KEY = "auth:suspended"
+_VERSIONS_KEY = "auth:versions"
+
+# user id -> (expires at, version, detached snapshot); insertion order
+# doubles as age
+_user_cache: dict[str, tuple[float, str | None, User]] = {}
+
+
+def _snapshot(user: User) -> User:
+    """Copy the column values of *user* into a new, session-less instance."""
+    return User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+
+async def get_user_state(user_id: str) -> tuple[bool, str | None] | None:
+    """Return ``(suspended, version)`` of a user from Redis in one round
+    trip, or None if Redis is unavailable."""
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.sismember(_SUSPENDED_KEY, user_id)
+        pipe.hget(_VERSIONS_KEY, user_id)
+        suspended, version = await pipe.execute()
+    except Exception:
+        logger.warning("User state unavailable, relying on cached user status", exc_info=True)
+        return None
+    return bool(suspended), version
+
+
+async def get_cached_user(db: AsyncSession, user_id: str, version: str | None) -> User | None:
+    """Return the user's snapshot from the in-process cache, loading it on
+    a miss, after the TTL or when its *version* changed."""
+    now = time.monotonic()
+    entry = _user_cache.get(user_id)
+    if entry is not None and entry[0] > now and entry[1] == version:
+        return entry[2]
+
+    result = await db.execute(select(User).where(User.id == UUID(user_id)))
+    user = result.scalar_one_or_none()
+    if user is None:
+        _user_cache.pop(user_id, None)
+        return None
+
+    snapshot = _snapshot(user)
+    _user_cache.pop(user_id, None)
+    _user_cache[user_id] = (now + settings.AUTH_USER_CACHE_TTL_SECONDS, version, snapshot)
+    while len(_user_cache) > settings.AUTH_USER_CACHE_SIZE:
+        _user_cache.pop(next(iter(_user_cache)))
+    return snapshot
+
+
+async def publish_user_change(user_id: UUID, suspended: bool | None = None) -> None:
+    """Make every worker reload the user on its next request and, if
+    *suspended* is given, add or remove them from the suspension set.
+
+    Call after the change is committed.
+    """
+    _user_cache.pop(str(user_id), None)
+    try:
+        pipe = get_redis().pipeline(transaction=True)
+        if suspended is True:
+            pipe.sadd(_SUSPENDED_KEY, str(user_id))
+        elif suspended is False:
+            pipe.srem(_SUSPENDED_KEY, str(user_id))
+        pipe.hincrby(_VERSIONS_KEY, str(user_id), 1)
+        await pipe.execute()
+    except Exception:
+        logger.warning("Could not publish the change of user %s", user_id, exc_info=True)
+
+
+async def publish_suspension(user_id: UUID, suspended: bool) -> None:
+    """Add or remove a user from the suspension set and invalidate their
+    cached snapshot in every worker.
+
+    Call after the status change is committed.
+    """
+    await publish_user_change(user_id, suspended)
+
+
+async def sync_suspended_users(db: AsyncSession) -> int:
+    """Rebuild the suspension set from the database. Returns its size."""
+    result = await db.execute(select(User.id).where(User.status == UserStatus.SUSPENDED))
+    user_ids = [str(user_id) for user_id in result.scalars().all()]
+
+    pipe = get_redis().pipeline(transaction=True)
+    pipe.delete(_SUSPENDED_KEY)
+    if user_ids:
+        pipe.sadd(_SUSPENDED_KEY, *user_ids)
+    await pipe.execute()
+    return len(user_ids)
@@ -13,6 +13,7 @@ from sqlalchemy import select
 from app.models.booking_config import BookingConfig
 from app.models.ride import Ride, RideStatus
 from app.models.ride_history import RideHistory
+from app.services.ride_service import schedule_critical_check
 from app.schemas.booking import (
     BookingAPIBooking,
     BookingAcceptRejectRequest,
@@ -243,6 +244,7 @@ async def poll_new_bookings(db: AsyncSession) -> tuple[int, int]:
                 notes=f"Imported from Booking.com (ref: {booking.bookingReference})",
             )
             db.add(history)
+            schedule_critical_check(db, ride.id, ride.scheduled_at)
             new_count += 1
 
         # Update last sync time
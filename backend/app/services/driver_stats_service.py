@@ -0,0 +1,122 @@
+"""Per-driver ride stats: all-time totals and monthly counters.
+
+:func:`record_driver_completion` adds a completed ride to the driver's
+all-time totals (``drivers.total_rides`` / ``total_km`` /
+``total_earnings``) with one atomic ``UPDATE ... SET total = total + ...``:
+no read-modify-write, so concurrent completions for the same driver can't
+lose updates, and amounts stay exact ``NUMERIC`` arithmetic.
+
+Monthly counters live in ``driver_monthly_stats``: the driver stats
+endpoint reads the current month's completed rides, earnings (driver
+share) and km from one row instead of aggregating ``rides`` on every
+profile view.
+
+:func:`record_completed_ride_months` is called when rides complete and adds
+them to their month rows with one ``INSERT ... SELECT ... ON CONFLICT DO
+UPDATE``, in the same transaction as the status change.
+:func:`rebuild_driver_monthly_stats` recomputes months from ``rides``; the
+nightly report reconcile runs it over the current reconcile window and
+``rebuild_driver_stats.py`` over the whole history (backfill).
+
+Months are UTC calendar months of ``completed_at``.
+"""
+
+from datetime import date, datetime, time, timezone
+from uuid import UUID
+
+from sqlalchemy import Date, cast, delete, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.driver import Driver
+from app.models.driver_monthly_stat import DriverMonthlyStat
+from app.models.ride import Ride, RideStatus
+
+_KEY = ("driver_id", "month")
+_COUNTERS = ("completed_rides", "earnings", "distance_km")
+
+# Rendered inline so SELECT and GROUP BY use the same month expression
+_MONTH = literal_column("'month'")
+_UTC = literal_column("'UTC'")
+
+
+async def record_driver_completion(db: AsyncSession, driver_user_id: UUID, ride: Ride) -> None:
+    """Add the just-completed *ride* to the all-time totals of its driver
+    (identified by user id). Driver objects loaded in the session are not
+    refreshed."""
+    await db.execute(
+        update(Driver)
+        .where(Driver.user_id == driver_user_id)
+        .values(
+            total_rides=func.coalesce(Driver.total_rides, 0) + 1,
+            total_km=func.coalesce(Driver.total_km, 0) + (ride.distance_km or 0),
+            total_earnings=func.coalesce(Driver.total_earnings, 0) + (ride.driver_share or 0),
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _completed_months(*criteria):
+    month = cast(func.date_trunc(_MONTH, func.timezone(_UTC, Ride.completed_at)), Date)
+    return (
+        select(
+            Driver.id.label("driver_id"),
+            month.label("month"),
+            func.count().label("completed_rides"),
+            func.coalesce(func.sum(Ride.driver_share), 0).label("earnings"),
+            func.coalesce(func.sum(Ride.distance_km), 0).label("distance_km"),
+        )
+        .join(Driver, Driver.user_id == Ride.driver_id)
+        .where(Ride.status == RideStatus.COMPLETED, Ride.completed_at.is_not(None), *criteria)
+        .group_by(Driver.id, month)
+    )
+
+
+async def _add(db: AsyncSession, rows) -> None:
+    """Add the aggregated *rows* to the month rows, creating missing ones."""
+    stmt = pg_insert(DriverMonthlyStat).from_select(_KEY + _COUNTERS, rows)
+    table = DriverMonthlyStat.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(_KEY),
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in _COUNTERS},
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def record_completed_ride_months(db: AsyncSession, ride_ids: list[UUID]) -> None:
+    """Add just-completed rides to their drivers' month rows."""
+    if ride_ids:
+        await _add(db, _completed_months(Ride.id.in_(ride_ids)))
+
+
+async def get_month_stats(db: AsyncSession, driver_id: UUID, month: date) -> DriverMonthlyStat | None:
+    return await db.get(DriverMonthlyStat, (driver_id, month_start(month)))
+
+
+async def rebuild_driver_monthly_stats(db: AsyncSession, since: date | None = None) -> int:
+    """Recompute the month rows from ``rides`` for every month from the one
+    containing *since* (all months if None). Returns the number of rides
+    counted.
+    """
+    if since is None:
+        await db.execute(delete(DriverMonthlyStat))
+        criteria = ()
+    else:
+        first_month = month_start(since)
+        await db.execute(delete(DriverMonthlyStat).where(DriverMonthlyStat.month >= first_month))
+        criteria = (Ride.completed_at >= datetime.combine(first_month, time.min, tzinfo=timezone.utc),)
+
+    await _add(db, _completed_months(*criteria))
+
+    query = select(func.coalesce(func.sum(DriverMonthlyStat.completed_rides), 0))
+    if since is not None:
+        query = query.where(DriverMonthlyStat.month >= month_start(since))
+    return (await db.execute(query)).scalar_one()
@@ -34,6 +34,8 @@ from app.schemas.etg import (
     StatusResponse,
     TransferCategory,
 )
+from app.services.ride_service import schedule_critical_check
+from app.services.rollup_service import record_cancelled_rides
 
 
 class ETGServiceError(Exception):
@@ -376,6 +378,7 @@ async def book_transfer(request: BookRequest, db: AsyncSession) -> BookResponse:
 
     db.add(ride)
     await db.flush()
+    schedule_critical_check(db, ride.id, ride.scheduled_at)
 
     return BookResponse(
         order_id=order_id,
@@ -478,8 +481,10 @@ async def cancel_order(order_id: str, db: AsyncSession) -> CancelResponse:
             penalty_amount = float(ride.price) if ride.price else 0.0
 
     ride.status = RideStatus.CANCELLED
+    ride.cancelled_at = now
     ride.updated_at = now
     await db.flush()
+    await record_cancelled_rides(db, [ride.id])
 
     return CancelResponse(
         penalty=CancelPenalty(amount=penalty_amount, currency="EUR"),
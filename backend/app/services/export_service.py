@@ -0,0 +1,241 @@
+"""Ride exports streamed from a server-side cursor.
+
+Exports select only the exported columns and read them in batches of
+``REPORT_EXPORT_BATCH_SIZE`` rows (``yield_per`` over ``AsyncSession.stream``),
+so memory stays flat whatever the number of rows, and each batch is handed
+to the client as soon as it is formatted.
+
+Besides CSV, rides can be exported as Parquet or as an Arrow IPC stream for
+finance / BI tools: typed columns (UTC timestamps, fixed-point decimals for
+amounts and distances), zstd-compressed, written one record batch at a time.
+These formats need the optional ``pyarrow`` package; without it
+:data:`COLUMNAR_AVAILABLE` is False and only CSV is offered.
+
+The caller owns the session: the API opens a dedicated one inside the
+streaming response (request-scoped sessions are closed before the body is
+sent), workers use their task session.
+"""
+
+import csv
+import io
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.ride import Ride
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency: columnar export formats
+    pa = pq = None
+
+COLUMNAR_AVAILABLE = pa is not None
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+# (CSV header, column), in export order; columnar formats use the column keys
+EXPORT_COLUMNS = [
+    ("ID", Ride.id),
+    ("ID Esterno", Ride.external_id),
+    ("Piattaforma", Ride.source_platform),
+    ("Stato", Ride.status),
+    ("Partenza", Ride.pickup_address),
+    ("Arrivo", Ride.dropoff_address),
+    ("Data Prevista", Ride.scheduled_at),
+    ("Passeggero", Ride.passenger_name),
+    ("Telefono", Ride.passenger_phone),
+    ("N. Passeggeri", Ride.passenger_count),
+    ("Distanza (km)", Ride.distance_km),
+    ("Durata (min)", Ride.duration_min),
+    ("Prezzo", Ride.price),
+    ("Quota Driver", Ride.driver_share),
+    ("Volo", Ride.flight_number),
+    ("Rif. Prenotazione", Ride.booking_reference),
+    ("Note", Ride.notes),
+    ("Creata il", Ride.created_at),
+    ("Aggiornata il", Ride.updated_at),
+]
+
+
+def ride_export_query(
+    status_filter: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> Select:
+    """Select the exported columns of the rides matching the filters."""
+    query = select(*(column for _, column in EXPORT_COLUMNS)).order_by(Ride.scheduled_at.desc())
+
+    if status_filter:
+        query = query.where(Ride.status == status_filter)
+    if date_from:
+        dt_from = datetime(date_from.year, date_from.month, date_from.day, tzinfo=timezone.utc)
+        query = query.where(Ride.scheduled_at >= dt_from)
+    if date_to:
+        dt_to = datetime(date_to.year, date_to.month, date_to.day, 23, 59, 59, tzinfo=timezone.utc)
+        query = query.where(Ride.scheduled_at <= dt_to)
+
+    return query
+
+
+async def iter_batches(db: AsyncSession, query: Select) -> AsyncIterator[list[Any]]:
+    """Yield the rows of *query* in batches from a server-side cursor."""
+    result = await db.stream(
+        query.execution_options(yield_per=settings.REPORT_EXPORT_BATCH_SIZE)
+    )
+    async for rows in result.partitions():
+        yield rows
+
+
+def _timestamp(value: datetime | None) -> str:
+    return value.strftime("%Y-%m-%d %H:%M") if value else ""
+
+
+def _csv_row(row: Any) -> list:
+    return [
+        str(row.id),
+        row.external_id or "",
+        row.source_platform,
+        row.status.value if row.status else "",
+        row.pickup_address,
+        row.dropoff_address,
+        _timestamp(row.scheduled_at),
+        row.passenger_name or "",
+        row.passenger_phone or "",
+        row.passenger_count,
+        row.distance_km or "",
+        row.duration_min or "",
+        float(row.price) if row.price else "",
+        float(row.driver_share) if row.driver_share else "",
+        row.flight_number or "",
+        row.booking_reference or "",
+        row.notes or "",
+        _timestamp(row.created_at),
+        _timestamp(row.updated_at),
+    ]
+
+
+async def iter_csv(db: AsyncSession, query: Select) -> AsyncIterator[str]:
+    """Yield the export as CSV text: the header, then one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    yield buffer.getvalue()
+
+    async for rows in iter_batches(db, query):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_csv_row(row) for row in rows)
+        yield buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Columnar formats (pyarrow)
+# ---------------------------------------------------------------------------
+
+def _arrow_schema() -> "pa.Schema":
+    timestamp = pa.timestamp("us", tz="UTC")
+    types = {
+        "scheduled_at": timestamp,
+        "created_at": timestamp,
+        "updated_at": timestamp,
+        "passenger_count": pa.int32(),
+        "duration_min": pa.int32(),
+        "distance_km": pa.decimal128(8, 2),
+        "price": pa.decimal128(10, 2),
+        "driver_share": pa.decimal128(10, 2),
+    }
+    return pa.schema([(column.key, types.get(column.key, pa.string())) for _, column in EXPORT_COLUMNS])
+
+
+def _record_batch(rows: list[Any], schema: "pa.Schema") -> "pa.RecordBatch":
+    columns = {field.name: [] for field in schema}
+    for row in rows:
+        for name, values in columns.items():
+            values.append(getattr(row, name))
+    columns["id"] = [str(value) for value in columns["id"]]
+    columns["status"] = [value.value if value else None for value in columns["status"]]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(columns[field.name], type=field.type) for field in schema],
+        schema=schema,
+    )
+
+
+class _DrainingSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last
+    :meth:`drain` while reporting the absolute position (writers record
+    offsets in the file footer)."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def iter_columnar(db: AsyncSession, query: Select, export_format: str) -> AsyncIterator[bytes]:
+    """Yield the export as Parquet or Arrow IPC stream bytes.
+
+    Arrow writes one record batch per cursor batch. Parquet buffers batches
+    into row groups of ``REPORT_EXPORT_PARQUET_ROW_GROUP_SIZE`` rows, the
+    unit its compression and readers work on.
+    """
+    schema = _arrow_schema()
+    sink = _DrainingSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    pending: list[pa.RecordBatch] = []
+    pending_rows = 0
+    try:
+        async for rows in iter_batches(db, query):
+            batch = _record_batch(rows, schema)
+            if export_format != "parquet":
+                writer.write_batch(batch)
+            else:
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows < settings.REPORT_EXPORT_PARQUET_ROW_GROUP_SIZE:
+                    continue
+                writer.write_table(pa.Table.from_batches(pending))
+                pending, pending_rows = [], 0
+            yield sink.drain()
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_export(db: AsyncSession, query: Select, export_format: str) -> AsyncIterator[str | bytes]:
+    """Yield the export in *export_format* (a key of :data:`EXPORT_FORMATS`)."""
+    if export_format == "csv":
+        return iter_csv(db, query)
+    return iter_columnar(db, query, export_format)
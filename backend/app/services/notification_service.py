@@ -0,0 +1,821 @@
+"""In-app notification delivery.
+
+Notifications for a notification ``type`` that has a :class:`DigestPolicy`
+are coalesced: while a recipient still has an unread row of that type whose
+digest window is open, new events are folded into it (``event_count`` is
+bumped and the text becomes a summary) instead of adding one row per event.
+A burst of 50 critical rides therefore leaves each admin with one
+"50 corse critiche" digest rather than 50 rows.
+
+Windows are configured per type in ``settings.NOTIFICATION_DIGEST_WINDOWS``;
+types without a policy, or with a window of 0, are written one row per
+event as before.
+
+Notifications addressed to a whole role (admin / assistant alerts) are
+stored once per event in ``broadcast_notifications`` and fanned out on
+read: each user keeps a single read cursor, plus a ``broadcast_reads`` row
+for each broadcast read individually ahead of it, and the list /
+unread-count endpoints merge the personal and broadcast streams.
+
+Unread counts are served from Redis counters maintained incrementally on
+insert and mark-read, see the "Unread counters" section below.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, update, insert, delete, func, case, and_, literal, union_all, TIMESTAMP, Uuid
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.notification import BroadcastNotification, BroadcastRead, Notification, NotificationReadCursor
+from app.models.user import User, UserRole
+from app.utils.background import batch_after_commit
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+# Roles that receive operational alerts (ride accepted, ride critical, ...)
+STAFF_ROLES = (UserRole.ADMIN, UserRole.ASSISTANT)
+
+
+class DigestPolicy:
+    """Summary text used once events of one type are coalesced.
+
+    *body* must contain a ``{count}`` placeholder; it is split once here so
+    the running total can be spliced in by the database on update.
+    """
+
+    def __init__(self, title: str, body: str):
+        self.title = title
+        self.body_prefix, _, self.body_suffix = body.partition("{count}")
+
+    def body(self, count: int) -> str:
+        return f"{self.body_prefix}{count}{self.body_suffix}"
+
+
+DIGEST_POLICIES: dict[str, DigestPolicy] = {
+    "ride_accepted": DigestPolicy(
+        title="Corse accettate",
+        body="{count} corse sono state accettate dai driver.",
+    ),
+    "ride_critical": DigestPolicy(
+        title="Corse critiche",
+        body="{count} corse non ancora assegnate sono diventate critiche.",
+    ),
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _digest_window(notification_type: str) -> timedelta | None:
+    if notification_type not in DIGEST_POLICIES:
+        return None
+    seconds = settings.NOTIFICATION_DIGEST_WINDOWS.get(notification_type, 0)
+    return timedelta(seconds=seconds) if seconds > 0 else None
+
+
+async def _deliver(
+    db: AsyncSession,
+    model: type[Notification] | type[BroadcastNotification],
+    recipient_key: str,
+    recipients: list[Any],
+    notification_type: str,
+    events: list[dict],
+    *open_digest: Any,
+) -> tuple[list[dict], list[Any]]:
+    """Write *events* of one type for each recipient in *recipients*.
+
+    *recipient_key* is the column addressing a recipient (``user_id`` for
+    personal notifications, ``target_role`` for broadcasts) and
+    *open_digest* extra criteria a row must meet to still absorb events.
+
+    Without a digest window this is one bulk ``INSERT`` of
+    ``len(recipients) * len(events)`` rows. With one, open digests are
+    extended with a single ``UPDATE ... RETURNING`` and only recipients
+    without an open digest get a new row: the original event if there is
+    just one, otherwise a digest covering the whole batch.
+
+    Returns the inserted rows and the ``(recipient, id, sent_at)`` of the
+    digests that absorbed the events.
+    """
+    recipients = list(dict.fromkeys(recipients))
+    if not recipients or not events:
+        return [], []
+
+    now = _now()
+    window = _digest_window(notification_type)
+    recipient = getattr(model, recipient_key)
+
+    if window is None:
+        rows = [
+            {
+                "id": uuid4(),
+                recipient_key: value,
+                "type": notification_type,
+                "title": event["title"],
+                "body": event["body"],
+                "ride_id": event.get("ride_id"),
+                "sent_at": now,
+            }
+            for value in recipients
+            for event in events
+        ]
+        await db.execute(insert(model), rows)
+        return rows, []
+
+    policy = DIGEST_POLICIES[notification_type]
+    count = len(events)
+    total = model.event_count + count
+
+    result = await db.execute(
+        update(model)
+        .where(
+            recipient.in_(recipients),
+            model.type == notification_type,
+            func.coalesce(model.first_sent_at, model.sent_at) >= now - window,
+            *open_digest,
+        )
+        .values(
+            event_count=total,
+            title=policy.title,
+            body=func.concat(policy.body_prefix, total, policy.body_suffix),
+            ride_id=None,
+            sent_at=now,
+        )
+        .returning(recipient, model.id, model.sent_at)
+        .execution_options(synchronize_session=False)
+    )
+    coalesced = [tuple(row) for row in result.all()]
+    absorbed = {value for value, _, _ in coalesced}
+
+    pending = [value for value in recipients if value not in absorbed]
+    if not pending:
+        return [], coalesced
+
+    if count == 1:
+        row = {
+            "title": events[0]["title"],
+            "body": events[0]["body"],
+            "ride_id": events[0].get("ride_id"),
+        }
+    else:
+        row = {"title": policy.title, "body": policy.body(count), "ride_id": None}
+
+    rows = [
+        {
+            "id": uuid4(),
+            recipient_key: value,
+            "type": notification_type,
+            "event_count": count,
+            "sent_at": now,
+            "first_sent_at": now,
+            **row,
+        }
+        for value in pending
+    ]
+    await db.execute(insert(model), rows)
+    return rows, coalesced
+
+
+async def add_notifications(db: AsyncSession, rows: list[dict]) -> None:
+    """Insert personal notification rows (``user_id``, ``type``, ``title``,
+    ``body``, optional ``ride_id``) as-is, with one bulk ``INSERT``.
+
+    For notifications that are never coalesced, e.g. a driver's own
+    assignment or cancellation notices.
+    """
+    if not rows:
+        return
+    now = _now()
+    rows = [{"ride_id": None, "sent_at": now, **row} for row in rows]
+    await db.execute(insert(Notification), rows)
+    _queue_cache_update(db, unread=Counter(row["user_id"] for row in rows))
+
+
+async def notify_users(
+    db: AsyncSession,
+    user_ids: list[UUID],
+    notification_type: str,
+    events: list[dict],
+) -> None:
+    """Deliver *events* (dicts with ``title``, ``body`` and optional
+    ``ride_id``) of one type to every user in *user_ids*, one personal row
+    per user (or one digest, see :func:`_deliver`).
+
+    A digest only absorbs events while it is unread.
+    """
+    inserted, _ = await _deliver(
+        db, Notification, "user_id", user_ids, notification_type, events,
+        Notification.read_at.is_(None),
+    )
+    _queue_cache_update(db, unread=Counter(row["user_id"] for row in inserted))
+
+
+async def notify_roles(
+    db: AsyncSession,
+    roles: tuple[UserRole, ...],
+    notification_type: str,
+    events: list[dict],
+) -> None:
+    """Broadcast *events* to every user holding one of *roles*.
+
+    One row per event per role, however many users hold the role: each
+    user's read state is tracked by their broadcast cursor. A digest only
+    absorbs events until one of its recipients has read it.
+    """
+    read_by_cursor = (
+        select(NotificationReadCursor.user_id)
+        .join(User, User.id == NotificationReadCursor.user_id)
+        .where(
+            User.role == BroadcastNotification.target_role,
+            NotificationReadCursor.broadcast_read_at >= BroadcastNotification.sent_at,
+        )
+        .exists()
+    )
+    read_individually = select(BroadcastRead.user_id).where(
+        BroadcastRead.broadcast_id == BroadcastNotification.id
+    ).exists()
+    inserted, coalesced = await _deliver(
+        db, BroadcastNotification, "target_role", list(roles), notification_type, events,
+        ~read_by_cursor, ~read_individually,
+    )
+    _queue_cache_update(
+        db,
+        broadcasts=[(row["target_role"], row["id"], row["sent_at"]) for row in inserted] + coalesced,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Reading: personal and broadcast streams merged
+# ---------------------------------------------------------------------------
+
+async def get_broadcast_cursor(db: AsyncSession, user: User) -> datetime:
+    """Return the user's broadcast read position.
+
+    Users without a cursor have read everything sent before they joined.
+    """
+    result = await db.execute(
+        select(NotificationReadCursor.broadcast_read_at)
+        .where(NotificationReadCursor.user_id == user.id)
+    )
+    cursor = result.scalar_one_or_none()
+    if cursor is not None:
+        return cursor
+    created_at = user.created_at
+    return created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)
+
+
+async def advance_broadcast_cursor(db: AsyncSession, user_id: UUID, read_at: datetime) -> None:
+    """Move the user's broadcast cursor forward to *read_at* (never back),
+    dropping the individual reads it now covers."""
+    stmt = pg_insert(NotificationReadCursor).values(user_id=user_id, broadcast_read_at=read_at)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[NotificationReadCursor.user_id],
+            set_={
+                "broadcast_read_at": func.greatest(
+                    NotificationReadCursor.broadcast_read_at,
+                    stmt.excluded.broadcast_read_at,
+                )
+            },
+        )
+    )
+    await db.execute(
+        delete(BroadcastRead)
+        .where(BroadcastRead.user_id == user_id, BroadcastRead.sent_at <= read_at)
+        .execution_options(synchronize_session=False)
+    )
+    _queue_cache_update(db, cursors={user_id: read_at})
+
+
+async def mark_broadcast_read(db: AsyncSession, user: User, broadcast: BroadcastNotification) -> datetime:
+    """Mark *broadcast* as read for the user and return its ``read_at``.
+
+    Broadcasts up to the cursor are already read. A newer one gets its own
+    ``broadcast_reads`` row: moving the cursor instead would also mark
+    every older unread broadcast as read.
+    """
+    cursor = await get_broadcast_cursor(db, user)
+    if broadcast.sent_at <= cursor:
+        return cursor
+
+    stmt = pg_insert(BroadcastRead).values(
+        user_id=user.id, broadcast_id=broadcast.id, sent_at=broadcast.sent_at, read_at=_now()
+    )
+    result = await db.execute(
+        stmt.on_conflict_do_nothing(index_elements=[BroadcastRead.user_id, BroadcastRead.broadcast_id])
+        .returning(BroadcastRead.read_at)
+    )
+    read_at = result.scalar_one_or_none()
+    if read_at is not None:
+        _queue_cache_update(db, reads=[(user.id, broadcast.id, broadcast.sent_at)])
+        return read_at
+
+    # Already read individually
+    result = await db.execute(
+        select(BroadcastRead.read_at).where(
+            BroadcastRead.user_id == user.id, BroadcastRead.broadcast_id == broadcast.id
+        )
+    )
+    return result.scalar_one()
+
+
+async def mark_read(db: AsyncSession, user: User, notification_id: UUID) -> Notification | None:
+    """Mark one of the user's unread personal notifications as read with a
+    single conditional ``UPDATE ... RETURNING``.
+
+    Returns None when nothing was updated (already read, someone else's,
+    a broadcast or missing); the caller tells those apart.
+    """
+    result = await db.execute(
+        update(Notification)
+        .where(
+            Notification.id == notification_id,
+            Notification.user_id == user.id,
+            Notification.read_at.is_(None),
+        )
+        .values(read_at=_now())
+        .returning(Notification)
+        .execution_options(synchronize_session=False)
+    )
+    notification = result.scalar_one_or_none()
+    if notification is not None:
+        _queue_cache_update(db, unread=Counter({user.id: -1}))
+    return notification
+
+
+async def mark_all_read(db: AsyncSession, user: User, before: datetime | None = None) -> int:
+    """Mark every personal notification and broadcast sent up to *before*
+    (default: now) as read.
+
+    One ``UPDATE`` for the personal rows plus one cursor upsert for the
+    broadcasts. Returns the number of personal notifications updated.
+    """
+    now = _now()
+    if before is not None and before.tzinfo is None:
+        before = before.replace(tzinfo=timezone.utc)
+    until = min(before, now) if before is not None else now
+
+    result = await db.execute(
+        update(Notification)
+        .where(
+            Notification.user_id == user.id,
+            Notification.read_at.is_(None),
+            Notification.sent_at <= until,
+        )
+        .values(read_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    await advance_broadcast_cursor(db, user.id, until)
+
+    marked = result.rowcount or 0
+    if marked:
+        _queue_cache_update(db, unread=Counter({user.id: -marked}))
+    return marked
+
+
+def _personal_stream(user: User, unread_only: bool):
+    stmt = select(
+        Notification.id,
+        Notification.user_id,
+        Notification.type,
+        Notification.title,
+        Notification.body,
+        Notification.ride_id,
+        Notification.read_at,
+        Notification.sent_at,
+        Notification.event_count,
+    ).where(Notification.user_id == user.id)
+    if unread_only:
+        stmt = stmt.where(Notification.read_at.is_(None))
+    return stmt
+
+
+def _broadcast_stream(user: User, cursor: datetime, unread_only: bool):
+    cursor_at = literal(cursor, TIMESTAMP(timezone=True))
+    stmt = select(
+        BroadcastNotification.id,
+        literal(user.id, Uuid).label("user_id"),
+        BroadcastNotification.type,
+        BroadcastNotification.title,
+        BroadcastNotification.body,
+        BroadcastNotification.ride_id,
+        case((BroadcastNotification.sent_at <= cursor_at, cursor_at), else_=BroadcastRead.read_at).label("read_at"),
+        BroadcastNotification.sent_at,
+        BroadcastNotification.event_count,
+    ).outerjoin(
+        BroadcastRead,
+        and_(BroadcastRead.broadcast_id == BroadcastNotification.id, BroadcastRead.user_id == user.id),
+    ).where(BroadcastNotification.target_role == user.role)
+    if unread_only:
+        stmt = stmt.where(BroadcastNotification.sent_at > cursor_at, BroadcastRead.broadcast_id.is_(None))
+    return stmt
+
+
+async def list_notifications(
+    db: AsyncSession,
+    user: User,
+    unread_only: bool = False,
+    page: int = 1,
+    page_size: int = 50,
+) -> list[Any]:
+    """Return one page of the user's personal notifications and the
+    broadcasts for their role, newest first, as a single ``UNION ALL``.
+
+    Broadcast rows carry the requesting user's id and a ``read_at`` derived
+    from their cursor or individual read, so both kinds share the same
+    response shape.
+    """
+    cursor = await get_broadcast_cursor(db, user)
+    merged = union_all(
+        _personal_stream(user, unread_only),
+        _broadcast_stream(user, cursor, unread_only),
+    ).subquery()
+
+    result = await db.execute(
+        select(merged)
+        .order_by(merged.c.sent_at.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
+    return result.all()
+
+
+async def _count_unread_db(db: AsyncSession, user: User) -> tuple[int, int, datetime]:
+    """Count unread notifications in the database.
+
+    Returns ``(personal, broadcast, cursor)``.
+    """
+    cursor = await get_broadcast_cursor(db, user)
+    personal = (
+        select(func.count(Notification.id))
+        .where(Notification.user_id == user.id, Notification.read_at.is_(None))
+        .scalar_subquery()
+    )
+    broadcast = (
+        select(func.count(BroadcastNotification.id))
+        .where(
+            BroadcastNotification.target_role == user.role,
+            BroadcastNotification.sent_at > literal(cursor, TIMESTAMP(timezone=True)),
+            ~select(BroadcastRead.broadcast_id)
+            .where(BroadcastRead.broadcast_id == BroadcastNotification.id, BroadcastRead.user_id == user.id)
+            .exists(),
+        )
+        .scalar_subquery()
+    )
+    result = await db.execute(select(personal, broadcast))
+    personal_count, broadcast_count = result.one()
+    return personal_count or 0, broadcast_count or 0, cursor
+
+
+async def count_unread(db: AsyncSession, user: User) -> int:
+    """Unread personal notifications plus broadcasts past the cursor.
+
+    Served from the Redis counters (one script call) when they are warm;
+    otherwise counted in the database and used to prime them.
+    """
+    cached = await _cached_unread(user)
+    if cached is not None:
+        return cached
+
+    personal, broadcast, cursor = await _count_unread_db(db, user)
+    await _prime_unread(db, user, personal, cursor)
+    return personal + broadcast
+
+
+async def get_broadcast(db: AsyncSession, user: User, notification_id: UUID) -> BroadcastNotification | None:
+    """Return a broadcast addressed to the user's role, or None."""
+    result = await db.execute(
+        select(BroadcastNotification).where(
+            BroadcastNotification.id == notification_id,
+            BroadcastNotification.target_role == user.role,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+# ---------------------------------------------------------------------------
+# Retention
+# ---------------------------------------------------------------------------
+
+async def purge_read_notifications(db: AsyncSession, cutoff: datetime, batch_size: int) -> int:
+    """Delete up to *batch_size* read personal notifications sent before
+    *cutoff*. Unread ones are kept whatever their age.
+
+    Deleting a bounded batch per statement keeps locks and WAL bursts
+    short; callers commit and repeat until fewer than *batch_size* rows
+    come back.
+    """
+    batch = (
+        select(Notification.id)
+        .where(Notification.read_at.is_not(None), Notification.sent_at < cutoff)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        delete(Notification)
+        .where(Notification.id.in_(batch))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+async def purge_broadcasts(db: AsyncSession, cutoff: datetime, batch_size: int) -> int:
+    """Delete up to *batch_size* broadcasts sent before *cutoff*.
+
+    Broadcast read state lives in per-user cursors, so old broadcasts are
+    dropped by age alone. Their entries in the Redis index are trimmed by
+    :func:`trim_broadcast_index`.
+    """
+    batch = (
+        select(BroadcastNotification.id)
+        .where(BroadcastNotification.sent_at < cutoff)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        delete(BroadcastNotification)
+        .where(BroadcastNotification.id.in_(batch))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+async def trim_broadcast_index(cutoff: datetime) -> None:
+    """Drop purged broadcasts from the Redis indexes (keeps the sentinel)."""
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for role in UserRole:
+            pipe.zremrangebyscore(_BROADCASTS_KEY.format(role.value), "(0", cutoff.timestamp())
+        await pipe.execute()
+    except Exception:
+        logger.warning("Could not trim broadcast indexes", exc_info=True)
+
+
+# ---------------------------------------------------------------------------
+# Unread counters (Redis)
+# ---------------------------------------------------------------------------
+#
+# Per user, ``notifications:unread:<id>`` holds the personal unread count and
+# ``notifications:cursor:<id>`` the broadcast cursor as an epoch timestamp.
+# Per role, ``notifications:broadcasts:<role>`` is a sorted set of broadcast
+# ids scored by ``sent_at`` (plus a sentinel, so an empty set still exists);
+# per user, ``notifications:reads:<id>`` holds the broadcasts read
+# individually, scored the same way (also with a sentinel). The unread count
+# is personal + ZCOUNT(broadcasts, (cursor, +inf]) - ZCOUNT(reads, (cursor,
+# +inf]), computed server-side; reads the cursor has passed are trimmed.
+#
+# Writes are queued on the session and applied after commit, so a rolled
+# back transaction never touches the counters. Counter updates only apply
+# to keys that exist: a cold user is primed from the database on their next
+# read. Lost updates (Redis blip, crash between commit and apply) are
+# corrected by :func:`reconcile_unread_counters`.
+
+_UNREAD_KEY = "notifications:unread:{}"
+_CURSOR_KEY = "notifications:cursor:{}"
+_BROADCASTS_KEY = "notifications:broadcasts:{}"
+_READS_KEY = "notifications:reads:{}"
+_SENTINEL = "-"
+_PENDING_KEY = "notification_cache_updates"
+
+_READ_UNREAD = """
+local personal = redis.call('GET', KEYS[1])
+local cursor = redis.call('GET', KEYS[2])
+if not personal or not cursor or redis.call('EXISTS', KEYS[3]) == 0 or redis.call('EXISTS', KEYS[4]) == 0 then
+    return -1
+end
+return tonumber(personal)
+    + redis.call('ZCOUNT', KEYS[3], '(' .. cursor, '+inf')
+    - redis.call('ZCOUNT', KEYS[4], '(' .. cursor, '+inf')
+"""
+
+_ADD_UNREAD = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        if redis.call('INCRBY', key, ARGV[i]) < 0 then
+            redis.call('SET', key, 0, 'KEEPTTL')
+        end
+    end
+end
+"""
+
+# ARGV: score and member of each key's read
+_ADD_READS = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('ZADD', key, ARGV[2 * i - 1], ARGV[2 * i])
+    end
+end
+"""
+
+_ADVANCE_CURSOR = """
+for i, key in ipairs(KEYS) do
+    local current = redis.call('GET', key)
+    if current and tonumber(current) < tonumber(ARGV[i]) then
+        redis.call('SET', key, ARGV[i], 'KEEPTTL')
+    end
+end
+"""
+
+def _score(moment: datetime) -> str:
+    return repr(moment.timestamp())
+
+
+def _queue_cache_update(
+    db: AsyncSession,
+    unread: Counter | None = None,
+    cursors: dict[UUID, datetime] | None = None,
+    broadcasts: list[tuple[UserRole, UUID, datetime]] | None = None,
+    reads: list[tuple[UUID, UUID, datetime]] | None = None,
+) -> None:
+    """Record counter changes to apply once the session commits."""
+    pending = batch_after_commit(
+        db,
+        _PENDING_KEY,
+        lambda: {"unread": Counter(), "cursors": {}, "broadcasts": [], "reads": []},
+        _apply_cache_update,
+    )
+
+    if unread:
+        pending["unread"].update(unread)
+    if cursors:
+        for user_id, read_at in cursors.items():
+            current = pending["cursors"].get(user_id)
+            pending["cursors"][user_id] = max(current, read_at) if current else read_at
+    if broadcasts:
+        pending["broadcasts"].extend(broadcasts)
+    if reads:
+        pending["reads"].extend(reads)
+
+
+async def _apply_cache_update(pending: dict) -> None:
+    unread = {user_id: delta for user_id, delta in pending["unread"].items() if delta}
+    cursors = pending["cursors"]
+    broadcasts = pending["broadcasts"]
+    reads = pending["reads"]
+    try:
+        redis = get_redis()
+        pipe = redis.pipeline(transaction=False)
+        if unread:
+            pipe.eval(
+                _ADD_UNREAD,
+                len(unread),
+                *[_UNREAD_KEY.format(user_id) for user_id in unread],
+                *unread.values(),
+            )
+        if cursors:
+            pipe.eval(
+                _ADVANCE_CURSOR,
+                len(cursors),
+                *[_CURSOR_KEY.format(user_id) for user_id in cursors],
+                *[_score(read_at) for read_at in cursors.values()],
+            )
+            for user_id, read_at in cursors.items():
+                pipe.zremrangebyscore(_READS_KEY.format(user_id), "(0", read_at.timestamp())
+        if reads:
+            pipe.eval(
+                _ADD_READS,
+                len(reads),
+                *[_READS_KEY.format(user_id) for user_id, _, _ in reads],
+                *[value for _, broadcast_id, sent_at in reads for value in (_score(sent_at), str(broadcast_id))],
+            )
+        for role, broadcast_id, sent_at in broadcasts:
+            pipe.zadd(_BROADCASTS_KEY.format(role.value), {str(broadcast_id): sent_at.timestamp()})
+        await pipe.execute()
+    except Exception:
+        logger.warning("Could not update notification counters", exc_info=True)
+
+
+async def _cached_unread(user: User) -> int | None:
+    try:
+        count = await get_redis().eval(
+            _READ_UNREAD,
+            4,
+            _UNREAD_KEY.format(user.id),
+            _CURSOR_KEY.format(user.id),
+            _BROADCASTS_KEY.format(user.role.value),
+            _READS_KEY.format(user.id),
+        )
+    except Exception:
+        logger.warning("Unread counter lookup failed, counting in the database", exc_info=True)
+        return None
+    count = int(count)
+    return count if count >= 0 else None
+
+
+async def _load_broadcast_index(db: AsyncSession, roles: list[UserRole]) -> dict[UserRole, dict[str, float]]:
+    result = await db.execute(
+        select(
+            BroadcastNotification.target_role,
+            BroadcastNotification.id,
+            BroadcastNotification.sent_at,
+        ).where(BroadcastNotification.target_role.in_(roles))
+    )
+    index: dict[UserRole, dict[str, float]] = {role: {_SENTINEL: 0} for role in roles}
+    for role, broadcast_id, sent_at in result.all():
+        index[role][str(broadcast_id)] = sent_at.timestamp()
+    return index
+
+
+async def _load_reads(db: AsyncSession, user_ids: list[UUID]) -> dict[UUID, dict[str, float]]:
+    result = await db.execute(
+        select(BroadcastRead.user_id, BroadcastRead.broadcast_id, BroadcastRead.sent_at)
+        .where(BroadcastRead.user_id.in_(user_ids))
+    )
+    reads: dict[UUID, dict[str, float]] = {user_id: {_SENTINEL: 0} for user_id in user_ids}
+    for user_id, broadcast_id, sent_at in result.all():
+        reads[user_id][str(broadcast_id)] = sent_at.timestamp()
+    return reads
+
+
+async def _prime_unread(db: AsyncSession, user: User, personal: int, cursor: datetime) -> None:
+    """Seed the user's counters (and their role's broadcast set if missing)."""
+    try:
+        redis = get_redis()
+        ttl = settings.NOTIFICATION_COUNTER_TTL_SECONDS
+        broadcasts_key = _BROADCASTS_KEY.format(user.role.value)
+        reads_key = _READS_KEY.format(user.id)
+        reads = await _load_reads(db, [user.id])
+
+        pipe = redis.pipeline(transaction=False)
+        pipe.set(_UNREAD_KEY.format(user.id), personal, ex=ttl)
+        pipe.set(_CURSOR_KEY.format(user.id), _score(cursor), ex=ttl)
+        pipe.delete(reads_key)
+        pipe.zadd(reads_key, reads[user.id])
+        pipe.expire(reads_key, ttl)
+        pipe.exists(broadcasts_key)
+        *_, has_index = await pipe.execute()
+
+        if not has_index:
+            index = await _load_broadcast_index(db, [user.role])
+            await redis.zadd(broadcasts_key, index[user.role])
+    except Exception:
+        logger.warning("Could not prime unread counters for user %s", user.id, exc_info=True)
+
+
+async def reconcile_unread_counters(db: AsyncSession, batch_size: int = 500) -> int:
+    """Rewrite every warm counter from the database.
+
+    Broadcast sets are rebuilt from scratch, and the personal counter,
+    cursor and individual reads of each user that currently has cached keys
+    are recomputed in batches (one grouped query per batch). Cold users are left alone: they
+    are primed on their next read. Returns the number of users reconciled.
+    """
+    redis = get_redis()
+
+    index = await _load_broadcast_index(db, list(UserRole))
+    pipe = redis.pipeline(transaction=True)
+    for role, members in index.items():
+        key = _BROADCASTS_KEY.format(role.value)
+        pipe.delete(key)
+        pipe.zadd(key, members)
+    await pipe.execute()
+
+    user_ids = [
+        UUID(key.rsplit(":", 1)[1])
+        async for key in redis.scan_iter(match=_UNREAD_KEY.format("*"), count=batch_size)
+    ]
+
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        unread = (
+            select(Notification.user_id, func.count(Notification.id).label("unread"))
+            .where(Notification.user_id.in_(batch), Notification.read_at.is_(None))
+            .group_by(Notification.user_id)
+            .subquery()
+        )
+        result = await db.execute(
+            select(
+                User.id,
+                func.coalesce(unread.c.unread, 0),
+                func.coalesce(NotificationReadCursor.broadcast_read_at, User.created_at),
+            )
+            .outerjoin(unread, unread.c.user_id == User.id)
+            .outerjoin(NotificationReadCursor, NotificationReadCursor.user_id == User.id)
+            .where(User.id.in_(batch))
+        )
+
+        reads = await _load_reads(db, batch)
+        ttl = settings.NOTIFICATION_COUNTER_TTL_SECONDS
+
+        pipe = redis.pipeline(transaction=False)
+        for user_id, personal, cursor in result.all():
+            if cursor.tzinfo is None:
+                cursor = cursor.replace(tzinfo=timezone.utc)
+            pipe.set(_UNREAD_KEY.format(user_id), personal, xx=True, keepttl=True)
+            pipe.set(_CURSOR_KEY.format(user_id), _score(cursor), xx=True, keepttl=True)
+            reads_key = _READS_KEY.format(user_id)
+            pipe.delete(reads_key)
+            pipe.zadd(reads_key, reads[user_id])
+            pipe.expire(reads_key, ttl)
+        await pipe.execute()
+
+    return len(user_ids)
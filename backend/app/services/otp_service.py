@@ -0,0 +1,151 @@
+"""One-time codes for 2FA login and password reset.
+
+Codes are short-lived, low-entropy secrets, so a slow password hash adds
+CPU cost without adding protection: six digits fall to an offline search
+whatever the hash. What bounds guessing is the attempt limit. Codes are
+therefore stored as an HMAC-SHA256 keyed with a server secret (an attacker
+with a database dump but not the key learns nothing) and each code accepts
+at most ``OTP_MAX_ATTEMPTS`` guesses before it is burned.
+
+The digest is bound to the user and to a purpose (``login`` / ``reset``),
+so a code issued for one flow can never be replayed in the other. Issuing
+and verifying cost microseconds.
+
+State lives in the user row (``two_factor_code`` holds
+``<purpose>$<hex digest>``), alongside ``two_factor_expires`` and
+``two_factor_attempts``.
+"""
+
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+OTP_LOGIN = "login"
+OTP_RESET = "reset"
+
+_KEY = hashlib.sha256(f"otp:{settings.OTP_SECRET or settings.SECRET_KEY}".encode()).digest()
+
+
+def generate_code() -> str:
+    """Generate a random 6-digit code (CSPRNG)."""
+    return f"{secrets.randbelow(1_000_000):06d}"
+
+
+def _digest(purpose: str, user: User, code: str) -> str:
+    message = f"{purpose}:{user.id}:{code}".encode()
+    return hmac.new(_KEY, message, hashlib.sha256).hexdigest()
+
+
+async def issue_code(db: AsyncSession, user: User, purpose: str, ttl: timedelta) -> str:
+    """Create a new code for *purpose*, replacing any pending one, and
+    return it in clear for delivery."""
+    code = generate_code()
+    user.two_factor_code = f"{purpose}${_digest(purpose, user, code)}"
+    user.two_factor_expires = datetime.now(timezone.utc) + ttl
+    user.two_factor_attempts = 0
+    await db.flush()
+    return code
+
+
+def _clear(user: User) -> None:
+    user.two_factor_code = None
+    user.two_factor_expires = None
+    user.two_factor_attempts = 0
+
+
+async def _spend_attempt(user: User, stored_code: str) -> int | None:
+    """Reserve one guess on *user*'s pending code in its own transaction,
+    so the attempt counts whatever happens to the request session.
+
+    Returns the attempts used, or None if the limit was already reached or
+    the code was replaced since *stored_code* was read. The last allowed
+    guess burns the code.
+
+    The update waits at most ``OTP_LOCK_TIMEOUT_MS`` for the user row: if
+    the caller's session already holds it (an uncommitted write to the
+    user), waiting would deadlock the two sessions, so the lock timeout
+    error is raised instead.
+    """
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(f"SET LOCAL lock_timeout = {int(settings.OTP_LOCK_TIMEOUT_MS)}"))
+        result = await session.execute(
+            update(User)
+            .where(
+                User.id == user.id,
+                User.two_factor_code == stored_code,
+                User.two_factor_attempts < settings.OTP_MAX_ATTEMPTS,
+            )
+            .values(two_factor_attempts=User.two_factor_attempts + 1)
+            .returning(User.two_factor_attempts)
+        )
+        attempts = result.scalar_one_or_none()
+        if attempts is None or attempts >= settings.OTP_MAX_ATTEMPTS:
+            await session.execute(
+                update(User)
+                .where(User.id == user.id, User.two_factor_code == stored_code)
+                .values(two_factor_code=None, two_factor_expires=None, two_factor_attempts=0)
+            )
+        await session.commit()
+    return attempts
+
+
+async def verify_code(db: AsyncSession, user: User, purpose: str, code: str) -> bool:
+    """Check *code* against the user's pending code for *purpose*.
+
+    Every check first reserves an attempt with a conditional ``UPDATE``
+    committed on a separate session, so concurrent guesses cannot exceed
+    the limit and a wrong guess counts even though the caller's error
+    response rolls the request session back. A correct code is consumed in
+    the request session.
+
+    Fails closed: if the attempt cannot be recorded (e.g. *db* holds an
+    uncommitted write to the user row, so the update hits its lock
+    timeout) the code is rejected without being checked.
+    """
+    if not user.two_factor_code or not user.two_factor_expires:
+        return False
+
+    if datetime.now(timezone.utc) > user.two_factor_expires:
+        return False
+
+    stored_purpose, _, stored_digest = user.two_factor_code.partition("$")
+    if stored_purpose != purpose:
+        return False
+
+    try:
+        attempts = await _spend_attempt(user, user.two_factor_code)
+    except DBAPIError:
+        logger.warning("Could not record a code attempt for user %s", user.id, exc_info=True)
+        return False
+    is_valid = attempts is not None and hmac.compare_digest(
+        stored_digest, _digest(purpose, user, code)
+    )
+
+    if is_valid:
+        # Mirror the counter without scheduling a write that could overwrite
+        # a concurrent increment
+        set_committed_value(user, "two_factor_attempts", attempts)
+        _clear(user)
+        await db.flush()
+        return True
+
+    if attempts is None or attempts >= settings.OTP_MAX_ATTEMPTS:
+        # Already burned by _spend_attempt
+        for key, value in (("two_factor_code", None), ("two_factor_expires", None), ("two_factor_attempts", 0)):
+            set_committed_value(user, key, value)
+    else:
+        set_committed_value(user, "two_factor_attempts", attempts)
+    return False
@@ -0,0 +1,345 @@
+"""Report data and background report jobs.
+
+Long-range aggregations and large exports don't run in the API process:
+:func:`create_report_job` records the request (``report_jobs``) and a
+Celery worker on the ``reports`` queue produces the result file
+(:func:`write_report`) into ``REPORT_JOBS_DIR``. Clients poll the job and
+download the file until it expires, ``REPORT_JOBS_RETENTION_HOURS`` after
+completion.
+
+Admission is bounded: at most ``REPORT_JOBS_MAX_ACTIVE_PER_USER`` queued or
+running jobs per user and ``REPORT_JOBS_MAX_ACTIVE`` overall; the worker
+concurrency of the ``reports`` queue bounds how many run at once.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO
+from uuid import UUID
+
+from sqlalchemy import TIMESTAMP, and_, cast, func, literal_column, null, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.report_job import ReportJob, ReportJobStatus
+from app.models.ride_daily_stat import RideDailyStat
+from app.schemas.report import EarningsDataPoint, EarningsReport
+from app.services.export_service import (
+    COLUMNAR_AVAILABLE,
+    EXPORT_FORMATS,
+    iter_export,
+    ride_export_query,
+)
+
+REPORT_KIND_RIDES_EXPORT = "rides_export"
+REPORT_KIND_EARNINGS = "earnings"
+
+# kind -> accepted result formats (the first one is the default)
+REPORT_KINDS = {
+    REPORT_KIND_RIDES_EXPORT: tuple(EXPORT_FORMATS),
+    REPORT_KIND_EARNINGS: ("json",),
+}
+
+ACTIVE_STATUSES = (ReportJobStatus.QUEUED, ReportJobStatus.RUNNING)
+
+
+class ReportJobError(Exception):
+    """Base exception for report job errors."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        self.message = message
+        self.status_code = status_code
+        super().__init__(message)
+
+
+# ---------------------------------------------------------------------------
+# Report data
+# ---------------------------------------------------------------------------
+
+# Earnings granularity -> (date_trunc unit, period label format; weekly
+# periods are labelled with their first day)
+EARNINGS_GRANULARITIES = {
+    "daily": ("day", "%Y-%m-%d"),
+    "weekly": ("week", "%Y-%m-%d"),
+    "monthly": ("month", "%Y-%m"),
+}
+
+
+def _period_start(day: date, granularity: str) -> date:
+    if granularity == "weekly":
+        return day - timedelta(days=day.weekday())
+    if granularity == "monthly":
+        return day.replace(day=1)
+    return day
+
+
+async def get_earnings_report(
+    db: AsyncSession,
+    granularity: str,
+    date_from: date,
+    date_to: date,
+    split_by: str | None = None,
+) -> EarningsReport:
+    """Completed-ride earnings per day / week / month between two UTC days.
+
+    One statement over the daily rollup returns a dense series: every
+    period of the range (``generate_series``), with zeros where nothing was
+    completed, and every metric of the chart (revenue, driver share,
+    margin, rides, km). With ``split_by="source_platform"`` the series is
+    also broken down by platform (each platform active in the range gets
+    all periods) and ``data`` holds the per-period totals.
+    """
+    unit, date_fmt = EARNINGS_GRANULARITIES[granularity]
+    step = literal_column(f"interval '1 {unit}'")
+    periods = func.generate_series(
+        cast(_period_start(date_from, granularity), TIMESTAMP),
+        cast(date_to, TIMESTAMP),
+        step,
+    ).table_valued("period").render_derived()
+
+    in_range = (
+        RideDailyStat.day >= date_from,
+        RideDailyStat.day <= date_to,
+        RideDailyStat.completed_rides > 0,
+    )
+    columns = [func.date_trunc(unit, cast(RideDailyStat.day, TIMESTAMP)).label("period")]
+    if split_by:
+        columns.append(RideDailyStat.source_platform.label("platform"))
+    stats = (
+        select(
+            *columns,
+            func.sum(RideDailyStat.revenue).label("revenue"),
+            func.sum(RideDailyStat.driver_share).label("driver_share"),
+            func.sum(RideDailyStat.completed_rides).label("rides"),
+            func.sum(RideDailyStat.distance_km).label("distance_km"),
+        )
+        .where(*in_range)
+        .group_by(*(column.name for column in columns))
+        .subquery()
+    )
+
+    on_period = stats.c.period == periods.c.period
+    if split_by:
+        platforms = (
+            select(RideDailyStat.source_platform.label("platform"))
+            .where(*in_range)
+            .distinct()
+            .subquery()
+        )
+        # LEFT JOIN: periods are kept even if no platform is active
+        source = periods.outerjoin(platforms, true()).outerjoin(
+            stats, and_(on_period, stats.c.platform == platforms.c.platform)
+        )
+        platform = platforms.c.platform
+        order_by = (periods.c.period, platform)
+    else:
+        source = periods.outerjoin(stats, on_period)
+        platform = null()
+        order_by = (periods.c.period,)
+
+    revenue = func.coalesce(stats.c.revenue, 0)
+    driver_share = func.coalesce(stats.c.driver_share, 0)
+    stmt = (
+        select(
+            periods.c.period,
+            platform.label("platform"),
+            revenue.label("revenue"),
+            driver_share.label("driver_share"),
+            (revenue - driver_share).label("margin"),
+            func.coalesce(stats.c.rides, 0).label("rides"),
+            func.coalesce(stats.c.distance_km, 0).label("distance_km"),
+        )
+        .select_from(source)
+        .order_by(*order_by)
+    )
+
+    rows = (await db.execute(stmt)).all()
+
+    metrics = ("revenue", "driver_share", "margin", "rides", "distance_km")
+
+    def point(label: str, values) -> EarningsDataPoint:
+        revenue, driver_share, margin, rides, distance_km = values
+        return EarningsDataPoint(
+            date=label,
+            amount=float(revenue),
+            driver_share=float(driver_share),
+            margin=float(margin),
+            rides=int(rides),
+            distance_km=float(distance_km),
+        )
+
+    data = []
+    by_platform: dict[str, list[EarningsDataPoint]] = {}
+    totals: dict[str, list] = {}  # period label -> summed metrics
+    for row in rows:
+        label = row.period.strftime(date_fmt)
+        values = [getattr(row, name) for name in metrics]
+        if not split_by:
+            data.append(point(label, values))
+            continue
+        sums = totals.setdefault(label, [0] * len(metrics))
+        if row.platform is None:  # no platform active in the range
+            continue
+        by_platform.setdefault(row.platform, []).append(point(label, values))
+        totals[label] = [total + value for total, value in zip(sums, values)]
+
+    if not split_by:
+        return EarningsReport(granularity=granularity, data=data)
+    return EarningsReport(
+        granularity=granularity,
+        data=[point(label, sums) for label, sums in totals.items()],
+        by_platform=by_platform,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Report jobs
+# ---------------------------------------------------------------------------
+
+def report_media_type(job: ReportJob) -> str:
+    if job.format == "json":
+        return "application/json"
+    return EXPORT_FORMATS[job.format][0]
+
+
+def report_file_name(job: ReportJob) -> str:
+    extension = "json" if job.format == "json" else EXPORT_FORMATS[job.format][1]
+    return f"{job.id}.{extension}"
+
+
+def report_file_path(file_name: str) -> Path:
+    return Path(settings.REPORT_JOBS_DIR) / file_name
+
+
+async def create_report_job(
+    db: AsyncSession,
+    user_id: UUID,
+    kind: str,
+    params: dict,
+    export_format: str | None = None,
+) -> ReportJob:
+    """Validate and queue a report job (not committed, not yet enqueued).
+
+    *params* must be JSON-serializable (dates as ISO strings).
+    """
+    formats = REPORT_KINDS.get(kind)
+    if formats is None:
+        raise ReportJobError(f"Unknown report kind: {kind}")
+    export_format = export_format or formats[0]
+    if export_format not in formats:
+        raise ReportJobError(f"Format '{export_format}' is not available for {kind} reports")
+    if export_format in ("parquet", "arrow") and not COLUMNAR_AVAILABLE:
+        raise ReportJobError(
+            "Parquet/Arrow export is not available on this server (pyarrow not installed)",
+            status_code=501,
+        )
+
+    active = ReportJob.status.in_(ACTIVE_STATUSES)
+    totals = (await db.execute(
+        select(
+            func.count().filter(ReportJob.requested_by == user_id).label("mine"),
+            func.count().label("total"),
+        ).where(active)
+    )).one()
+    if totals.mine >= settings.REPORT_JOBS_MAX_ACTIVE_PER_USER:
+        raise ReportJobError(
+            f"You already have {totals.mine} report(s) in progress; wait for them to finish",
+            status_code=429,
+        )
+    if totals.total >= settings.REPORT_JOBS_MAX_ACTIVE:
+        raise ReportJobError("Too many reports in progress, retry later", status_code=503)
+
+    job = ReportJob(
+        requested_by=user_id,
+        kind=kind,
+        format=export_format,
+        params=params,
+        status=ReportJobStatus.QUEUED,
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(job)
+    await db.flush()
+    return job
+
+
+async def claim_report_job(db: AsyncSession, job_id: UUID) -> ReportJob | None:
+    """Move a queued job to RUNNING. Returns None if it is not queued
+    (already claimed by another delivery of the task, or expired)."""
+    result = await db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.QUEUED)
+        .values(status=ReportJobStatus.RUNNING, started_at=datetime.now(timezone.utc))
+        .returning(ReportJob)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+
+async def write_report(db: AsyncSession, job: ReportJob, fh: BinaryIO) -> None:
+    """Produce the result of *job* into the binary file *fh*."""
+    params = job.params
+    date_from = date.fromisoformat(params["date_from"]) if params.get("date_from") else None
+    date_to = date.fromisoformat(params["date_to"]) if params.get("date_to") else None
+
+    if job.kind == REPORT_KIND_EARNINGS:
+        report = await get_earnings_report(
+            db, params["granularity"], date_from, date_to, params.get("split_by")
+        )
+        fh.write(report.model_dump_json().encode())
+        return
+
+    query = ride_export_query(params.get("status"), date_from, date_to)
+    async for chunk in iter_export(db, query, job.format):
+        fh.write(chunk.encode() if isinstance(chunk, str) else chunk)
+
+
+async def finish_report_job(db: AsyncSession, job_id: UUID, file_name: str, size_bytes: int) -> None:
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.RUNNING)
+        .values(
+            status=ReportJobStatus.COMPLETED,
+            file_name=file_name,
+            size_bytes=size_bytes,
+            finished_at=now,
+            expires_at=now + timedelta(hours=settings.REPORT_JOBS_RETENTION_HOURS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def fail_report_job(db: AsyncSession, job_id: UUID, error: str) -> None:
+    await db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status.in_(ACTIVE_STATUSES))
+        .values(status=ReportJobStatus.FAILED, error=error[:1000], finished_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def expire_report_jobs(db: AsyncSession) -> list[str]:
+    """Expire completed jobs past ``expires_at`` and fail jobs still queued
+    or running (task lost, worker killed) after twice the time limit.
+    Returns the file names to delete."""
+    now = datetime.now(timezone.utc)
+    expired = await db.execute(
+        update(ReportJob)
+        .where(ReportJob.status == ReportJobStatus.COMPLETED, ReportJob.expires_at <= now)
+        .values(status=ReportJobStatus.EXPIRED)
+        .returning(ReportJob.file_name)
+        .execution_options(synchronize_session=False)
+    )
+    file_names = [name for name in expired.scalars() if name]
+
+    stale_before = now - timedelta(seconds=2 * settings.REPORT_JOBS_TIME_LIMIT_SECONDS)
+    await db.execute(
+        update(ReportJob)
+        .where(
+            ReportJob.status.in_(ACTIVE_STATUSES),
+            func.coalesce(ReportJob.started_at, ReportJob.created_at) < stale_before,
+        )
+        .values(status=ReportJobStatus.FAILED, error="Worker lost", finished_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return file_names
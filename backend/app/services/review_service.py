@@ -0,0 +1,106 @@
+"""Driver reviews and their rating aggregates.
+
+Each driver row carries the running ``rating_sum`` / ``rating_count`` of
+its reviews, the derived ``rating_avg`` and the number of reviews per star
+(``rating_<n>_count``). :func:`add_review` updates them in the same
+transaction as the insert, with one atomic ``UPDATE`` (no read-modify-write),
+so profiles, the reviews breakdown and the dashboard KPI read precomputed
+values instead of aggregating ``reviews``. The global average is the ratio
+of the per-driver sums (one row per driver, no hot global row).
+
+:func:`rebuild_driver_ratings` recomputes every driver from ``reviews``; the
+nightly report reconcile runs it to pick up reviews written by other means.
+"""
+
+from sqlalchemy import Numeric, cast, exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.driver import Driver
+from app.models.review import Review
+from app.services.rollup_service import REPORTS_CACHE
+from app.utils.response_cache import invalidate_after_commit
+
+STARS = range(1, 6)
+
+
+def _star_column(stars: int):
+    return getattr(Driver, f"rating_{stars}_count")
+
+
+def rating_distribution(driver: Driver) -> dict[int, int]:
+    """Number of reviews per star (1-5) of *driver*."""
+    return {stars: getattr(driver, f"rating_{stars}_count") for stars in STARS}
+
+
+def global_rating_avg():
+    """Scalar subquery: average rating over all reviews (0 without reviews)."""
+    return (
+        select(
+            func.coalesce(
+                cast(func.sum(Driver.rating_sum), Numeric) / func.nullif(func.sum(Driver.rating_count), 0),
+                0,
+            )
+        )
+        .scalar_subquery()
+    )
+
+
+async def add_review(db: AsyncSession, review: Review) -> Review:
+    """Insert *review* and add its rating to the driver's aggregates.
+
+    Driver objects already loaded in the session are not refreshed.
+    """
+    db.add(review)
+    await db.flush()
+
+    star = _star_column(review.rating)
+    await db.execute(
+        update(Driver)
+        .where(Driver.id == review.driver_id)
+        .values({
+            Driver.rating_sum: Driver.rating_sum + review.rating,
+            Driver.rating_count: Driver.rating_count + 1,
+            star: star + 1,
+            # SET expressions see the old row: include this review
+            Driver.rating_avg: func.round(
+                cast(Driver.rating_sum + review.rating, Numeric) / (Driver.rating_count + 1), 2
+            ),
+        })
+        .execution_options(synchronize_session=False)
+    )
+    invalidate_after_commit(db, REPORTS_CACHE)
+    return review
+
+
+async def rebuild_driver_ratings(db: AsyncSession) -> int:
+    """Recompute every driver's rating aggregates from ``reviews``.
+    Returns the number of drivers with reviews."""
+    totals = (
+        select(
+            Review.driver_id,
+            func.sum(Review.rating).label("rating_sum"),
+            func.count().label("rating_count"),
+            *(func.count().filter(Review.rating == stars).label(f"rating_{stars}_count") for stars in STARS),
+        )
+        .group_by(Review.driver_id)
+        .subquery()
+    )
+    counters = ["rating_sum", "rating_count", *(f"rating_{stars}_count" for stars in STARS)]
+
+    result = await db.execute(
+        update(Driver)
+        .where(Driver.id == totals.c.driver_id)
+        .values(
+            **{name: totals.c[name] for name in counters},
+            rating_avg=func.round(cast(totals.c.rating_sum, Numeric) / totals.c.rating_count, 2),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(Driver)
+        .where(~exists().where(Review.driver_id == Driver.id))
+        .values(**{name: 0 for name in counters}, rating_avg=0)
+        .execution_options(synchronize_session=False)
+    )
+    invalidate_after_commit(db, REPORTS_CACHE)
+    return result.rowcount
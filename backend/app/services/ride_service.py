@@ -1,16 +1,22 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, update, insert, func, case, and_, or_, literal, TIMESTAMP
 from sqlalchemy.orm import selectinload
+import asyncio
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
+from dataclasses import dataclass
 from typing import Any
 
 from app.models.ride import Ride, RideStatus
 from app.models.ride_history import RideHistory
-from app.models.driver import Driver
-from app.models.notification import Notification
 from app.models.user import User, UserRole
-from app.utils.email import send_ride_assignment_email
+from app.config import settings
+from app.services.driver_stats_service import record_completed_ride_months, record_driver_completion
+from app.services.notification_service import STAFF_ROLES, add_notifications, notify_roles
+from app.services.rollup_service import record_cancelled_rides, record_completed_rides
+from app.tasks.critical_rides import enqueue_critical_check
+from app.utils.background import after_commit
+from app.utils.email import send_ride_assignment_email, send_ride_assignment_emails
 
 
 # ---------------------------------------------------------------------------
@@ -27,6 +33,20 @@ VALID_TRANSITIONS: dict[RideStatus, set[RideStatus]] = {
 }
 
 
+# Unassigned rides closer than this to their pickup time become CRITICAL
+CRITICAL_THRESHOLD = timedelta(hours=3)
+
+
+@dataclass
+class BulkRideResult:
+    """Outcome of one ride in a bulk operation."""
+
+    ride_id: UUID
+    success: bool
+    status: RideStatus | None = None
+    error: str | None = None
+
+
 class RideServiceError(Exception):
     """Base exception for ride service errors."""
 
@@ -52,6 +72,49 @@ def _validate_transition(current: RideStatus, target: RideStatus) -> None:
         )
 
 
+async def _lock_ride_state(db: AsyncSession, ride_id: UUID) -> Any:
+    """Lock a ride row (``SELECT ... FOR UPDATE``) and load only the columns
+    a status transition is validated against.
+    """
+    result = await db.execute(
+        select(Ride.id, Ride.status, Ride.driver_id)
+        .where(Ride.id == ride_id)
+        .with_for_update()
+    )
+    state = result.one_or_none()
+    if state is None:
+        raise RideServiceError("Ride not found", status_code=404)
+    return state
+
+
+async def _apply_transition(
+    db: AsyncSession,
+    ride_id: UUID,
+    expected: RideStatus,
+    target: RideStatus,
+    **values: Any,
+) -> Ride:
+    """Move a ride from *expected* to *target* with a conditional
+    ``UPDATE ... WHERE status = :expected RETURNING``.
+
+    Raises a 409 if the ride changed status in the meantime, so two
+    concurrent transitions can never both succeed.
+    """
+    result = await db.execute(
+        update(Ride)
+        .where(Ride.id == ride_id, Ride.status == expected)
+        .values(status=target, updated_at=_now(), **values)
+        .returning(Ride)
+    )
+    ride = result.scalar_one_or_none()
+    if ride is None:
+        raise RideServiceError(
+            "Ride was modified by another request, please retry",
+            status_code=409,
+        )
+    return ride
+
+
 def _create_history(
     ride: Ride,
     old_status: RideStatus | None,
@@ -69,21 +132,21 @@ def _create_history(
     )
 
 
-def _create_notification(
+def _notification_row(
     user_id: UUID,
     notification_type: str,
     title: str,
     body: str,
     ride_id: UUID | None = None,
-) -> Notification:
-    return Notification(
-        user_id=user_id,
-        type=notification_type,
-        title=title,
-        body=body,
-        ride_id=ride_id,
-        sent_at=_now(),
-    )
+) -> dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "type": notification_type,
+        "title": title,
+        "body": body,
+        "ride_id": ride_id,
+        "sent_at": _now(),
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -206,6 +269,9 @@ async def create_ride(
     db.add(history)
     await db.flush()
 
+    if ride.status == RideStatus.TO_ASSIGN:
+        schedule_critical_check(db, ride.id, ride.scheduled_at)
+
     return ride
 
 
@@ -232,6 +298,10 @@ async def update_ride(
 
     ride.updated_at = _now()
     await db.flush()
+
+    if ride_data.get("scheduled_at") is not None and ride.status == RideStatus.TO_ASSIGN:
+        schedule_critical_check(db, ride.id, ride.scheduled_at)
+
     return ride
 
 
@@ -276,20 +346,21 @@ async def assign_ride(
     await db.flush()
 
     # Notify the driver (in-app notification)
-    notification = _create_notification(
-        user_id=driver_id,
-        notification_type="ride_assigned",
-        title="Nuova corsa assegnata",
-        body=f"Ti è stata assegnata una corsa: {ride.pickup_address} → {ride.dropoff_address}",
-        ride_id=ride.id,
-    )
-    db.add(notification)
-    await db.flush()
+    await add_notifications(db, [
+        _notification_row(
+            user_id=driver_id,
+            notification_type="ride_assigned",
+            title="Nuova corsa assegnata",
+            body=f"Ti è stata assegnata una corsa: {ride.pickup_address} → {ride.dropoff_address}",
+            ride_id=ride.id,
+        )
+    ])
 
-    # Send email notification to driver (non-blocking: failure is logged, not raised)
+    # Queue email notification to driver once the assignment is committed
+    # (non-blocking: failure is logged, not raised)
     ride_date = ride.scheduled_at.strftime("%d/%m/%Y - %H:%M") if ride.scheduled_at else "Da definire"
     driver_name = f"{driver_user.first_name} {driver_user.last_name}"
-    await send_ride_assignment_email(
+    email = dict(
         to=driver_user.email,
         driver_name=driver_name,
         ride_date=ride_date,
@@ -297,6 +368,7 @@ async def assign_ride(
         dropoff=ride.dropoff_address,
         passenger=ride.passenger_name or "Non specificato",
     )
+    after_commit(db, lambda: send_ride_assignment_email(**email))
 
     return ride
 
@@ -311,23 +383,23 @@ async def accept_ride(
     driver_id: UUID,
 ) -> Ride:
     """Driver accepts an assigned ride. Transitions to BOOKED."""
-    ride = await get_ride(db, ride_id)
+    state = await _lock_ride_state(db, ride_id)
 
-    if ride.driver_id != driver_id:
+    if state.driver_id != driver_id:
         raise RideServiceError(
             "You are not assigned to this ride", status_code=403
         )
 
-    old_status = ride.status
+    old_status = state.status
     _validate_transition(old_status, RideStatus.BOOKED)
 
-    ride.status = RideStatus.BOOKED
-    ride.updated_at = _now()
-
+    values: dict[str, Any] = {}
     # If ride was critical, mark as resolved
     if old_status == RideStatus.CRITICAL:
-        ride.critical_resolved_at = _now()
-        ride.critical_resolution_type = "accepted"
+        values["critical_resolved_at"] = _now()
+        values["critical_resolution_type"] = "accepted"
+
+    ride = await _apply_transition(db, ride_id, old_status, RideStatus.BOOKED, **values)
 
     history = _create_history(
         ride=ride,
@@ -338,21 +410,19 @@ async def accept_ride(
     )
     db.add(history)
 
-    # Notify admins that ride was accepted
-    admin_query = select(User).where(
-        User.role.in_([UserRole.ADMIN, UserRole.ASSISTANT])
+    # Notify admins that ride was accepted (coalesced into a digest on bursts)
+    await notify_roles(
+        db,
+        STAFF_ROLES,
+        "ride_accepted",
+        [
+            {
+                "title": "Corsa accettata",
+                "body": f"La corsa {ride.pickup_address} → {ride.dropoff_address} è stata accettata dal driver.",
+                "ride_id": ride.id,
+            }
+        ],
     )
-    admin_result = await db.execute(admin_query)
-    admins = admin_result.scalars().all()
-    for admin in admins:
-        notification = _create_notification(
-            user_id=admin.id,
-            notification_type="ride_accepted",
-            title="Corsa accettata",
-            body=f"La corsa {ride.pickup_address} → {ride.dropoff_address} è stata accettata dal driver.",
-            ride_id=ride.id,
-        )
-        db.add(notification)
 
     await db.flush()
     return ride
@@ -368,19 +438,19 @@ async def start_ride(
     driver_id: UUID,
 ) -> Ride:
     """Driver starts a ride. Transitions from BOOKED to IN_PROGRESS."""
-    ride = await get_ride(db, ride_id)
+    state = await _lock_ride_state(db, ride_id)
 
-    if ride.driver_id != driver_id:
+    if state.driver_id != driver_id:
         raise RideServiceError(
             "You are not assigned to this ride", status_code=403
         )
 
-    old_status = ride.status
+    old_status = state.status
     _validate_transition(old_status, RideStatus.IN_PROGRESS)
 
-    ride.status = RideStatus.IN_PROGRESS
-    ride.started_at = _now()
-    ride.updated_at = _now()
+    ride = await _apply_transition(
+        db, ride_id, old_status, RideStatus.IN_PROGRESS, started_at=_now()
+    )
 
     history = _create_history(
         ride=ride,
@@ -407,19 +477,21 @@ async def complete_ride(
     """Driver completes a ride. Transitions from IN_PROGRESS to COMPLETED
     and updates driver statistics.
     """
-    ride = await get_ride(db, ride_id)
+    state = await _lock_ride_state(db, ride_id)
 
-    if ride.driver_id != driver_id:
+    if state.driver_id != driver_id:
         raise RideServiceError(
             "You are not assigned to this ride", status_code=403
         )
 
-    old_status = ride.status
+    old_status = state.status
     _validate_transition(old_status, RideStatus.COMPLETED)
 
-    ride.status = RideStatus.COMPLETED
-    ride.completed_at = _now()
-    ride.updated_at = _now()
+    ride = await _apply_transition(
+        db, ride_id, old_status, RideStatus.COMPLETED, completed_at=_now()
+    )
+    await record_completed_rides(db, [ride_id])
+    await record_completed_ride_months(db, [ride_id])
 
     history = _create_history(
         ride=ride,
@@ -431,17 +503,7 @@ async def complete_ride(
     db.add(history)
 
     # Update driver stats
-    driver_result = await db.execute(
-        select(Driver).where(Driver.user_id == driver_id)
-    )
-    driver = driver_result.scalar_one_or_none()
-    if driver is not None:
-        driver.total_rides = (driver.total_rides or 0) + 1
-        if ride.distance_km:
-            driver.total_km = float(driver.total_km or 0) + float(ride.distance_km)
-        if ride.driver_share:
-            driver.total_earnings = float(driver.total_earnings or 0) + float(ride.driver_share)
-        driver.updated_at = _now()
+    await record_driver_completion(db, driver_id, ride)
 
     await db.flush()
     return ride
@@ -458,13 +520,15 @@ async def cancel_ride(
     notes: str | None = None,
 ) -> Ride:
     """Cancel a ride from any active status."""
-    ride = await get_ride(db, ride_id)
+    state = await _lock_ride_state(db, ride_id)
 
-    old_status = ride.status
+    old_status = state.status
     _validate_transition(old_status, RideStatus.CANCELLED)
 
-    ride.status = RideStatus.CANCELLED
-    ride.updated_at = _now()
+    ride = await _apply_transition(
+        db, ride_id, old_status, RideStatus.CANCELLED, cancelled_at=_now()
+    )
+    await record_cancelled_rides(db, [ride_id])
 
     history = _create_history(
         ride=ride,
@@ -477,83 +541,339 @@ async def cancel_ride(
 
     # Notify the assigned driver if any
     if ride.driver_id:
-        notification = _create_notification(
-            user_id=ride.driver_id,
-            notification_type="ride_cancelled",
-            title="Corsa cancellata",
-            body=f"La corsa {ride.pickup_address} → {ride.dropoff_address} è stata cancellata.",
-            ride_id=ride.id,
-        )
-        db.add(notification)
+        await add_notifications(db, [
+            _notification_row(
+                user_id=ride.driver_id,
+                notification_type="ride_cancelled",
+                title="Corsa cancellata",
+                body=f"La corsa {ride.pickup_address} → {ride.dropoff_address} è stata cancellata.",
+                ride_id=ride.id,
+            )
+        ])
 
     await db.flush()
     return ride
 
 
 # ---------------------------------------------------------------------------
-# 10. check_critical_rides
+# 10. Critical ride detection
 # ---------------------------------------------------------------------------
 
-async def check_critical_rides(db: AsyncSession) -> list[Ride]:
-    """Find rides that are still TO_ASSIGN and scheduled within the next
-    3 hours. Mark them as CRITICAL and notify admins/assistants.
+def schedule_critical_check(db: AsyncSession, ride_id: UUID, scheduled_at: datetime) -> None:
+    """Enqueue a delayed critical check at ``scheduled_at - 3h``.
 
-    Intended to be called periodically by a Celery beat task.
+    The task is published only after the current transaction commits, so the
+    worker always sees the ride (nothing is published on rollback). Rides whose critical moment is beyond the
+    next reconciliation scan are left to that scan, which schedules them when
+    they come within range; this keeps long-lived ETA messages out of the
+    broker.
     """
-    threshold = _now() + timedelta(hours=3)
+    if scheduled_at.tzinfo is None:
+        scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
 
-    query = select(Ride).where(
-        and_(
+    critical_at = scheduled_at - CRITICAL_THRESHOLD
+    horizon = _now() + timedelta(seconds=settings.CRITICAL_RIDES_SCAN_INTERVAL_SECONDS)
+    if critical_at > horizon:
+        return
+
+    # The broker publish is blocking: keep it off the event loop
+    after_commit(db, lambda: asyncio.to_thread(enqueue_critical_check, ride_id, critical_at))
+
+
+async def _mark_rides_critical(db: AsyncSession, *criteria: Any) -> list[UUID]:
+    """Mark TO_ASSIGN rides inside the critical window as CRITICAL and notify
+    admins/assistants. Extra *criteria* narrow the candidate rides.
+
+    Set-based: one ``UPDATE ... RETURNING`` flips the statuses, history rows
+    are written with ``INSERT ... SELECT`` and admin notifications go through
+    :func:`notify_roles` in bulk (coalesced into digests), so the cost does
+    not grow with the number of ORM objects in the session.
+    """
+    now = _now()
+    threshold = now + CRITICAL_THRESHOLD
+
+    result = await db.execute(
+        update(Ride)
+        .where(
             Ride.status == RideStatus.TO_ASSIGN,
             Ride.scheduled_at <= threshold,
-            Ride.scheduled_at > _now(),  # exclude past rides
+            Ride.scheduled_at > now,  # exclude past rides
+            *criteria,
         )
+        .values(status=RideStatus.CRITICAL, critical_at=now, updated_at=now)
+        .returning(Ride.id, Ride.pickup_address, Ride.dropoff_address, Ride.scheduled_at)
+        .execution_options(synchronize_session=False)
     )
-    result = await db.execute(query)
-    rides = list(result.scalars().all())
+    rows = result.all()
+    ride_ids = [row.id for row in rows]
 
-    if not rides:
+    if not ride_ids:
         return []
 
-    # Fetch admin / assistant users for notifications
-    admin_result = await db.execute(
-        select(User).where(
-            User.role.in_([UserRole.ADMIN, UserRole.ASSISTANT])
+    # One history row per ride
+    await db.execute(
+        insert(RideHistory).from_select(
+            ["id", "ride_id", "old_status", "new_status", "changed_at", "notes"],
+            select(
+                func.gen_random_uuid(),
+                Ride.id,
+                literal(RideStatus.TO_ASSIGN.value),
+                literal(RideStatus.CRITICAL.value),
+                literal(now, TIMESTAMP(timezone=True)),
+                literal("Auto-marked as critical: < 3h to scheduled time"),
+            ).where(Ride.id.in_(ride_ids)),
         )
     )
-    admins = list(admin_result.scalars().all())
-
-    critical_rides: list[Ride] = []
-    for ride in rides:
-        old_status = ride.status
-        ride.status = RideStatus.CRITICAL
-        ride.critical_at = _now()
-        ride.updated_at = _now()
-
-        history = _create_history(
-            ride=ride,
-            old_status=old_status,
-            new_status=RideStatus.CRITICAL,
-            changed_by=None,
-            notes="Auto-marked as critical: < 3h to scheduled time",
-        )
-        db.add(history)
-
-        # Notify each admin / assistant
-        for admin in admins:
-            notification = _create_notification(
-                user_id=admin.id,
-                notification_type="ride_critical",
-                title="Corsa critica",
-                body=(
-                    f"La corsa {ride.pickup_address} → {ride.dropoff_address} "
-                    f"(prevista alle {ride.scheduled_at:%H:%M}) non è ancora assegnata."
+
+    # Admins / assistants: one notification per ride, or one digest per
+    # recipient when several rides turn critical within the digest window
+    await notify_roles(
+        db,
+        STAFF_ROLES,
+        "ride_critical",
+        [
+            {
+                "title": "Corsa critica",
+                "body": (
+                    f"La corsa {row.pickup_address} → {row.dropoff_address} "
+                    f"(prevista alle {row.scheduled_at.astimezone(timezone.utc):%H:%M}) "
+                    "non è ancora assegnata."
                 ),
-                ride_id=ride.id,
+                "ride_id": row.id,
+            }
+            for row in rows
+        ],
+    )
+
+    return ride_ids
+
+
+async def mark_ride_critical(db: AsyncSession, ride_id: UUID) -> bool:
+    """Mark a single ride as CRITICAL if it is still unassigned and inside
+    the critical window. Safe to call repeatedly or early: a ride that was
+    assigned, cancelled or rescheduled in the meantime is left untouched.
+
+    Called by the delayed task enqueued via :func:`schedule_critical_check`.
+    """
+    return bool(await _mark_rides_critical(db, Ride.id == ride_id))
+
+
+async def check_critical_rides(db: AsyncSession) -> list[UUID]:
+    """Reconciliation scan: mark every TO_ASSIGN ride scheduled within the
+    next 3 hours as CRITICAL and notify admins/assistants.
+
+    Rides are normally flagged on time by the delayed per-ride task; this
+    catches anything that slipped through (broker outage, lost message).
+    Returns the ids of the rides that were marked critical.
+    """
+    return await _mark_rides_critical(db)
+
+
+async def get_rides_entering_critical_window(
+    db: AsyncSession,
+    until: datetime,
+) -> list[tuple[UUID, datetime]]:
+    """Return ``(id, scheduled_at)`` of TO_ASSIGN rides that will become
+    critical between now and *until*.
+    """
+    now = _now()
+    result = await db.execute(
+        select(Ride.id, Ride.scheduled_at).where(
+            Ride.status == RideStatus.TO_ASSIGN,
+            Ride.scheduled_at > now + CRITICAL_THRESHOLD,
+            Ride.scheduled_at <= until + CRITICAL_THRESHOLD,
+        )
+    )
+    return [(row.id, row.scheduled_at) for row in result.all()]
+
+
+# ---------------------------------------------------------------------------
+# 11. Bulk transitions
+# ---------------------------------------------------------------------------
+
+async def _lock_rides_for_bulk(db: AsyncSession, ride_ids: list[UUID]) -> dict[UUID, Any]:
+    """Lock the given rides and return the columns needed for validation,
+    keyed by ride id. Missing ids are simply absent from the result.
+    """
+    result = await db.execute(
+        select(
+            Ride.id,
+            Ride.status,
+            Ride.driver_id,
+            Ride.pickup_address,
+            Ride.dropoff_address,
+            Ride.scheduled_at,
+            Ride.passenger_name,
+        )
+        .where(Ride.id.in_(ride_ids))
+        .with_for_update()
+    )
+    return {row.id: row for row in result.all()}
+
+
+async def bulk_cancel_rides(
+    db: AsyncSession,
+    ride_ids: list[UUID],
+    cancelled_by_id: UUID,
+    notes: str | None = None,
+) -> list[BulkRideResult]:
+    """Cancel a batch of rides, returning one outcome per requested ride.
+
+    Rides are validated against ``VALID_TRANSITIONS`` in memory; the valid
+    ones are updated with one ``UPDATE``, and their history rows and driver
+    notifications are written with one bulk ``INSERT`` each.
+    """
+    ride_ids = list(dict.fromkeys(ride_ids))
+    rows = await _lock_rides_for_bulk(db, ride_ids)
+
+    outcomes: list[BulkRideResult] = []
+    to_cancel: list[Any] = []
+    for ride_id in ride_ids:
+        row = rows.get(ride_id)
+        if row is None:
+            outcomes.append(BulkRideResult(ride_id=ride_id, success=False, error="Ride not found"))
+            continue
+        try:
+            _validate_transition(row.status, RideStatus.CANCELLED)
+        except RideServiceError as exc:
+            outcomes.append(
+                BulkRideResult(ride_id=ride_id, success=False, status=row.status, error=exc.message)
             )
-            db.add(notification)
+            continue
+        to_cancel.append(row)
+        outcomes.append(BulkRideResult(ride_id=ride_id, success=True, status=RideStatus.CANCELLED))
+
+    if not to_cancel:
+        return outcomes
+
+    now = _now()
+    await db.execute(
+        update(Ride)
+        .where(Ride.id.in_([row.id for row in to_cancel]))
+        .values(status=RideStatus.CANCELLED, cancelled_at=now, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    await record_cancelled_rides(db, [row.id for row in to_cancel])
+
+    await db.execute(
+        insert(RideHistory),
+        [
+            {
+                "ride_id": row.id,
+                "old_status": row.status.value,
+                "new_status": RideStatus.CANCELLED.value,
+                "changed_by": cancelled_by_id,
+                "changed_at": now,
+                "notes": notes or "Ride cancelled",
+            }
+            for row in to_cancel
+        ],
+    )
 
-        critical_rides.append(ride)
+    driver_notifications = [
+        {
+            "user_id": row.driver_id,
+            "type": "ride_cancelled",
+            "title": "Corsa cancellata",
+            "body": f"La corsa {row.pickup_address} → {row.dropoff_address} è stata cancellata.",
+            "ride_id": row.id,
+            "sent_at": now,
+        }
+        for row in to_cancel
+        if row.driver_id
+    ]
+    await add_notifications(db, driver_notifications)
 
-    await db.flush()
-    return critical_rides
+    return outcomes
+
+
+async def bulk_assign_rides(
+    db: AsyncSession,
+    ride_ids: list[UUID],
+    driver_id: UUID,
+    assigned_by_id: UUID,
+) -> list[BulkRideResult]:
+    """Assign a batch of rides to one driver, returning one outcome per
+    requested ride. As with :func:`assign_ride`, the status stays TO_ASSIGN
+    (or CRITICAL) until the driver accepts.
+    """
+    driver_user = await db.execute(
+        select(User).where(User.id == driver_id, User.role == UserRole.DRIVER)
+    )
+    driver_user = driver_user.scalar_one_or_none()
+    if driver_user is None:
+        raise RideServiceError("Driver not found", status_code=404)
+
+    ride_ids = list(dict.fromkeys(ride_ids))
+    rows = await _lock_rides_for_bulk(db, ride_ids)
+
+    outcomes: list[BulkRideResult] = []
+    to_assign: list[Any] = []
+    for ride_id in ride_ids:
+        row = rows.get(ride_id)
+        if row is None:
+            outcomes.append(BulkRideResult(ride_id=ride_id, success=False, error="Ride not found"))
+            continue
+        if row.status not in (RideStatus.TO_ASSIGN, RideStatus.CRITICAL):
+            outcomes.append(
+                BulkRideResult(
+                    ride_id=ride_id,
+                    success=False,
+                    status=row.status,
+                    error=(
+                        f"Cannot assign a ride in status '{row.status.value}'. "
+                        "Only TO_ASSIGN or CRITICAL rides can be assigned."
+                    ),
+                )
+            )
+            continue
+        to_assign.append(row)
+        outcomes.append(BulkRideResult(ride_id=ride_id, success=True, status=row.status))
+
+    if not to_assign:
+        return outcomes
+
+    now = _now()
+    is_critical = Ride.status == RideStatus.CRITICAL
+    await db.execute(
+        update(Ride)
+        .where(Ride.id.in_([row.id for row in to_assign]))
+        .values(
+            driver_id=driver_id,
+            assigned_by=assigned_by_id,
+            updated_at=now,
+            critical_resolved_at=case((is_critical, now), else_=Ride.critical_resolved_at),
+            critical_resolution_type=case((is_critical, "assigned"), else_=Ride.critical_resolution_type),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    await add_notifications(
+        db,
+        [
+            {
+                "user_id": driver_id,
+                "type": "ride_assigned",
+                "title": "Nuova corsa assegnata",
+                "body": f"Ti è stata assegnata una corsa: {row.pickup_address} → {row.dropoff_address}",
+                "ride_id": row.id,
+                "sent_at": now,
+            }
+            for row in to_assign
+        ],
+    )
+
+    emails = [
+        {
+            "ride_date": row.scheduled_at.strftime("%d/%m/%Y - %H:%M") if row.scheduled_at else "Da definire",
+            "pickup": row.pickup_address,
+            "dropoff": row.dropoff_address,
+            "passenger": row.passenger_name or "Non specificato",
+        }
+        for row in to_assign
+    ]
+    to = driver_user.email
+    driver_name = f"{driver_user.first_name} {driver_user.last_name}"
+    after_commit(db, lambda: send_ride_assignment_emails(to=to, driver_name=driver_name, rides=emails))
+
+    return outcomes
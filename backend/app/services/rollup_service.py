@@ -0,0 +1,145 @@
+"""Daily ride/revenue rollup (``ride_daily_stats``).
+
+Reports read pre-aggregated days instead of scanning ``rides``: a
+multi-month earnings chart costs O(days), not O(rides).
+
+The table is kept current incrementally, in the same transaction as the
+status change:
+
+- :func:`record_completed_rides` is called when rides complete;
+- :func:`record_cancelled_rides` is called when rides are cancelled.
+
+Both aggregate the given rides with one ``INSERT ... SELECT ... ON CONFLICT
+DO UPDATE`` that adds to the matching day rows. :func:`rebuild_daily_stats`
+recomputes a range of days from ``rides``; the nightly reconcile task runs
+it over the last ``REPORT_ROLLUP_RECONCILE_DAYS`` days to correct changes
+made outside those hooks (e.g. prices edited after completion).
+
+Days are UTC calendar days of ``completed_at`` for completed rides and of
+``cancelled_at`` for cancelled ones.
+
+Every change also drops the cached report responses (``REPORTS_CACHE``)
+once the transaction commits.
+"""
+
+from datetime import date, datetime, time, timezone
+from uuid import UUID
+
+from sqlalchemy import Date, cast, delete, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.driver import Driver
+from app.models.ride import Ride, RideStatus
+from app.models.ride_daily_stat import RideDailyStat
+from app.utils.response_cache import invalidate_after_commit
+
+# Response-cache namespace of the report endpoints built on this rollup
+REPORTS_CACHE = "reports"
+
+_KEY = ("day", "source_platform", "driver_id", "company_id")
+_COUNTERS = ("completed_rides", "cancelled_rides", "revenue", "driver_share", "distance_km")
+
+
+# Constants are rendered inline: bound parameters would make the day
+# expression differ between SELECT and GROUP BY, and leave the zero columns
+# untyped in INSERT ... SELECT
+_UTC = literal_column("'UTC'")
+_ZERO = literal_column("0")
+
+
+def _utc_day(column):
+    return cast(func.timezone(_UTC, column), Date)
+
+
+def _completed_rows(*criteria):
+    day = _utc_day(Ride.completed_at)
+    return (
+        select(
+            day.label("day"),
+            Ride.source_platform,
+            Ride.driver_id,
+            Driver.ncc_company_id.label("company_id"),
+            func.count().label("completed_rides"),
+            _ZERO.label("cancelled_rides"),
+            func.coalesce(func.sum(Ride.price), 0).label("revenue"),
+            func.coalesce(func.sum(Ride.driver_share), 0).label("driver_share"),
+            func.coalesce(func.sum(Ride.distance_km), 0).label("distance_km"),
+        )
+        .outerjoin(Driver, Driver.user_id == Ride.driver_id)
+        .where(Ride.status == RideStatus.COMPLETED, Ride.completed_at.is_not(None), *criteria)
+        .group_by(day, Ride.source_platform, Ride.driver_id, Driver.ncc_company_id)
+    )
+
+
+def _cancelled_rows(*criteria):
+    day = _utc_day(Ride.cancelled_at)
+    return (
+        select(
+            day.label("day"),
+            Ride.source_platform,
+            Ride.driver_id,
+            Driver.ncc_company_id.label("company_id"),
+            _ZERO.label("completed_rides"),
+            func.count().label("cancelled_rides"),
+            _ZERO.label("revenue"),
+            _ZERO.label("driver_share"),
+            _ZERO.label("distance_km"),
+        )
+        .outerjoin(Driver, Driver.user_id == Ride.driver_id)
+        .where(Ride.status == RideStatus.CANCELLED, Ride.cancelled_at.is_not(None), *criteria)
+        .group_by(day, Ride.source_platform, Ride.driver_id, Driver.ncc_company_id)
+    )
+
+
+async def _add(db: AsyncSession, rows) -> None:
+    """Add the aggregated *rows* to the rollup, creating missing day rows."""
+    stmt = pg_insert(RideDailyStat).from_select(_KEY + _COUNTERS, rows)
+    table = RideDailyStat.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(_KEY),
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in _COUNTERS},
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def record_completed_rides(db: AsyncSession, ride_ids: list[UUID]) -> None:
+    """Add just-completed rides to their day rows."""
+    if ride_ids:
+        await _add(db, _completed_rows(Ride.id.in_(ride_ids)))
+        invalidate_after_commit(db, REPORTS_CACHE)
+
+
+async def record_cancelled_rides(db: AsyncSession, ride_ids: list[UUID]) -> None:
+    """Add just-cancelled rides to their day rows."""
+    if ride_ids:
+        await _add(db, _cancelled_rows(Ride.id.in_(ride_ids)))
+        invalidate_after_commit(db, REPORTS_CACHE)
+
+
+async def rebuild_daily_stats(db: AsyncSession, since: date | None = None) -> int:
+    """Recompute the rollup from ``rides`` for every day from *since*
+    (all days if None). Returns the number of rides counted.
+    """
+    if since is None:
+        await db.execute(delete(RideDailyStat))
+        completed_criteria, cancelled_criteria = (), ()
+    else:
+        start = datetime.combine(since, time.min, tzinfo=timezone.utc)
+        await db.execute(delete(RideDailyStat).where(RideDailyStat.day >= since))
+        completed_criteria = (Ride.completed_at >= start,)
+        cancelled_criteria = (Ride.cancelled_at >= start,)
+
+    await _add(db, _completed_rows(*completed_criteria))
+    await _add(db, _cancelled_rows(*cancelled_criteria))
+    invalidate_after_commit(db, REPORTS_CACHE)
+
+    query = select(
+        func.coalesce(func.sum(RideDailyStat.completed_rides + RideDailyStat.cancelled_rides), 0)
+    )
+    if since is not None:
+        query = query.where(RideDailyStat.day >= since)
+    return (await db.execute(query)).scalar_one()
@@ -0,0 +1,33 @@
+"""Celery tasks for authentication state.
+
+``sync_suspended_users_task`` runs via Celery Beat and rebuilds the Redis
+suspension set checked by the stateless auth path, so status changes made
+outside the API (or lost while Redis was down) still lock users out.
+"""
+
+import logging
+
+from app.celery_app import celery_app
+from app.tasks.runtime import run_async, task_session
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.auth.sync_suspended_users_task")
+def sync_suspended_users_task():
+    """Periodic task: rebuild the suspension set from the database."""
+    return run_async(_run_sync())
+
+
+async def _run_sync() -> dict:
+    """Rebuild the suspension set within an async DB session."""
+    from app.services.auth_state import sync_suspended_users
+
+    async with task_session() as session:
+        try:
+            count = await sync_suspended_users(session)
+            logger.info(f"Suspension set synced: {count} suspended user(s)")
+            return {"suspended_count": count}
+        except Exception:
+            logger.exception("Error syncing suspended users")
+            raise
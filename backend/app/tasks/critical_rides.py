@@ -1,43 +1,96 @@
-"""Celery task for checking and marking critical rides.
+"""Celery tasks for detecting critical rides.
 
-Runs every 5 minutes via Celery Beat.
-Calls the existing check_critical_rides() async function from ride_service.
+A ride becomes CRITICAL when it is still unassigned 3 hours before pickup.
+Detection is event-driven: creating or rescheduling a ride enqueues
+``mark_ride_critical_task`` with an ETA of ``scheduled_at - 3h``.
+
+``check_critical_rides_task`` runs via Celery Beat as a cheap reconciliation
+safety net: it flags anything the delayed tasks missed and enqueues delayed
+tasks for rides whose critical moment falls before its next run.
 """
 
-import asyncio
 import logging
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
 
 from app.celery_app import celery_app
-from app.database import AsyncSessionLocal
+from app.config import settings
+from app.tasks.runtime import run_async, task_session
 
 logger = logging.getLogger(__name__)
 
 
+def enqueue_critical_check(ride_id: UUID, critical_at: datetime) -> None:
+    """Publish a delayed critical check for a ride.
+
+    Failures are logged, never raised: the reconciliation scan covers any
+    ride whose task could not be published.
+    """
+    try:
+        mark_ride_critical_task.apply_async(
+            args=[str(ride_id)],
+            eta=max(critical_at, datetime.now(timezone.utc)),
+            retry=False,
+        )
+    except Exception:
+        logger.exception("Could not enqueue critical check for ride %s", ride_id)
+
+
+@celery_app.task(name="app.tasks.critical_rides.mark_ride_critical_task")
+def mark_ride_critical_task(ride_id: str):
+    """Delayed task: mark a single ride as CRITICAL if still unassigned."""
+    return run_async(_run_mark(UUID(ride_id)))
+
+
 @celery_app.task(name="app.tasks.critical_rides.check_critical_rides_task")
 def check_critical_rides_task():
-    """Periodic task: mark unassigned rides < 3h as CRITICAL."""
-    loop = asyncio.new_event_loop()
-    try:
-        result = loop.run_until_complete(_run_check())
-        return result
-    finally:
-        loop.close()
+    """Periodic task: reconcile unassigned rides < 3h and plan upcoming checks."""
+    return run_async(_run_check())
+
+
+async def _run_mark(ride_id: UUID) -> dict:
+    """Mark a single ride as critical within an async DB session."""
+    from app.services.ride_service import mark_ride_critical
+
+    async with task_session() as session:
+        try:
+            marked = await mark_ride_critical(session, ride_id)
+            await session.commit()
+            if marked:
+                logger.warning(f"Marked ride {ride_id} as CRITICAL")
+            return {"ride_id": str(ride_id), "critical": marked}
+        except Exception:
+            await session.rollback()
+            logger.exception("Error marking ride %s as critical", ride_id)
+            raise
 
 
 async def _run_check() -> dict:
-    """Run the critical rides check within an async DB session."""
-    from app.services.ride_service import check_critical_rides
+    """Run the reconciliation scan within an async DB session."""
+    from app.services.ride_service import (
+        CRITICAL_THRESHOLD,
+        check_critical_rides,
+        get_rides_entering_critical_window,
+    )
 
-    async with AsyncSessionLocal() as session:
+    async with task_session() as session:
         try:
-            critical_rides = await check_critical_rides(session)
+            critical_ride_ids = await check_critical_rides(session)
+            next_run = datetime.now(timezone.utc) + timedelta(
+                seconds=settings.CRITICAL_RIDES_SCAN_INTERVAL_SECONDS
+            )
+            upcoming = await get_rides_entering_critical_window(session, until=next_run)
             await session.commit()
-            count = len(critical_rides)
+
+            for ride_id, scheduled_at in upcoming:
+                enqueue_critical_check(ride_id, scheduled_at - CRITICAL_THRESHOLD)
+
+            count = len(critical_ride_ids)
             if count > 0:
-                logger.warning(f"Marked {count} ride(s) as CRITICAL")
+                logger.warning(f"Reconciliation marked {count} ride(s) as CRITICAL")
             else:
                 logger.info("No critical rides found")
-            return {"critical_count": count}
+            return {"critical_count": count, "scheduled_count": len(upcoming)}
         except Exception:
             await session.rollback()
             logger.exception("Error checking critical rides")
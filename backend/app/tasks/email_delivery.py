@@ -0,0 +1,60 @@
+"""Celery task for outbound email delivery.
+
+Request handlers queue notification emails here instead of talking to the
+SMTP server inline. The worker sends each batch over a pooled, persistent
+SMTP connection (see ``app.utils.email``) and retries transient failures
+with exponential backoff.
+"""
+
+import logging
+
+from app.celery_app import celery_app
+from app.config import settings
+from app.tasks.runtime import run_async
+from app.utils.email import delivery_metrics, send_email_batch
+
+logger = logging.getLogger(__name__)
+
+
+def queue_emails(messages: list[dict[str, str]]) -> bool:
+    """Queue messages for delivery, split into batches of ``EMAIL_BATCH_SIZE``.
+
+    Each message is a dict with ``to``, ``subject``, ``html`` and ``plain``.
+    Returns False if the broker could not be reached.
+    """
+    size = settings.EMAIL_BATCH_SIZE
+    try:
+        for start in range(0, len(messages), size):
+            send_emails_task.apply_async(args=[messages[start:start + size]], retry=False)
+    except Exception:
+        logger.exception("Could not queue %d email(s)", len(messages))
+        return False
+    delivery_metrics["queued"] += len(messages)
+    return True
+
+
+@celery_app.task(
+    bind=True,
+    name="app.tasks.email_delivery.send_emails_task",
+    max_retries=settings.EMAIL_MAX_RETRIES,
+)
+def send_emails_task(self, messages: list[dict[str, str]]):
+    """Send a batch of emails; retry the transient failures with backoff."""
+    sent, failed = run_async(send_email_batch(messages))
+
+    if failed:
+        if self.request.retries >= self.max_retries:
+            delivery_metrics["failed"] += len(failed)
+            logger.error(
+                "Giving up on %d email(s) after %d retries: %s",
+                len(failed), self.request.retries, ", ".join(m["to"] for m in failed),
+            )
+        else:
+            delivery_metrics["retried"] += len(failed)
+            countdown = settings.EMAIL_RETRY_BACKOFF_SECONDS * 2 ** self.request.retries
+            logger.warning("Retrying %d email(s) in %ds", len(failed), countdown)
+            raise self.retry(args=[failed], countdown=countdown)
+
+    dropped = len(messages) - sent
+    logger.info("Email batch done: %d sent, %d failed — totals %s", sent, dropped, dict(delivery_metrics))
+    return {"sent": sent, "failed": dropped}
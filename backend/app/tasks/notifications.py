@@ -0,0 +1,79 @@
+"""Celery tasks for notification housekeeping.
+
+``reconcile_unread_counters_task`` runs via Celery Beat and rewrites the
+Redis unread counters from the database, correcting any drift left by
+updates that were lost between commit and the cache write.
+
+``purge_old_notifications_task`` runs nightly and deletes read notifications
+and broadcasts older than ``NOTIFICATION_RETENTION_DAYS``, one committed
+batch at a time, so the per-user index scans stay small.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.celery_app import celery_app
+from app.config import settings
+from app.tasks.runtime import run_async, task_session
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.notifications.reconcile_unread_counters_task")
+def reconcile_unread_counters_task():
+    """Periodic task: rewrite warm unread counters from the database."""
+    return run_async(_run_reconcile())
+
+
+@celery_app.task(name="app.tasks.notifications.purge_old_notifications_task")
+def purge_old_notifications_task():
+    """Nightly task: delete read notifications past the retention period."""
+    return run_async(_run_purge())
+
+
+async def _run_reconcile() -> dict:
+    """Reconcile the counters within an async DB session."""
+    from app.services.notification_service import reconcile_unread_counters
+
+    async with task_session() as session:
+        try:
+            count = await reconcile_unread_counters(session)
+            logger.info(f"Reconciled unread counters for {count} user(s)")
+            return {"reconciled_users": count}
+        except Exception:
+            logger.exception("Error reconciling unread counters")
+            raise
+
+
+async def _run_purge() -> dict:
+    """Purge old notifications in committed batches."""
+    from app.services.notification_service import (
+        purge_broadcasts,
+        purge_read_notifications,
+        trim_broadcast_index,
+    )
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    batch_size = settings.NOTIFICATION_PURGE_BATCH_SIZE
+    totals = {"notifications": 0, "broadcasts": 0}
+
+    async with task_session() as session:
+        try:
+            for key, purge in (("notifications", purge_read_notifications), ("broadcasts", purge_broadcasts)):
+                while True:
+                    deleted = await purge(session, cutoff, batch_size)
+                    await session.commit()
+                    totals[key] += deleted
+                    if deleted < batch_size:
+                        break
+        except Exception:
+            await session.rollback()
+            logger.exception("Error purging old notifications")
+            raise
+
+    await trim_broadcast_index(cutoff)
+    logger.info(
+        f"Purged {totals['notifications']} notification(s) and "
+        f"{totals['broadcasts']} broadcast(s) older than {cutoff:%Y-%m-%d}"
+    )
+    return totals
@@ -0,0 +1,154 @@
+"""Celery tasks for report data.
+
+``reconcile_daily_stats_task`` runs nightly and rebuilds the last
+``REPORT_ROLLUP_RECONCILE_DAYS`` days of the ``ride_daily_stats`` rollup from
+``rides``, correcting any drift from changes made outside the completion /
+cancellation hooks. Called with ``days=0`` it rebuilds the whole table. It
+also rebuilds the per-driver monthly stats over the same window (from the
+start of its first month) and recomputes the drivers' rating aggregates
+from ``reviews``.
+
+``run_report_job_task`` produces the result file of a background report job
+(see :mod:`app.services.report_service`). It is routed to the ``reports``
+queue, served by a dedicated worker with low concurrency so heavy reports
+neither occupy API workers nor delay the other tasks. The file is written
+under a temporary name and renamed once complete. ``purge_report_jobs_task``
+runs hourly and deletes expired result files.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from app.celery_app import celery_app
+from app.config import settings
+from app.tasks.runtime import run_async, task_session
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.reports.reconcile_daily_stats_task")
+def reconcile_daily_stats_task(days: int | None = None):
+    """Nightly task: rebuild recent days of the ride rollup, the driver
+    monthly stats and the driver rating aggregates."""
+    if days is None:
+        days = settings.REPORT_ROLLUP_RECONCILE_DAYS
+    return run_async(_run_reconcile(days))
+
+
+async def _run_reconcile(days: int) -> dict:
+    """Rebuild the rollup within an async DB session."""
+    from app.services.driver_stats_service import rebuild_driver_monthly_stats
+    from app.services.review_service import rebuild_driver_ratings
+    from app.services.rollup_service import rebuild_daily_stats
+
+    since = datetime.now(timezone.utc).date() - timedelta(days=days) if days else None
+
+    async with task_session() as session:
+        try:
+            count = await rebuild_daily_stats(session, since)
+            await rebuild_driver_monthly_stats(session, since)
+            rated_drivers = await rebuild_driver_ratings(session)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            logger.exception("Error rebuilding ride daily stats")
+            raise
+
+    logger.info(
+        f"Rebuilt ride daily stats since {since or 'the beginning'}: {count} ride(s); "
+        f"rating aggregates of {rated_drivers} driver(s)"
+    )
+    return {"since": since.isoformat() if since else None, "rides": count, "rated_drivers": rated_drivers}
+
+
+def enqueue_report_job(job_id: UUID) -> bool:
+    """Publish the task producing a report job. Returns False (logged) if
+    the broker is unreachable."""
+    try:
+        run_report_job_task.apply_async(args=[str(job_id)], retry=False)
+    except Exception:
+        logger.exception("Could not enqueue report job %s", job_id)
+        return False
+    return True
+
+
+@celery_app.task(
+    name="app.tasks.reports.run_report_job_task",
+    acks_late=True,
+    time_limit=settings.REPORT_JOBS_TIME_LIMIT_SECONDS + 60,
+)
+def run_report_job_task(job_id: str):
+    """Queued task: produce the result file of a report job."""
+    return run_async(_run_report_job(UUID(job_id)))
+
+
+async def _run_report_job(job_id: UUID) -> dict:
+    from app.services.report_service import (
+        claim_report_job,
+        fail_report_job,
+        finish_report_job,
+        report_file_name,
+        report_file_path,
+        write_report,
+    )
+
+    async with task_session() as session:
+        job = await claim_report_job(session, job_id)
+        await session.commit()
+    if job is None:
+        return {"job_id": str(job_id), "status": "skipped"}
+
+    file_name = report_file_name(job)
+    path = report_file_path(file_name)
+    partial = path.with_name(f"{file_name}.part")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        async with asyncio.timeout(settings.REPORT_JOBS_TIME_LIMIT_SECONDS):
+            async with task_session() as session:
+                with partial.open("wb") as fh:
+                    await write_report(session, job, fh)
+        partial.replace(path)
+    except Exception as exc:
+        partial.unlink(missing_ok=True)
+        logger.exception("Report job %s failed", job_id)
+        error = "Time limit exceeded" if isinstance(exc, TimeoutError) else str(exc) or type(exc).__name__
+        async with task_session() as session:
+            await fail_report_job(session, job_id, error)
+            await session.commit()
+        return {"job_id": str(job_id), "status": "failed"}
+
+    size = path.stat().st_size
+    async with task_session() as session:
+        await finish_report_job(session, job_id, file_name, size)
+        await session.commit()
+
+    logger.info(f"Report job {job_id} ({job.kind}, {job.format}) completed: {size} bytes")
+    return {"job_id": str(job_id), "status": "completed", "size_bytes": size}
+
+
+@celery_app.task(name="app.tasks.reports.purge_report_jobs_task")
+def purge_report_jobs_task():
+    """Periodic task: expire old report jobs and delete their files."""
+    return run_async(_run_purge())
+
+
+async def _run_purge() -> dict:
+    from app.services.report_service import expire_report_jobs, report_file_path
+
+    async with task_session() as session:
+        try:
+            file_names = await expire_report_jobs(session)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            logger.exception("Error expiring report jobs")
+            raise
+
+    for file_name in file_names:
+        report_file_path(file_name).unlink(missing_ok=True)
+
+    if file_names:
+        logger.info(f"Expired {len(file_names)} report job file(s)")
+    return {"expired": len(file_names)}
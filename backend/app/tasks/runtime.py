@@ -0,0 +1,106 @@
+"""Worker-level async runtime shared by the Celery tasks in ``app.tasks``.
+
+Celery tasks are synchronous, while the service layer is async. Instead of
+creating a new event loop per task run (which also breaks the module-level
+engine, whose asyncpg connections are bound to the loop that opened them),
+each worker process owns one long-lived event loop and one async engine
+(and, lazily, the Redis cache client from :mod:`app.utils.cache`).
+
+Both are created on ``worker_process_init`` and disposed on
+``worker_process_shutdown``. They are also created lazily on first use, so
+tasks keep working with the ``solo`` pool or when called eagerly.
+
+The loop only runs while a task runs, so background work spawned by the
+task (after-commit cache updates, see :mod:`app.utils.background`) is
+drained before :func:`run_async` returns, and again on shutdown.
+"""
+
+import asyncio
+import logging
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.utils.background import drain
+from app.utils.cache import close_redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_engine: AsyncEngine | None = None
+_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def init_runtime() -> None:
+    """Create the worker's event loop and async engine (idempotent)."""
+    global _loop, _engine, _session_factory
+
+    if _loop is not None:
+        return
+
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    _engine = create_async_engine(settings.DATABASE_URL, echo=False, pool_pre_ping=True)
+    _session_factory = async_sessionmaker(
+        _engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+    logger.info("Async task runtime initialised")
+
+
+def shutdown_runtime() -> None:
+    """Dispose the engine and close the event loop."""
+    global _loop, _engine, _session_factory
+
+    if _loop is None:
+        return
+
+    try:
+        _loop.run_until_complete(drain())
+        _loop.run_until_complete(close_redis())
+        if _engine is not None:
+            _loop.run_until_complete(_engine.dispose())
+    finally:
+        _loop.close()
+        _loop = None
+        _engine = None
+        _session_factory = None
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run *coro* to completion on the worker's event loop, then wait for
+    the background tasks it spawned."""
+    init_runtime()
+    return _loop.run_until_complete(_run_and_drain(coro))
+
+
+async def _run_and_drain(coro: Coroutine[Any, Any, T]) -> T:
+    try:
+        return await coro
+    finally:
+        await drain()
+
+
+def task_session() -> AsyncSession:
+    """Return a new session bound to the worker's engine.
+
+    Must be used from a coroutine running under :func:`run_async`.
+    """
+    init_runtime()
+    return _session_factory()
+
+
+@worker_process_init.connect
+def _on_worker_process_init(**kwargs) -> None:
+    init_runtime()
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs) -> None:
+    shutdown_runtime()
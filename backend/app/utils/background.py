@@ -0,0 +1,92 @@
+"""Background coroutines started from synchronous hooks, in particular work
+that must only happen once a database transaction commits (cache updates,
+emails, broker publishes).
+
+:func:`after_commit` / :func:`batch_after_commit` queue work on a session:
+it is started with :func:`spawn` when the session commits and dropped if it
+rolls back. :func:`spawn` schedules the coroutine on the running event loop and keeps a
+reference until it finishes. The API loop runs forever, so those tasks
+complete on their own; Celery workers only drive their loop while a task
+runs (``run_until_complete``), so :mod:`app.tasks.runtime` awaits
+:func:`drain` at the end of every task run and on shutdown.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable, Coroutine, Hashable
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+_tasks: set[asyncio.Task] = set()
+
+_PENDING_KEY = "after_commit_pending"
+_LISTENING_KEY = "after_commit_listening"
+
+T = TypeVar("T")
+
+
+def spawn(coro: Coroutine[Any, Any, Any]) -> None:
+    """Run *coro* in the background on the running loop (dropped if none)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        coro.close()
+        return
+    task = loop.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def drain() -> None:
+    """Wait for every spawned task, including those spawned meanwhile."""
+    while _tasks:
+        results = await asyncio.gather(*_tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Background task failed", exc_info=result)
+
+
+def _pending(db: AsyncSession) -> dict[Hashable, tuple[Any, Callable[[Any], Coroutine]]]:
+    if not db.info.get(_LISTENING_KEY):
+        db.info[_LISTENING_KEY] = True
+        event.listen(db.sync_session, "after_commit", _on_commit)
+        event.listen(db.sync_session, "after_soft_rollback", _on_rollback)
+    return db.info.setdefault(_PENDING_KEY, {})
+
+
+def after_commit(db: AsyncSession, coro_factory: Callable[[], Coroutine[Any, Any, Any]]) -> None:
+    """Run ``coro_factory()`` in the background once *db* commits; drop it
+    if the transaction rolls back instead."""
+    _pending(db)[object()] = (None, lambda _: coro_factory())
+
+
+def batch_after_commit(
+    db: AsyncSession,
+    key: Hashable,
+    create: Callable[[], T],
+    apply: Callable[[T], Coroutine[Any, Any, Any]],
+) -> T:
+    """Return the batch *key* of *db*'s current transaction, for the caller
+    to add to.
+
+    The first call in a transaction creates it with ``create()``; once the
+    transaction commits, ``apply(batch)`` runs in the background (once per
+    batch). A rollback drops it.
+    """
+    pending = _pending(db)
+    if key not in pending:
+        pending[key] = (create(), apply)
+    return pending[key][0]
+
+
+def _on_commit(session) -> None:
+    for batch, apply in session.info.pop(_PENDING_KEY, {}).values():
+        spawn(apply(batch))
+
+
+def _on_rollback(session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,40 @@
+"""Shared async Redis client for application-level caching.
+
+Redis is an optimisation, never a dependency of correctness: callers treat
+any Redis error as a cache miss and fall back to the database. Timeouts are
+kept short so an unreachable Redis costs milliseconds, not seconds.
+
+The client is created lazily on first use, inside the running event loop
+(the API loop, or the worker loop from :mod:`app.tasks.runtime`).
+"""
+
+import logging
+
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: aioredis.Redis | None = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the process-wide Redis client."""
+    global _client
+    if _client is None:
+        _client = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=settings.REDIS_CACHE_TIMEOUT_SECONDS,
+            socket_timeout=settings.REDIS_CACHE_TIMEOUT_SECONDS,
+        )
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the client's connection pool (application / worker shutdown)."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
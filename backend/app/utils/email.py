@@ -6,11 +6,24 @@ Supports multiple email types:
 - Ride assignment notifications (forced by admin)
 
 When DEV_MODE=True, emails are logged to console instead of sent via SMTP.
-When DEV_MODE=False, emails are sent via SMTP (aiosmtplib).
+When DEV_MODE=False, emails are sent via SMTP (aiosmtplib) over a small
+pool of persistent connections. Time-critical emails (2FA, password reset)
+are sent inline; notifications (ride assignment) go through the outbound
+Celery queue so a slow SMTP server never stalls the API request.
 """
 
+import asyncio
 import logging
+from html import escape
+from string import Formatter
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import aiosmtplib
+from base64 import encodebytes
+from email.header import Header
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
@@ -24,7 +37,10 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 def _base_template(content_block: str) -> str:
-    """Wrap content in the AureaVia branded email template."""
+    """Wrap content in the AureaVia branded email template.
+
+    Called once per email type when :data:`TEMPLATES` is built.
+    """
     return f"""\
 <!DOCTYPE html>
 <html lang="it">
@@ -60,10 +76,59 @@ def _base_template(content_block: str) -> str:
 # Email templates
 # ---------------------------------------------------------------------------
 
-def _2fa_template(code: str) -> tuple[str, str]:
-    """Return (subject, html) for 2FA verification email."""
-    subject = "AureaVia - Codice di verifica"
-    content = f"""\
+def _compile(text: str) -> list[tuple[str, str | None]]:
+    """Split a ``{field}`` template into (literal, field) pairs."""
+    return [(literal, field) for literal, field, _, _ in Formatter().parse(text)]
+
+
+def _substitute(parts: list[tuple[str, str | None]], fields: dict[str, str]) -> str:
+    out = []
+    for literal, field in parts:
+        out.append(literal)
+        if field is not None:
+            out.append(fields[field])
+    return "".join(out)
+
+
+class EmailTemplate:
+    """An email type compiled once at import time.
+
+    The branded shell from :func:`_base_template` is applied when the
+    template is built and the finished document is split into static
+    chunks and field names, so rendering a message is a single join of
+    prebuilt strings with the per-message fields (HTML-escaped for the
+    HTML part).
+    """
+
+    def __init__(self, subject: str, content: str, plain: str):
+        self.subject = _compile(subject)
+        self.html = _compile(_base_template(content))
+        self.plain = _compile(plain)
+
+    def render(self, **fields: str) -> tuple[str, str, str]:
+        """Return (subject, html, plain) for one message."""
+        fields = {key: str(value) for key, value in fields.items()}
+        escaped = {key: escape(value) for key, value in fields.items()}
+        return (
+            _substitute(self.subject, fields),
+            _substitute(self.html, escaped),
+            _substitute(self.plain, fields),
+        )
+
+    def render_batch(self, recipients: list[tuple[str, dict[str, str]]]) -> list[dict[str, str]]:
+        """Render one message per ``(to, fields)`` pair, ready for
+        :func:`send_email_batch` or the outbound queue."""
+        messages = []
+        for to, fields in recipients:
+            subject, html_body, plain = self.render(**fields)
+            messages.append({"to": to, "subject": subject, "html": html_body, "plain": plain})
+        return messages
+
+
+TEMPLATES: dict[str, EmailTemplate] = {
+    "2fa": EmailTemplate(
+        subject="AureaVia - Codice di verifica",
+        content="""\
 <h2 style="color:#2D2D2D;font-size:20px;margin:0 0 16px;text-align:center;">
   Codice di verifica
 </h2>
@@ -78,14 +143,12 @@ def _2fa_template(code: str) -> tuple[str, str]:
 <p style="color:#999;font-size:12px;margin:0;text-align:center;">
   Il codice scade tra 10 minuti.<br>
   Se non hai richiesto l'accesso, ignora questa email.
-</p>"""
-    return subject, _base_template(content)
-
-
-def _reset_password_template(code: str) -> tuple[str, str]:
-    """Return (subject, html) for password reset email."""
-    subject = "AureaVia - Reimpostazione password"
-    content = f"""\
+</p>""",
+        plain="Il tuo codice di verifica AureaVia: {code}\nIl codice scade tra 10 minuti.",
+    ),
+    "reset_password": EmailTemplate(
+        subject="AureaVia - Reimpostazione password",
+        content="""\
 <h2 style="color:#2D2D2D;font-size:20px;margin:0 0 16px;text-align:center;">
   Reimpostazione password
 </h2>
@@ -101,20 +164,12 @@ def _reset_password_template(code: str) -> tuple[str, str]:
 <p style="color:#999;font-size:12px;margin:0;text-align:center;">
   Il codice scade tra 30 minuti.<br>
   Se non hai richiesto il reset, ignora questa email.
-</p>"""
-    return subject, _base_template(content)
-
-
-def _ride_assignment_template(
-    driver_name: str,
-    ride_date: str,
-    pickup: str,
-    dropoff: str,
-    passenger: str,
-) -> tuple[str, str]:
-    """Return (subject, html) for forced ride assignment notification."""
-    subject = "AureaVia - Nuova corsa assegnata"
-    content = f"""\
+</p>""",
+        plain="Codice di reset password AureaVia: {code}\nIl codice scade tra 30 minuti.",
+    ),
+    "ride_assignment": EmailTemplate(
+        subject="AureaVia - Nuova corsa assegnata",
+        content="""\
 <h2 style="color:#2D2D2D;font-size:20px;margin:0 0 16px;text-align:center;">
   Corsa assegnata
 </h2>
@@ -149,50 +204,264 @@ def _ride_assignment_template(
 </table>
 <p style="color:#666;font-size:13px;margin:0;text-align:center;">
   Accedi all'app per visualizzare i dettagli completi della corsa.
-</p>"""
-    return subject, _base_template(content)
+</p>""",
+        plain=(
+            "Ciao {driver_name}, ti è stata assegnata una nuova corsa.\n"
+            "Data: {ride_date}\nPickup: {pickup}\nDestinazione: {dropoff}\n"
+            "Passeggero: {passenger}\n\nAccedi all'app per i dettagli."
+        ),
+    ),
+}
 
 
 # ---------------------------------------------------------------------------
-# Send function (core)
+# SMTP connection pool
 # ---------------------------------------------------------------------------
 
-async def _send_email(to: str, subject: str, html_body: str, plain_text: str) -> bool:
-    """Send an email via SMTP.
+class SMTPPool:
+    """Small pool of persistent, authenticated SMTP connections.
 
-    Returns True if sent, False on error.
-    Logs all errors but never raises — the caller decides how to handle failures.
+    Opening a connection costs a TCP handshake, STARTTLS and AUTH; reusing
+    it across messages makes each further send a single MAIL/RCPT/DATA
+    exchange. Idle connections older than ``SMTP_IDLE_TIMEOUT_SECONDS`` are
+    closed instead of reused, since servers drop them anyway.
     """
+
+    def __init__(self, size: int, idle_timeout: float):
+        self._slots = asyncio.Semaphore(size)
+        self._idle: list[tuple[aiosmtplib.SMTP, float]] = []
+        self._idle_timeout = idle_timeout
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER or None,
+            password=settings.SMTP_PASSWORD or None,
+            start_tls=True,
+        )
+        await smtp.connect()
+        return smtp
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Borrow a connected client; it is returned to the pool on success
+        and discarded if the caller raised."""
+        async with self._slots:
+            smtp = None
+            while self._idle:
+                candidate, last_used = self._idle.pop()
+                if candidate.is_connected and time.monotonic() - last_used < self._idle_timeout:
+                    smtp = candidate
+                    break
+                await _quit_quietly(candidate)
+
+            if smtp is None:
+                smtp = await self._connect()
+
+            try:
+                yield smtp
+            except BaseException:
+                await _quit_quietly(smtp)
+                raise
+            self._idle.append((smtp, time.monotonic()))
+
+    async def close(self) -> None:
+        while self._idle:
+            smtp, _ = self._idle.pop()
+            await _quit_quietly(smtp)
+
+
+async def _quit_quietly(smtp: aiosmtplib.SMTP) -> None:
+    try:
+        if smtp.is_connected:
+            await smtp.quit()
+    except Exception:
+        smtp.close()
+
+
+_pool: SMTPPool | None = None
+_pool_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_pool() -> SMTPPool:
+    """Return the pool for the running event loop (one per process)."""
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        _pool = SMTPPool(settings.SMTP_POOL_SIZE, settings.SMTP_IDLE_TIMEOUT_SECONDS)
+        _pool_loop = loop
+    return _pool
+
+
+# ---------------------------------------------------------------------------
+# Delivery metrics
+# ---------------------------------------------------------------------------
+
+delivery_metrics: Counter = Counter()
+
+
+def get_delivery_metrics() -> dict[str, float]:
+    """Return delivery counters for this process (sent, failed, retried,
+    queued, batches, send_seconds)."""
+    return dict(delivery_metrics)
+
+
+# ---------------------------------------------------------------------------
+# Send functions (core)
+# ---------------------------------------------------------------------------
+
+def _build_message(to: str, subject: str, html_body: str, plain_text: str) -> MIMEMultipart:
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
     msg["From"] = f"AureaVia <{settings.EMAIL_FROM}>"
     msg["To"] = to
     msg.attach(MIMEText(plain_text, "plain", "utf-8"))
     msg.attach(MIMEText(html_body, "html", "utf-8"))
+    return msg
 
-    try:
-        await aiosmtplib.send(
-            msg,
-            hostname=settings.SMTP_HOST,
-            port=settings.SMTP_PORT,
-            username=settings.SMTP_USER,
-            password=settings.SMTP_PASSWORD,
-            start_tls=True,
-        )
-        logger.info("Email sent to %s (subject: %s)", to, subject)
-        return True
-    except aiosmtplib.SMTPAuthenticationError:
-        logger.error("SMTP authentication failed for %s — check SMTP_USER/SMTP_PASSWORD", settings.SMTP_USER)
-        return False
-    except aiosmtplib.SMTPConnectError:
-        logger.error("Cannot connect to SMTP server %s:%s", settings.SMTP_HOST, settings.SMTP_PORT)
-        return False
-    except aiosmtplib.SMTPResponseException as e:
-        logger.error("SMTP error sending to %s: %s %s", to, e.code, e.message)
-        return False
-    except Exception:
-        logger.exception("Unexpected error sending email to %s", to)
+
+# Fixed boundary: base64 bodies can never contain a run of '=' this long
+_BOUNDARY = "===============AureaViaAlternative=="
+_PART_HEADERS = (
+    "--" + _BOUNDARY + "\r\n"
+    'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+    "MIME-Version: 1.0\r\n"
+    "Content-Transfer-Encoding: base64\r\n\r\n"
+)
+_PLAIN_PART_HEADERS = _PART_HEADERS.format(subtype="plain").encode()
+_HTML_PART_HEADERS = _PART_HEADERS.format(subtype="html").encode()
+_CLOSING = f"\r\n--{_BOUNDARY}--\r\n".encode()
+
+
+def _encode_message(to: str, subject: str, html_body: str, plain_text: str) -> bytes:
+    """Serialize a multipart/alternative message straight to bytes.
+
+    Produces the same structure as ``_build_message(...).as_bytes()``
+    (base64 UTF-8 text and HTML parts) without building the MIME object
+    tree and running the generic generator, which dominates the per-send
+    cost. Falls back to the MIME classes for non-ASCII recipients.
+    """
+    if not to.isascii():
+        return _build_message(to, subject, html_body, plain_text).as_bytes()
+
+    if not subject.isascii():
+        subject = Header(subject, "utf-8").encode()
+    headers = (
+        f'Content-Type: multipart/alternative; boundary="{_BOUNDARY}"\r\n'
+        "MIME-Version: 1.0\r\n"
+        f"Subject: {subject}\r\n"
+        f"From: AureaVia <{settings.EMAIL_FROM}>\r\n"
+        f"To: {to}\r\n\r\n"
+    ).encode()
+    return b"".join((
+        headers,
+        _PLAIN_PART_HEADERS,
+        encodebytes(plain_text.encode("utf-8")).replace(b"\n", b"\r\n"),
+        b"\r\n",
+        _HTML_PART_HEADERS,
+        encodebytes(html_body.encode("utf-8")).replace(b"\n", b"\r\n"),
+        _CLOSING,
+    ))
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Connection problems and 4xx replies are worth retrying; 5xx replies
+    and authentication failures are not."""
+    if isinstance(exc, aiosmtplib.SMTPAuthenticationError):
         return False
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return all(400 <= r.code < 500 for r in exc.recipients)
+    if isinstance(exc, aiosmtplib.SMTPResponseException):
+        return 400 <= exc.code < 500
+    return True
+
+
+async def send_email_batch(
+    messages: list[dict[str, str]],
+) -> tuple[int, list[dict[str, str]]]:
+    """Send several messages over one pooled SMTP connection.
+
+    Each message is a dict with ``to``, ``subject``, ``html`` and ``plain``.
+    Returns ``(sent, retry)``: the number of messages delivered and the
+    messages that failed with a transient error so the caller can retry
+    them; permanent failures are logged and dropped.
+    Never raises.
+    """
+    sent = 0
+    pending = list(messages)
+    delivery_metrics["batches"] += 1
+    started = time.monotonic()
+
+    # One reconnect per batch: a pooled connection may have been dropped
+    # by the server while idle.
+    for attempt in range(2):
+        retry: list[dict[str, str]] = []
+        try:
+            async with _get_pool().connection() as smtp:
+                while pending:
+                    message = pending[0]
+                    try:
+                        await smtp.sendmail(
+                            settings.EMAIL_FROM,
+                            [message["to"]],
+                            _encode_message(message["to"], message["subject"], message["html"], message["plain"]),
+                        )
+                        sent += 1
+                        delivery_metrics["sent"] += 1
+                        logger.info("Email sent to %s (subject: %s)", message["to"], message["subject"])
+                    except aiosmtplib.SMTPServerDisconnected:
+                        raise
+                    except Exception as exc:
+                        if _is_transient(exc):
+                            retry.append(message)
+                        else:
+                            delivery_metrics["failed"] += 1
+                            logger.error("Permanent SMTP error sending to %s: %s", message["to"], exc)
+                    pending.pop(0)
+        except aiosmtplib.SMTPAuthenticationError:
+            logger.error("SMTP authentication failed for %s — check SMTP_USER/SMTP_PASSWORD", settings.SMTP_USER)
+            delivery_metrics["failed"] += len(pending)
+            pending = []
+        except (aiosmtplib.SMTPConnectError, aiosmtplib.SMTPConnectTimeoutError):
+            logger.error("Cannot connect to SMTP server %s:%s", settings.SMTP_HOST, settings.SMTP_PORT)
+            retry.extend(pending)
+            pending = []
+        except aiosmtplib.SMTPServerDisconnected:
+            if attempt == 0:
+                pending = retry + pending
+                continue
+            retry.extend(pending)
+            pending = []
+        except Exception:
+            logger.exception("Unexpected error sending email batch")
+            retry.extend(pending)
+            pending = []
+        break
+
+    delivery_metrics["send_seconds"] += time.monotonic() - started
+    return sent, retry
+
+
+async def _send_email(to: str, subject: str, html_body: str, plain_text: str) -> bool:
+    """Send a single email right away over a pooled SMTP connection.
+
+    Returns True if sent, False on error.
+    Logs all errors but never raises — the caller decides how to handle failures.
+    """
+    sent, retry = await send_email_batch(
+        [{"to": to, "subject": subject, "html": html_body, "plain": plain_text}]
+    )
+    delivery_metrics["failed"] += len(retry)
+    return sent == 1
+
+
+def _queue_email(to: str, subject: str, html_body: str, plain_text: str) -> bool:
+    """Hand an email to the outbound queue (Celery) instead of sending it
+    inside the request. Returns False if the broker is unreachable."""
+    from app.tasks.email_delivery import queue_emails
+
+    return queue_emails([{"to": to, "subject": subject, "html": html_body, "plain": plain_text}])
 
 
 # ---------------------------------------------------------------------------
@@ -210,9 +479,8 @@ async def send_2fa_email(to: str, code: str) -> bool:
         print(f"\n  🔐 2FA CODE for {to}: {code}\n")
         return True
 
-    subject, html = _2fa_template(code)
-    plain = f"Il tuo codice di verifica AureaVia: {code}\nIl codice scade tra 10 minuti."
-    return await _send_email(to, subject, html, plain)
+    subject, html_body, plain = TEMPLATES["2fa"].render(code=code)
+    return await _send_email(to, subject, html_body, plain)
 
 
 async def send_reset_password_email(to: str, code: str) -> bool:
@@ -226,9 +494,8 @@ async def send_reset_password_email(to: str, code: str) -> bool:
         print(f"\n  🔑 RESET CODE for {to}: {code}\n")
         return True
 
-    subject, html = _reset_password_template(code)
-    plain = f"Codice di reset password AureaVia: {code}\nIl codice scade tra 30 minuti."
-    return await _send_email(to, subject, html, plain)
+    subject, html_body, plain = TEMPLATES["reset_password"].render(code=code)
+    return await _send_email(to, subject, html_body, plain)
 
 
 async def send_ride_assignment_email(
@@ -242,7 +509,7 @@ async def send_ride_assignment_email(
     """Send ride assignment notification to driver.
 
     In DEV_MODE, logs to console and returns True.
-    In production, sends via SMTP.
+    In production, queues the email for delivery by a Celery worker.
     """
     if settings.DEV_MODE:
         logger.info(
@@ -252,10 +519,49 @@ async def send_ride_assignment_email(
         print(f"\n  📧 RIDE ASSIGNED to {driver_name} ({to}): {pickup} → {dropoff} at {ride_date}\n")
         return True
 
-    subject, html = _ride_assignment_template(driver_name, ride_date, pickup, dropoff, passenger)
-    plain = (
-        f"Ciao {driver_name}, ti è stata assegnata una nuova corsa.\n"
-        f"Data: {ride_date}\nPickup: {pickup}\nDestinazione: {dropoff}\n"
-        f"Passeggero: {passenger}\n\nAccedi all'app per i dettagli."
+    subject, html_body, plain = TEMPLATES["ride_assignment"].render(
+        driver_name=driver_name,
+        ride_date=ride_date,
+        pickup=pickup,
+        dropoff=dropoff,
+        passenger=passenger,
     )
-    return await _send_email(to, subject, html, plain)
+    # The broker publish is blocking: keep it off the event loop
+    if await asyncio.to_thread(_queue_email, to, subject, html_body, plain):
+        return True
+    # Broker unavailable: fall back to sending inline
+    return await _send_email(to, subject, html_body, plain)
+
+
+async def send_ride_assignment_emails(
+    to: str,
+    driver_name: str,
+    rides: list[dict[str, str]],
+) -> bool:
+    """Send one assignment email per ride to the same driver, queued as a
+    single batch. Each ride dict has ``ride_date``, ``pickup``, ``dropoff``
+    and ``passenger``.
+
+    In DEV_MODE, logs to console and returns True.
+    """
+    if settings.DEV_MODE:
+        for ride in rides:
+            logger.info(
+                "DEV_MODE: Ride assignment email to %s — %s → %s at %s",
+                to, ride["pickup"], ride["dropoff"], ride["ride_date"],
+            )
+        print(f"\n  📧 {len(rides)} RIDES ASSIGNED to {driver_name} ({to})\n")
+        return True
+
+    messages = TEMPLATES["ride_assignment"].render_batch(
+        [(to, {"driver_name": driver_name, **ride}) for ride in rides]
+    )
+
+    from app.tasks.email_delivery import queue_emails
+
+    if await asyncio.to_thread(queue_emails, messages):
+        return True
+    # Broker unavailable: fall back to sending inline
+    sent, retry = await send_email_batch(messages)
+    delivery_metrics["failed"] += len(retry)
+    return sent == len(messages)
@@ -0,0 +1,187 @@
+"""Sliding-window rate limiting for the unauthenticated auth endpoints.
+
+Each :class:`RateLimit` instance is a FastAPI dependency that counts
+requests per client IP and, optionally, per account (the email or user the
+request targets). Requests over either limit are rejected with ``429`` and
+a ``Retry-After`` header before the endpoint runs, so abusive traffic never
+reaches the database or the password hasher.
+
+Windows are exact sliding logs: a Redis sorted set per key holding the
+timestamps of the accepted requests of the last ``window`` seconds. All
+keys of a request are checked and recorded in one Lua script, so a rejected
+request does not consume budget and the check is atomic across workers.
+
+If Redis is unavailable the same algorithm runs on a bounded in-process
+table. Limits then apply per worker rather than globally, which still caps
+the hashing work each worker can be made to do.
+"""
+
+import hashlib
+import ipaddress
+import logging
+import math
+import secrets
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from functools import lru_cache
+
+from fastapi import HTTPException, Request, status
+
+from app.config import settings
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# KEYS: one sorted set per limit. ARGV: now (ms), window (ms), member, then
+# the limit of each key. Returns 0 if accepted, else the retry delay in ms.
+_SLIDING_WINDOW = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local retry = 0
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry = math.max(retry, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry > 0 then
+    return retry
+end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('PEXPIRE', key, window)
+end
+return 0
+"""
+
+# key -> timestamps (ms) of accepted requests; insertion order doubles as age
+_local_windows: OrderedDict[str, deque[int]] = OrderedDict()
+
+
+def _check_local(keys: list[tuple[str, int]], now: int, window: int) -> int:
+    retry = 0
+    for key, limit in keys:
+        hits = _local_windows.get(key)
+        if hits is None:
+            continue
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        if len(hits) >= limit:
+            retry = max(retry, hits[0] + window - now)
+    if retry:
+        return retry
+
+    for key, _ in keys:
+        hits = _local_windows.pop(key, None) or deque()
+        hits.append(now)
+        _local_windows[key] = hits
+    while len(_local_windows) > settings.RATE_LIMIT_LOCAL_MAX_KEYS:
+        _local_windows.popitem(last=False)
+    return 0
+
+
+async def _check(keys: list[tuple[str, int]], window_seconds: int) -> int:
+    """Record a request against *keys* (name, limit) unless one is full.
+
+    Returns 0 if the request is accepted, else the retry delay in ms.
+    """
+    now = int(time.time() * 1000)
+    window = window_seconds * 1000
+    try:
+        return int(await get_redis().eval(
+            _SLIDING_WINDOW,
+            len(keys),
+            *[key for key, _ in keys],
+            now,
+            window,
+            f"{now}-{secrets.token_hex(4)}",
+            *[limit for _, limit in keys],
+        ))
+    except Exception:
+        logger.warning("Rate limiter falling back to in-process windows", exc_info=True)
+        return _check_local(keys, now, window)
+
+
+@lru_cache(maxsize=1)
+def _trusted_proxies() -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(
+        ipaddress.ip_network(proxy, strict=False) for proxy in settings.RATE_LIMIT_TRUSTED_PROXIES
+    )
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies())
+
+
+def client_ip(request: Request) -> str:
+    """Client address, taken from ``X-Real-IP`` when the request comes from
+    a trusted proxy (anyone else could set the header to any value)."""
+    peer = request.client.host if request.client else None
+    if settings.RATE_LIMIT_TRUST_PROXY and peer and _is_trusted_proxy(peer):
+        forwarded = request.headers.get("x-real-ip")
+        if forwarded:
+            return forwarded.strip()
+    return peer or "unknown"
+
+
+def _account_key(account: str) -> str:
+    # Hashed so Redis holds no email addresses
+    return hashlib.sha256(account.strip().lower().encode()).hexdigest()[:32]
+
+
+class RateLimit:
+    """Dependency limiting an endpoint per client IP and per account.
+
+    *account* extracts the targeted account (e.g. the email) from the parsed
+    JSON body; returning None skips the per-account limit for that request.
+    """
+
+    def __init__(
+        self,
+        scope: str,
+        per_ip: int,
+        per_account: int = 0,
+        account: Callable[[dict], str | None] | None = None,
+        window_seconds: int | None = None,
+    ):
+        self.scope = scope
+        self.per_ip = per_ip
+        self.per_account = per_account
+        self.account = account
+        self.window_seconds = window_seconds or settings.RATE_LIMIT_WINDOW_SECONDS
+
+    async def _account(self, request: Request) -> str | None:
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        if not isinstance(body, dict):
+            return None
+        value = self.account(body)
+        return value if isinstance(value, str) and value else None
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        keys = [(f"ratelimit:{self.scope}:ip:{client_ip(request)}", self.per_ip)]
+        if self.account is not None and self.per_account:
+            account = await self._account(request)
+            if account is not None:
+                keys.append(
+                    (f"ratelimit:{self.scope}:account:{_account_key(account)}", self.per_account)
+                )
+
+        retry_ms = await _check(keys, self.window_seconds)
+        if retry_ms:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts. Please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_ms / 1000))},
+            )
@@ -0,0 +1,157 @@
+"""Short-TTL cache for aggregate JSON responses (report endpoints).
+
+Staff dashboards poll the same reports with the same parameters from many
+sessions at once. :func:`cached_json` serves them from a shared cache so
+each (endpoint, parameters) pair is aggregated at most once per TTL:
+
+- each entry is its own Redis key holding the response with a TTL
+  (``SET ... EX``), named after the endpoint + normalized parameters and
+  the namespace's current generation (``cache:<namespace>:generation``);
+  invalidating a namespace is a single ``INCR`` of the generation, after
+  which the old entries are unreachable and simply expire;
+- concurrent misses for the same entry within a process wait for the
+  first one instead of aggregating in parallel;
+- if Redis is unavailable a small in-process table takes its place.
+
+Responses carry ``X-Cache: HIT`` or ``MISS``. :func:`invalidate_after_commit`
+drops a namespace once the writing transaction commits (e.g. on ride
+completion); a response computed concurrently with that commit can
+survive the invalidation, for at most one TTL.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime
+from urllib.parse import urlencode
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.utils.background import batch_after_commit
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "response_cache_invalidations"
+
+# (namespace, field) -> (expires at, body); insertion order doubles as age
+_local: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+# (namespace, field) -> body being computed by the first request of a miss
+_inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+# Entry keys are built from the generation read in the same script, so a
+# read or write never pairs a field with a stale generation
+_GET = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+return redis.call('GET', ARGV[1] .. generation .. ':' .. ARGV[2])
+"""
+
+_SET = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+redis.call('SET', ARGV[1] .. generation .. ':' .. ARGV[2], ARGV[3], 'EX', ARGV[4])
+"""
+
+
+def _generation_key(namespace: str) -> str:
+    return f"cache:{namespace}:generation"
+
+
+def _entry_prefix(namespace: str) -> str:
+    return f"cache:{namespace}:"
+
+
+def _field(endpoint: str, params: dict) -> str:
+    normalized = sorted(
+        (name, value.isoformat() if isinstance(value, (date, datetime)) else str(value))
+        for name, value in params.items()
+        if value is not None
+    )
+    return f"{endpoint}?{urlencode(normalized)}"
+
+
+async def _get(namespace: str, field: str) -> str | None:
+    try:
+        return await get_redis().eval(_GET, 1, _generation_key(namespace), _entry_prefix(namespace), field)
+    except Exception:
+        logger.warning("Response cache read failed, using in-process cache", exc_info=True)
+        entry = _local.get((namespace, field))
+        return entry[1] if entry is not None and entry[0] > time.time() else None
+
+
+async def _set(namespace: str, field: str, body: str, ttl: int) -> None:
+    try:
+        await get_redis().eval(_SET, 1, _generation_key(namespace), _entry_prefix(namespace), field, body, ttl)
+    except Exception:
+        logger.warning("Response cache write failed, using in-process cache", exc_info=True)
+        _local.pop((namespace, field), None)
+        _local[(namespace, field)] = (time.time() + ttl, body)
+        while len(_local) > settings.REPORT_CACHE_LOCAL_MAX_ENTRIES:
+            _local.popitem(last=False)
+
+
+def _response(body: str, status: str) -> Response:
+    return Response(content=body, media_type="application/json", headers={"X-Cache": status})
+
+
+async def cached_json(
+    namespace: str,
+    endpoint: str,
+    params: dict,
+    build: Callable[[], Awaitable[BaseModel]],
+    ttl: int | None = None,
+) -> Response:
+    """Return the cached JSON for *endpoint* + *params*, calling *build* on
+    a miss. Parameters are normalized (sorted, None dropped) into the key.
+    """
+    ttl = ttl or settings.REPORT_CACHE_TTL_SECONDS
+    field = _field(endpoint, params)
+    key = (namespace, field)
+
+    body = await _get(namespace, field)
+    if body is not None:
+        return _response(body, "HIT")
+
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        return _response(await asyncio.shield(inflight), "HIT")
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        body = (await build()).model_dump_json()
+        await _set(namespace, field, body, ttl)
+        future.set_result(body)
+    except Exception as exc:
+        future.set_exception(exc)
+        future.exception()  # waiters re-raise it; don't log it as unretrieved
+        raise
+    finally:
+        _inflight.pop(key, None)
+        if not future.done():
+            future.cancel()
+    return _response(body, "MISS")
+
+
+async def invalidate(*namespaces: str) -> None:
+    """Drop every cached entry of *namespaces*."""
+    for namespace in namespaces:
+        for key in [key for key in _local if key[0] == namespace]:
+            del _local[key]
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for namespace in namespaces:
+            pipe.incr(_generation_key(namespace))
+        await pipe.execute()
+    except Exception:
+        logger.warning("Response cache invalidation failed for %s", namespaces, exc_info=True)
+
+
+def invalidate_after_commit(db: AsyncSession, *namespaces: str) -> None:
+    """Invalidate *namespaces* once *db* commits (nothing on rollback)."""
+    pending = batch_after_commit(db, _PENDING_KEY, set, lambda namespaces: invalidate(*namespaces))
+    pending.update(namespaces)
@@ -0,0 +1,156 @@
+"""Benchmark: dashboard KPIs as seven sequential queries vs one statement.
+
+Seeds synthetic rides (spread over two years, mixed statuses) inside a
+transaction on the configured PostgreSQL database, times both versions of
+``/api/reports/dashboard`` and checks they agree, then rolls everything
+back. The sequential version is the original implementation: each of its
+queries scans ``rides`` on its own; the single statement
+(:func:`app.api.reports._kpi_statement`) reads them once and takes revenue
+from the ``ride_daily_stats`` rollup (rebuilt after seeding). Revenue is
+compared loosely since the rollup counts whole UTC days. Each version also
+reports how many statements one dashboard load executes.
+
+No results are recorded here: this has not been run against a seeded
+PostgreSQL database, so no latency improvement is claimed. What the change
+guarantees is structural (one round trip instead of seven, and one pass
+over ``rides`` instead of one scan per KPI); run the benchmark to see what
+that is worth on real data.
+
+Usage: python bench_dashboard_kpis.py [rides] [runs]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, event, func, select, text
+
+from app.api.reports import _kpi_statement
+from app.database import AsyncSessionLocal
+from app.models.review import Review
+from app.models.ride import Ride, RideStatus
+from app.services.rollup_service import rebuild_daily_stats
+
+PERIOD_DAYS = 30
+
+SEED_RIDES = text("""
+WITH d AS (SELECT array_agg(id) AS ids FROM users WHERE role = 'DRIVER')
+INSERT INTO rides (
+    id, source_platform, status, pickup_address, dropoff_address,
+    scheduled_at, completed_at, passenger_count, price, driver_id,
+    created_at, updated_at
+)
+SELECT
+    gen_random_uuid(),
+    'bench',
+    (CASE g % 5 WHEN 0 THEN 'CANCELLED' WHEN 1 THEN 'BOOKED' ELSE 'COMPLETED' END)::ride_status,
+    'Pickup ' || g,
+    'Dropoff ' || g,
+    now() - (g % 730) * interval '1 day' + interval '2 hours',
+    CASE WHEN g % 5 >= 2 THEN now() - (g % 730) * interval '1 day' + interval '3 hours' END,
+    1,
+    20 + g % 180,
+    CASE WHEN g % 3 > 0 THEN d.ids[1 + g % array_length(d.ids, 1)] END,
+    now() - (g % 730) * interval '1 day',
+    now()
+FROM generate_series(1, :n) AS g, d
+""")
+
+
+async def sequential_kpis(db, now: datetime) -> tuple:
+    """The previous implementation: one query per KPI."""
+    current_start = now - timedelta(days=PERIOD_DAYS)
+    previous_start = current_start - timedelta(days=PERIOD_DAYS)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    completed = Ride.status == RideStatus.COMPLETED
+
+    total_rides = (await db.execute(select(func.count(Ride.id)).where(
+        Ride.created_at >= current_start, Ride.created_at < now,
+    ))).scalar() or 0
+    previous_rides = (await db.execute(select(func.count(Ride.id)).where(
+        Ride.created_at >= previous_start, Ride.created_at < current_start,
+    ))).scalar() or 0
+    total_revenue = (await db.execute(select(func.coalesce(func.sum(Ride.price), 0)).where(
+        completed, Ride.completed_at >= current_start, Ride.completed_at < now,
+    ))).scalar() or 0
+    previous_revenue = (await db.execute(select(func.coalesce(func.sum(Ride.price), 0)).where(
+        completed, Ride.completed_at >= previous_start, Ride.completed_at < current_start,
+    ))).scalar() or 0
+    active_drivers = (await db.execute(select(func.count(func.distinct(Ride.driver_id))).where(
+        Ride.driver_id.is_not(None), Ride.created_at >= current_start, Ride.created_at < now,
+    ))).scalar() or 0
+    avg_rating = (await db.execute(select(func.coalesce(func.avg(Review.rating), 0)))).scalar() or 0
+    rides_today = (await db.execute(select(func.count(Ride.id)).where(
+        and_(Ride.scheduled_at >= today_start, Ride.scheduled_at < now),
+    ))).scalar() or 0
+
+    return (
+        total_rides, previous_rides, float(total_revenue), float(previous_revenue),
+        active_drivers, round(float(avg_rating), 2), rides_today,
+    )
+
+
+async def single_pass_kpis(db, now: datetime) -> tuple:
+    row = (await db.execute(_kpi_statement(now, PERIOD_DAYS))).one()
+    return (
+        row.total_rides, row.previous_rides, float(row.total_revenue), float(row.previous_revenue),
+        row.active_drivers, round(float(row.avg_rating), 2), row.rides_today,
+    )
+
+
+async def measure(name: str, fn, db, now: datetime, runs: int) -> tuple:
+    statements = 0
+
+    def count(*args) -> None:
+        nonlocal statements
+        statements += 1
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        result = await fn(db, now)  # warm-up
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn(db, now)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{name:<12} p50 {statistics.median(timings):8.1f} ms  "
+        f"mean {statistics.mean(timings):8.1f} ms  min {min(timings):8.1f} ms  "
+        f"({runs} runs, {statements} statement(s) per load)"
+    )
+    return result
+
+
+async def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    async with AsyncSessionLocal() as db:
+        print(f"=== Dashboard KPIs over {n:,} synthetic rides (rolled back afterwards) ===\n")
+        start = time.perf_counter()
+        await db.execute(SEED_RIDES, {"n": n})
+        await db.execute(text("ANALYZE rides"))
+        print(f"seeded in {time.perf_counter() - start:.1f} s")
+        start = time.perf_counter()
+        await rebuild_daily_stats(db)
+        print(f"rollup rebuilt in {time.perf_counter() - start:.1f} s\n")
+
+        now = datetime.now(timezone.utc)
+        try:
+            sequential = await measure("sequential", sequential_kpis, db, now, runs)
+            single = await measure("single-pass", single_pass_kpis, db, now, runs)
+            # Indexes 2-3 are revenue: exact 24h windows vs whole UTC days
+            counts_match = sequential[:2] + sequential[4:] == single[:2] + single[4:]
+            print(f"\nride counts / drivers / rating match: {counts_match}")
+            print(f"revenue (sequential):  {sequential[2]:,.2f} / {sequential[3]:,.2f}")
+            print(f"revenue (single-pass): {single[2]:,.2f} / {single[3]:,.2f}")
+        finally:
+            await db.rollback()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,195 @@
+"""Benchmark: precompiled email templates and direct serialization vs. the
+f-string builders and per-send MIMEMultipart they replaced.
+
+The baseline is the code before the change: ``legacy_render`` rebuilds the
+ride assignment document with f-strings (body wrapped in the branded shell
+on every call), as ``_ride_assignment_template`` did, and the message is
+serialized by building a ``MIMEMultipart`` tree (``_build_message``).
+
+The two halves are measured separately, on the same field values:
+
+- rendering: ``legacy_render`` vs. ``TEMPLATES["ride_assignment"].render``
+  (which also HTML-escapes the fields, the baseline did not);
+- encoding: ``_build_message(...).as_bytes()`` vs. ``_encode_message``
+  (both from the same rendered strings);
+
+then end to end (render + encode), plus the batch renderer.
+
+Usage: python bench_email_templates.py [messages]
+"""
+import sys
+import time
+
+from app.utils.email import TEMPLATES, _base_template, _build_message, _encode_message
+
+RIDE_FIELDS = {
+    "driver_name": "Mario Rossi",
+    "ride_date": "18/10/2026 - 14:30",
+    "pickup": "Aeroporto di Fiumicino, Terminal 3",
+    "dropoff": "Via del Corso 120, Roma",
+    "passenger": "Jane Doe",
+}
+TO = "driver@aureavia.com"
+
+
+# ---------------------------------------------------------------------------
+# Baseline (before precompiled templates)
+# ---------------------------------------------------------------------------
+
+def _ride_assignment_template(
+    driver_name: str,
+    ride_date: str,
+    pickup: str,
+    dropoff: str,
+    passenger: str,
+) -> tuple[str, str]:
+    """Baseline ride assignment template (per-call f-strings), as it was
+    before :data:`TEMPLATES`."""
+    subject = "AureaVia - Nuova corsa assegnata"
+    content = f"""\
+<h2 style="color:#2D2D2D;font-size:20px;margin:0 0 16px;text-align:center;">
+  Corsa assegnata
+</h2>
+<p style="color:#666;font-size:14px;margin:0 0 24px;text-align:center;">
+  Ciao <strong>{driver_name}</strong>, ti è stata assegnata una nuova corsa.
+</p>
+<table width="100%" cellpadding="0" cellspacing="0" style="margin:0 0 24px;">
+  <tr>
+    <td style="padding:8px 0;border-bottom:1px solid #f0f0f0;">
+      <span style="color:#999;font-size:12px;">DATA E ORA</span><br>
+      <span style="color:#2D2D2D;font-size:14px;font-weight:600;">{ride_date}</span>
+    </td>
+  </tr>
+  <tr>
+    <td style="padding:8px 0;border-bottom:1px solid #f0f0f0;">
+      <span style="color:#999;font-size:12px;">PICKUP</span><br>
+      <span style="color:#2D2D2D;font-size:14px;">{pickup}</span>
+    </td>
+  </tr>
+  <tr>
+    <td style="padding:8px 0;border-bottom:1px solid #f0f0f0;">
+      <span style="color:#999;font-size:12px;">DESTINAZIONE</span><br>
+      <span style="color:#2D2D2D;font-size:14px;">{dropoff}</span>
+    </td>
+  </tr>
+  <tr>
+    <td style="padding:8px 0;">
+      <span style="color:#999;font-size:12px;">PASSEGGERO</span><br>
+      <span style="color:#2D2D2D;font-size:14px;">{passenger}</span>
+    </td>
+  </tr>
+</table>
+<p style="color:#666;font-size:13px;margin:0;text-align:center;">
+  Accedi all'app per visualizzare i dettagli completi della corsa.
+</p>"""
+    return subject, _base_template(content)
+
+
+def legacy_render(driver_name, ride_date, pickup, dropoff, passenger) -> tuple[str, str, str]:
+    """Baseline (subject, html, plain), as ``send_ride_assignment_email``
+    built them."""
+    subject, html = _ride_assignment_template(driver_name, ride_date, pickup, dropoff, passenger)
+    plain = (
+        f"Ciao {driver_name}, ti è stata assegnata una nuova corsa.\n"
+        f"Data: {ride_date}\nPickup: {pickup}\nDestinazione: {dropoff}\n"
+        f"Passeggero: {passenger}\n\nAccedi all'app per i dettagli."
+    )
+    return subject, html, plain
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def render_legacy(n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        legacy_render(**RIDE_FIELDS)
+    return time.perf_counter() - start
+
+
+def render_precompiled(n: int) -> float:
+    template = TEMPLATES["ride_assignment"]
+    start = time.perf_counter()
+    for _ in range(n):
+        template.render(**RIDE_FIELDS)
+    return time.perf_counter() - start
+
+
+def encode_mime(n: int) -> float:
+    subject, html_body, plain = legacy_render(**RIDE_FIELDS)
+    start = time.perf_counter()
+    for _ in range(n):
+        _build_message(TO, subject, html_body, plain).as_bytes()
+    return time.perf_counter() - start
+
+
+def encode_direct(n: int) -> float:
+    subject, html_body, plain = legacy_render(**RIDE_FIELDS)
+    start = time.perf_counter()
+    for _ in range(n):
+        _encode_message(TO, subject, html_body, plain)
+    return time.perf_counter() - start
+
+
+def end_to_end_legacy(n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        subject, html_body, plain = legacy_render(**RIDE_FIELDS)
+        _build_message(TO, subject, html_body, plain).as_bytes()
+    return time.perf_counter() - start
+
+
+def end_to_end_precompiled(n: int) -> float:
+    template = TEMPLATES["ride_assignment"]
+    start = time.perf_counter()
+    for _ in range(n):
+        subject, html_body, plain = template.render(**RIDE_FIELDS)
+        _encode_message(TO, subject, html_body, plain)
+    return time.perf_counter() - start
+
+
+def end_to_end_batch(n: int) -> float:
+    template = TEMPLATES["ride_assignment"]
+    recipients = [(f"admin{i}@aureavia.com", RIDE_FIELDS) for i in range(n)]
+    start = time.perf_counter()
+    for message in template.render_batch(recipients):
+        _encode_message(message["to"], message["subject"], message["html"], message["plain"])
+    return time.perf_counter() - start
+
+
+def _run(title: str, n: int, cases: list) -> dict[str, float]:
+    print(f"--- {title} ---")
+    results = {}
+    for name, fn in cases:
+        results[name] = min(fn(n) for _ in range(3))
+        print(f"{name:<26} {results[name] * 1000:9.1f} ms   {n / results[name]:12,.0f} msg/s")
+    return results
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    print(f"=== Email rendering + serialization ({n} messages) ===\n")
+
+    render = _run("Rendering", n, [
+        ("f-string (baseline)", render_legacy),
+        ("precompiled", render_precompiled),
+    ])
+    print(f"Template speed-up: {render['f-string (baseline)'] / render['precompiled']:.2f}x\n")
+
+    encode = _run("Encoding", n, [
+        ("MIMEMultipart (baseline)", encode_mime),
+        ("direct", encode_direct),
+    ])
+    print(f"Encoding speed-up: {encode['MIMEMultipart (baseline)'] / encode['direct']:.1f}x\n")
+
+    total = _run("End to end", n, [
+        ("baseline", end_to_end_legacy),
+        ("precompiled", end_to_end_precompiled),
+        ("precompiled batch", end_to_end_batch),
+    ])
+    print(f"Overall speed-up: {total['baseline'] / total['precompiled']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
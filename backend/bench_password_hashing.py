@@ -0,0 +1,77 @@
+"""Benchmark: event-loop latency during a login storm.
+
+A storm of concurrent bcrypt verifications (as ``/api/auth/login`` does)
+runs alongside a probe that stands in for every other endpoint: it sleeps
+10 ms in a loop and records how late it wakes up. With inline hashing the
+probe waits behind every hash; with the bcrypt pool
+(:func:`verify_password_async`) the loop stays free.
+
+Usage: python bench_password_hashing.py [logins]
+"""
+import asyncio
+import math
+import statistics
+import sys
+import time
+
+from app.config import settings
+from app.utils.security import hash_password, verify_password, verify_password_async
+
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.010
+
+
+async def probe(stop: asyncio.Event, delays: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def inline_login(hashed: str) -> None:
+    verify_password(PASSWORD, hashed)
+
+
+async def pooled_login(hashed: str) -> None:
+    await verify_password_async(PASSWORD, hashed)
+
+
+async def storm(login, hashed: str, n: int) -> tuple[float, list[float]]:
+    stop = asyncio.Event()
+    delays: list[float] = []
+    prober = asyncio.create_task(probe(stop, delays))
+    await asyncio.sleep(PROBE_INTERVAL)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login(hashed) for _ in range(n)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await prober
+    return elapsed, delays
+
+
+def report(name: str, elapsed: float, delays: list[float], n: int) -> None:
+    delays_ms = sorted(d * 1000 for d in delays)
+    p99 = delays_ms[min(len(delays_ms) - 1, math.ceil(len(delays_ms) * 0.99) - 1)]
+    print(
+        f"{name:<8} {elapsed * 1000:8.0f} ms  {n / elapsed:7.1f} logins/s   "
+        f"probe lag p50 {statistics.median(delays_ms):7.1f} ms  "
+        f"p99 {p99:7.1f} ms  max {delays_ms[-1]:7.1f} ms  ({len(delays_ms)} probes)"
+    )
+
+
+async def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    hashed = hash_password(PASSWORD)
+    print(
+        f"=== Login storm: {n} bcrypt verifications "
+        f"(rounds={settings.BCRYPT_ROUNDS}, pool={settings.PASSWORD_HASH_CONCURRENCY}) ===\n"
+    )
+    for name, login in [("inline", inline_login), ("pool", pooled_login)]:
+        elapsed, delays = await storm(login, hashed, n)
+        report(name, elapsed, delays, n)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
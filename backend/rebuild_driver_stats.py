@@ -0,0 +1,28 @@
+"""Rebuild the per-driver monthly stats (``driver_monthly_stats``) from the
+ride history, e.g. after a data import or to backfill past months.
+
+Usage: python rebuild_driver_stats.py [--since YYYY-MM-DD]
+
+Without ``--since`` every month is rebuilt; otherwise the months from the
+one containing that date onwards.
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from app.database import AsyncSessionLocal, engine
+from app.services.driver_stats_service import rebuild_driver_monthly_stats
+
+
+async def main(since: date | None):
+    async with AsyncSessionLocal() as db:
+        rides = await rebuild_driver_monthly_stats(db, since)
+        await db.commit()
+    await engine.dispose()
+    print(f"Rebuilt driver monthly stats since {since or 'the beginning'}: {rides} completed ride(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--since", type=date.fromisoformat, help="first day to rebuild (YYYY-MM-DD)")
+    asyncio.run(main(parser.parse_args().since))
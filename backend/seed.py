@@ -13,6 +13,7 @@ from app.models import (
     Ride, RideStatus, RouteType,
     Review
 )
+from app.services.review_service import add_review
 from app.utils.security import hash_password
 
 
@@ -281,7 +282,7 @@ async def seed_database():
             reviewer_name="Maria Bianchi",
             source_platform="Booking.com"
         )
-        db.add(review)
+        await add_review(db, review)
         print("✓ Created sample review")
 
         await db.commit()
@@ -32,12 +32,9 @@ async def get_auth_token(client: httpx.AsyncClient, email: str, password: str) -
         user = result.scalar_one()
 
         # Try codes 000000-999999 would be slow; instead generate a fresh code
-        from app.services.auth_service import generate_2fa_code, initiate_2fa
-        code = generate_2fa_code()
-        from app.utils.security import hash_password
-        user.two_factor_code = hash_password(code)
-        from datetime import datetime, timedelta, timezone
-        user.two_factor_expires = datetime.now(timezone.utc) + timedelta(minutes=10)
+        from app.services.otp_service import OTP_LOGIN, issue_code
+        from datetime import timedelta
+        code = await issue_code(session, user, OTP_LOGIN, timedelta(minutes=10))
         await session.commit()
 
     # Step 3: Verify 2FA
@@ -14,14 +14,11 @@ async def test_auth_flow():
         print(f"1. Login OK: {user.email} ({user.role})")
 
         # 2. Initiate 2FA - get raw code before hashing
-        import random, string
-        from app.utils.security import hash_password, verify_password
-        from datetime import datetime, timedelta, timezone
+        from app.services.otp_service import OTP_LOGIN, issue_code
+        from datetime import timedelta
 
-        code = ''.join(random.choices(string.digits, k=6))
-        user.two_factor_code = hash_password(code)
-        user.two_factor_expires = datetime.now(timezone.utc) + timedelta(minutes=10)
-        await db.flush()
+        code = await issue_code(db, user, OTP_LOGIN, timedelta(minutes=10))
+        await db.commit()
         print(f"2. 2FA code generated: {code}")
 
         # 3. Verify 2FA
@@ -46,10 +43,8 @@ async def test_auth_flow():
         # 6. Test wrong 2FA code
         user2 = await authenticate_user(db, "marco.rossi@driver.com", "driver123")
         assert user2 is not None, "Driver auth failed!"
-        code2 = ''.join(random.choices(string.digits, k=6))
-        user2.two_factor_code = hash_password(code2)
-        user2.two_factor_expires = datetime.now(timezone.utc) + timedelta(minutes=10)
-        await db.flush()
+        code2 = await issue_code(db, user2, OTP_LOGIN, timedelta(minutes=10))
+        await db.commit()
         bad_verify = await verify_2fa_code(db, user2, "000000")
         assert not bad_verify, "Wrong 2FA code should fail!"
         print(f"6. Wrong 2FA code correctly rejected")
@@ -13,11 +13,16 @@ export interface DashboardKPIs {
 export interface EarningsDataPoint {
   date: string;
   amount: number;
+  driver_share: number;
+  margin: number;
+  rides: number;
+  distance_km: number;
 }
 
 export interface EarningsData {
   granularity: string;
   data: EarningsDataPoint[];
+  by_platform: Record<string, EarningsDataPoint[]> | null;
 }
 
 export interface DriverListItem {
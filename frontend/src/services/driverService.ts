@@ -32,6 +32,7 @@ export interface DriverStats {
   rating_avg: number;
   completed_this_month: number;
   earnings_this_month: number;
+  km_this_month: number;
 }
 
 export async function fetchMyDriver(): Promise<DriverProfile> {